@@ -8,6 +8,8 @@ import json
 import os
 from nltk.translate.bleu_score import sentence_bleu
 from rouge_score import rouge_scorer
+from context_packer import TokenCounter, pack_docs
+from grammars import ANSWER_SCHEMA, get_grammar, parse_structured
 
 # -----------------------------
 # 1. Load LLaMA GGUF Model
@@ -18,6 +20,10 @@ llm = Llama(
     n_threads=4,
     verbose=False
 )
+MAX_NEW_TOKENS = 150
+token_counter = TokenCounter(llm)
+# Structured mode: answers are JSON {"answer", "postUrl"} constrained by a GBNF grammar
+STRUCTURED = os.getenv("STRUCTURED_ANSWERS", "0") == "1"
 
 # -----------------------------
 # 2. Load Corpus + Embed
@@ -58,9 +64,23 @@ Q: What is the postContent for the post with postUrl 'https://linkedin.com/in/mj
 A: Looking for a lawyer in Bangalore.
 """
 
-def build_prompt_with_docs(query, docs):
-    structured = "\n\n".join([f"Post {i+1}:\n{doc}" for i, doc in enumerate(docs)])
-    return f"""{FEW_SHOT}
+FEW_SHOT_JSON = """
+Example:
+Post:
+Author: Madhuri Jain
+postUrl: https://linkedin.com/in/mjmadhu
+likeCount: 940
+postContent: Looking for a lawyer in Bangalore.
+
+Q: How many followers does Madhuri Jain have?
+A: {"answer": "Madhuri Jain has 940+ followers.", "postUrl": "https://linkedin.com/in/mjmadhu"}
+
+Q: What is the postContent for the post with postUrl 'https://linkedin.com/in/mjmadhu'?
+A: {"answer": "Looking for a lawyer in Bangalore.", "postUrl": "https://linkedin.com/in/mjmadhu"}
+"""
+
+def render_prompt(query, structured):
+    return f"""{FEW_SHOT_JSON if STRUCTURED else FEW_SHOT}
 
 Posts:
 {structured}
@@ -68,11 +88,22 @@ Posts:
 Q: {query}
 A:"""
 
+def build_prompt_with_docs(query, docs):
+    # Whatever the few-shot block, question and answer don't use is left for docs
+    budget = llm.n_ctx() - MAX_NEW_TOKENS - token_counter.count(render_prompt(query, ""))
+    structured, _ = pack_docs(query, docs, token_counter, budget)
+    return render_prompt(query, structured)
+
 # -----------------------------
 # 5. LLaMA Inference Function
 # -----------------------------
 def your_llama_generate(prompt):
-    output = llm(prompt, max_tokens=150, stop=["Q:", "\n\n"])
+    if STRUCTURED:
+        # The grammar ends generation as soon as the JSON object closes
+        output = llm(prompt, max_tokens=MAX_NEW_TOKENS, grammar=get_grammar(ANSWER_SCHEMA, ("answer", "postUrl")))
+        answer, _ = parse_structured(output["choices"][0]["text"])
+        return answer
+    output = llm(prompt, max_tokens=MAX_NEW_TOKENS, stop=["Q:", "\n\n"])
     return output["choices"][0]["text"].strip()
 
 # -----------------------------
@@ -0,0 +1,136 @@
+# aggregates.py
+#
+# Corpus-wide statistics kept per snapshot so aggregate questions ("average
+# likecount", "most common type of post", "distinct authors with text posts")
+# are answered from counters instead of a scan. Every statistic is a sum or a
+# count, so a record can be added or removed in O(1) and the pipeline keeps
+# them current across upserts without recomputing. Group-bys per author,
+# type and month carry post counts and engagement totals.
+#
+# Published as aggregates.json next to raw_metadata.json in each snapshot.
+
+from collections import Counter
+
+from unidecode import unidecode
+
+from schema import count_value, normalized_field, post_datetime
+
+AGGREGATES_FILE = "aggregates.json"
+ENGAGEMENT = ['likeCount', 'commentCount', 'repostCount']
+GROUP_BY = ['author', 'type', 'month']
+
+def normalize_text(text):
+    if not text:
+        return ""
+    return unidecode(text).lower().strip()
+
+def group_keys(row):
+    dt = post_datetime(row)
+    return {
+        'author': normalized_field(row, 'author'),
+        'type': normalize_text(row.get('type', '')),
+        'month': dt.strftime("%Y-%m") if dt else '',
+    }
+
+class Aggregates:
+    def __init__(self):
+        self.rows = 0
+        self.like_sum = 0
+        self.like_n = 0
+        self.type_counts = Counter()
+        # author -> number of their Text posts; distinct authors = non-zero keys
+        self.text_authors = Counter()
+        self.groups = {by: {} for by in GROUP_BY}
+
+    @classmethod
+    def from_rows(cls, rows):
+        agg = cls()
+        for row in rows:
+            agg.add(row)
+        return agg
+
+    def _apply(self, row, sign):
+        self.rows += sign
+        likes = count_value(row, 'likeCount')
+        if likes is not None:
+            self.like_sum += sign * likes
+            self.like_n += sign
+        post_type = row.get('type')
+        if post_type:
+            self._bump(self.type_counts, normalize_text(post_type), sign)
+        if normalize_text(row.get('type', '')) == 'text':
+            self._bump(self.text_authors, row.get('author', ''), sign)
+
+        for by, key in group_keys(row).items():
+            if not key:
+                continue
+            stats = self.groups[by].setdefault(key, dict.fromkeys(['posts'] + ENGAGEMENT, 0))
+            stats['posts'] += sign
+            for field in ENGAGEMENT:
+                stats[field] += sign * (count_value(row, field) or 0)
+            if stats['posts'] <= 0:
+                del self.groups[by][key]
+
+    @staticmethod
+    def _bump(counter, key, sign):
+        counter[key] += sign
+        if counter[key] <= 0:
+            del counter[key]
+
+    def add(self, row):
+        self._apply(row, 1)
+
+    def remove(self, row):
+        self._apply(row, -1)
+
+    def replace(self, old, new):
+        if old is not None:
+            self.remove(old)
+        self.add(new)
+
+    # ----------------------------
+    # Answers
+    # ----------------------------
+
+    def average_likes(self):
+        return self.like_sum / self.like_n if self.like_n else None
+
+    def most_common_type(self):
+        common = self.type_counts.most_common(1)
+        return common[0][0] if common else None
+
+    def distinct_text_authors(self):
+        return len(self.text_authors)
+
+    def group(self, by, key=None):
+        # by in GROUP_BY; one group's stats, or all of them
+        groups = self.groups[by]
+        return groups if key is None else groups.get(key)
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+
+    def to_dict(self):
+        return {
+            "rows": self.rows,
+            "like_sum": self.like_sum,
+            "like_n": self.like_n,
+            "type_counts": dict(self.type_counts),
+            "text_authors": dict(self.text_authors),
+            "groups": self.groups,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        agg = cls()
+        agg.rows = data["rows"]
+        agg.like_sum = data["like_sum"]
+        agg.like_n = data["like_n"]
+        agg.type_counts = Counter(data["type_counts"])
+        agg.text_authors = Counter(data["text_authors"])
+        agg.groups = {by: data["groups"].get(by, {}) for by in GROUP_BY}
+        return agg
+
+def get_aggregates(metadata):
+    return getattr(metadata, 'aggregates', None)
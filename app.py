@@ -1,22 +1,52 @@
 import streamlit as st
 import csv
-import json
-import os
-from openai import OpenAI
 from dotenv import load_dotenv
+from llm_runtime import chat
+from partitions import bind_tenant, get_partition
+from semantic_cache import SEMANTIC_CACHE, get_cache
+from tracing import mark_intent, set_attr, span, start_metrics_server, trace
 
 load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
 
-def load_metadata():
-    with open("raw_metadata.json", "r", encoding="utf-8") as f:
-        return json.load(f)
+def current_tenant():
+    # The app serves the tenant its deployment is configured with (TENANT);
+    # ?tenant= in the URL is only accepted when it names that same tenant
+    return bind_tenant(st.query_params.get("tenant"), keys={})
 
-from linkedin_filter import apply_filters, format_results
+from linkedin_filter import filter_cursor, format_page
 from linkedin_query_answer import answer_linkedin_query
 
+def answer_question(metadata, question):
+    with span("answer_linkedin_query"):
+        answer = answer_linkedin_query(metadata, question)
+    if answer and "could not find" not in answer.lower():
+        return {"answer": answer, "cursor": None}
+    with span("apply_filters"):
+        cursor = filter_cursor(metadata, question)
+    return {"answer": None, "cursor": cursor}
+
+def run_query(question, tenant):
+    # Runs once per (tenant, question, snapshot); paging reruns reuse the stored cursor
+    with span("load_metadata"):
+        # Tenant's latest published snapshot with its indexes; the default tenant
+        # falls back to raw_metadata.json from build_index.py
+        partition = get_partition(tenant)
+    if not SEMANTIC_CACHE:
+        return dict(answer_question(partition.metadata, question), page=0)
+    # A paraphrase of an earlier question reuses its answer (and cursor);
+    # the engines' own intent replaces this one when the cache misses
+    mark_intent("cache.hit")
+    with span("semantic_cache"):
+        result = get_cache(tenant).get_or_compute(
+            question, lambda: answer_question(partition.metadata, question), partition.key
+        )
+    return dict(result, page=0)
+
+def turn_page(step):
+    st.session_state["query"]["page"] += step
+
 def main():
+    start_metrics_server()
     st.set_page_config(page_title="LinkedIn Profile Assistant", page_icon="🔍", layout="wide")
     
     # CSS styles
@@ -39,6 +69,12 @@ def main():
     [data-testid="stColumn"] .stMarkdown p {
         color: black !important;
     }
+    [data-testid="stColumn"] [data-testid="stColumn"] {
+        background: none;
+        padding: 0;
+        margin-bottom: 0;
+        min-height: 0;
+    }
     .header-flex {
         display: flex;
         justify-content: space-between;
@@ -66,8 +102,6 @@ def main():
 
     st.markdown('<div class="title-centered">Klype LinkedIn Profile Assistant</div>', unsafe_allow_html=True)
 
-    metadata = load_metadata()
-
     col1, col2 = st.columns(2)
 
     with col1:
@@ -81,18 +115,48 @@ def main():
         )
 
         if question and question.strip():
-            answer = answer_linkedin_query(metadata, question)
-            if answer and "could not find" not in answer.lower():
-                st.markdown("### LLM Answer:")
-                st.markdown(f'<div class="response-box">{answer}</div>', unsafe_allow_html=True)
-            else:
-                filtered_results = apply_filters(metadata, question)
-                if filtered_results:
-                    st.markdown("### Filtered Results:")
-                    formatted_text = format_results(filtered_results)
-                    st.markdown(formatted_text, unsafe_allow_html=True)
-                else:
-                    st.warning("No matching results found.")
+            try:
+                tenant = current_tenant()
+                partition = get_partition(tenant)
+            except PermissionError:
+                st.error("Not allowed to read this tenant")
+                partition = None
+            except (FileNotFoundError, ValueError):
+                # A deployment whose tenant has no data (or a malformed TENANT) is not a crash
+                st.error("Unknown tenant")
+                partition = None
+            if partition is not None:
+                key = (tenant, question, partition.key)
+                state = st.session_state.get("query")
+                fresh = state is None or state["key"] != key
+                with trace("query" if fresh else "page", tenant=tenant):
+                    if fresh:
+                        state = run_query(question, tenant)
+                        state["key"] = key
+                        st.session_state["query"] = state
+                    if state["answer"]:
+                        with span("render"):
+                            st.markdown("### LLM Answer:")
+                            st.markdown(f'<div class="response-box">{state["answer"]}</div>', unsafe_allow_html=True)
+                    elif state["cursor"]:
+                        cursor, page = state["cursor"], state["page"]
+                        with span("format_results", page=page):
+                            formatted_text = format_page(cursor, page)
+                        # Matches pulled so far; exact only once the cursor is exhausted
+                        set_attr("results", cursor.count()[0])
+                        with span("render"):
+                            st.markdown("### Filtered Results:")
+                            st.markdown(formatted_text, unsafe_allow_html=True)
+                        has_next = cursor.has_next(page)
+                        if page > 0 or has_next:
+                            prev_col, info_col, next_col = st.columns([1, 2, 1])
+                            prev_col.button("← Previous", disabled=page == 0, on_click=turn_page, args=(-1,))
+                            # The page count is only shown once every match has been pulled
+                            exact = cursor.count()[1]
+                            info_col.markdown(f"Page {page + 1} of {cursor.page_count()}" if exact else f"Page {page + 1}")
+                            next_col.button("Next →", disabled=not has_next, on_click=turn_page, args=(1,))
+                    else:
+                        st.warning("No matching results found.")
         else:
             st.info("Enter a question above to get answers or filtered results.")
 
@@ -109,10 +173,10 @@ def main():
             if not user_prompt.strip():
                 st.warning("Please enter a valid prompt.")
             else:
-                with st.spinner("Generating your post..."):
+                with st.spinner("Generating your post..."), trace("generate"):
                     try:
-                        response = client.chat.completions.create(
-                            model="gpt-4",
+                        # Sampled and unseeded: every click is a new draft, never a cached one
+                        post_content = chat(
                             messages=[
                                 {"role": "system", "content": "You are a professional LinkedIn post writer."},
                                 {"role": "user", "content": user_prompt}
@@ -120,7 +184,6 @@ def main():
                             temperature=0.7,
                             max_tokens=300
                         )
-                        post_content = response.choices[0].message.content.strip()
 
                         st.markdown("### Generated Post")
                         st.markdown(f'<div class="response-box">{post_content}</div>', unsafe_allow_html=True)
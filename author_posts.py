@@ -0,0 +1,219 @@
+# author_posts.py
+#
+# Secondary index from normalized author to that author's post ids, kept in
+# three orders:
+#
+#   id          ascending, i.e. the order a scan of the snapshot returns them
+#   date        newest first (postTimestamp), untimed posts last
+#   engagement  most likes first, then most comments (linkedin_filter's ranking)
+#
+# so per-author counts are O(1) and listings / top-k are slices. Ties keep
+# id order. Like aggregates.py it supports add/remove/replace, so the
+# pipeline keeps it current across upserts (ids are store ids) and publishes
+# it as author_posts.json; a loaded partition remaps those ids to row
+# positions. Built from a plain list of rows, ids are positions directly.
+#
+# A loaded partition never updates it, so the columnar layout keeps a
+# FrozenAuthorPosts (freeze()) instead: the same lookups over flat id arrays,
+# a few bytes per post rather than a dict entry and three sort-key tuples.
+
+import heapq
+import math
+from array import array
+from bisect import bisect_left, insort
+
+from schema import count_value, normalized_field, post_datetime
+
+AUTHOR_POSTS_FILE = "author_posts.json"
+ORDERS = ['id', 'date', 'engagement']
+
+def post_stats(row):
+    dt = post_datetime(row)
+    return (
+        dt.timestamp() if dt else None,
+        count_value(row, 'likeCount') or 0,
+        count_value(row, 'commentCount') or 0,
+    )
+
+def _sort_keys(post_id, stats):
+    ts, likes, comments = stats
+    return {
+        'id': post_id,
+        'date': (math.inf if ts is None else -ts, post_id),
+        'engagement': (-likes, -comments, post_id),
+    }
+
+class AuthorPosts:
+    def __init__(self):
+        # author -> {post id: (timestamp, likes, comments)}
+        self.posts = {}
+        # author -> order -> sorted sort keys; the post id is always the last part
+        self.orders = {}
+
+    @classmethod
+    def from_rows(cls, rows):
+        return cls.from_records(enumerate(rows))
+
+    @classmethod
+    def from_records(cls, records):
+        # (post id, row) pairs; lists are sorted once at the end
+        index = cls()
+        for post_id, row in records:
+            author = normalized_field(row, 'author')
+            if author:
+                index.posts.setdefault(author, {})[post_id] = post_stats(row)
+        for author in index.posts:
+            index._sort(author)
+        return index
+
+    def _sort(self, author):
+        keys = [_sort_keys(post_id, stats) for post_id, stats in self.posts[author].items()]
+        self.orders[author] = {order: sorted(k[order] for k in keys) for order in ORDERS}
+
+    # ----------------------------
+    # Incremental updates
+    # ----------------------------
+
+    def add(self, post_id, row):
+        author = normalized_field(row, 'author')
+        if not author:
+            return
+        stats = post_stats(row)
+        posts = self.posts.setdefault(author, {})
+        if post_id in posts:
+            self._discard(author, post_id)
+            posts = self.posts.setdefault(author, {})
+        posts[post_id] = stats
+        orders = self.orders.setdefault(author, {order: [] for order in ORDERS})
+        for order, key in _sort_keys(post_id, stats).items():
+            insort(orders[order], key)
+
+    def remove(self, post_id, row):
+        author = normalized_field(row, 'author')
+        if author and post_id in self.posts.get(author, {}):
+            self._discard(author, post_id)
+
+    def _discard(self, author, post_id):
+        stats = self.posts[author].pop(post_id)
+        for order, key in _sort_keys(post_id, stats).items():
+            keys = self.orders[author][order]
+            del keys[bisect_left(keys, key)]
+        if not self.posts[author]:
+            del self.posts[author]
+            del self.orders[author]
+
+    def replace(self, post_id, old, new):
+        if old is not None:
+            self.remove(post_id, old)
+        self.add(post_id, new)
+
+    # ----------------------------
+    # Lookups
+    # ----------------------------
+
+    def count(self, author):
+        return len(self.posts.get(author, ()))
+
+    def ids(self, author, order='id', start=0, stop=None):
+        keys = self.orders.get(author, {}).get(order, [])[start:stop]
+        return keys if order == 'id' else [k[-1] for k in keys]
+
+    def page(self, author, number, page_size=10, order='date'):
+        # Zero-based page number; an out-of-range page is empty
+        start = max(0, number) * page_size
+        return self.ids(author, order, start, start + page_size)
+
+    def top(self, author, k, order='engagement'):
+        return self.ids(author, order, 0, k)
+
+    def merged(self, authors, order='id'):
+        # Several authors' posts as one listing in the given order, merged lazily
+        keys = heapq.merge(*(self.orders.get(a, {}).get(order, []) for a in authors))
+        return keys if order == 'id' else (k[-1] for k in keys)
+
+    def authors(self):
+        return list(self.posts)
+
+    def freeze(self):
+        return FrozenAuthorPosts(self)
+
+    def remap(self, mapping):
+        # Same index over other ids (store id -> row position); ids missing
+        # from the mapping are dropped
+        index = AuthorPosts()
+        for author, posts in self.posts.items():
+            moved = {mapping[i]: stats for i, stats in posts.items() if i in mapping}
+            if moved:
+                index.posts[author] = moved
+                index._sort(author)
+        return index
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+
+    def to_dict(self):
+        # JSON keys are strings, so each author's posts are [id, ts, likes, comments] lists
+        return {author: [[i, *stats] for i, stats in posts.items()] for author, posts in self.posts.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        index = cls()
+        for author, posts in data.items():
+            index.posts[author] = {p[0]: tuple(p[1:]) for p in posts}
+            index._sort(author)
+        return index
+
+class FrozenAuthorPosts:
+    # Read-only AuthorPosts. Each order is one array of ids, every author's
+    # posts a contiguous span of it; the sort stats live in arrays indexed by
+    # post id so merged() can compare posts of different authors
+    def __init__(self, index):
+        self.spans = {}
+        self.order_ids = {order: array('i') for order in ORDERS}
+        size = 1 + max((max(posts) for posts in index.posts.values()), default=-1)
+        self.timestamps = array('d', [math.nan]) * size
+        self.likes = array('d', [0.0]) * size
+        self.comments = array('d', [0.0]) * size
+        for author, posts in index.posts.items():
+            start = len(self.order_ids['id'])
+            self.spans[author] = (start, start + len(posts))
+            for order in ORDERS:
+                self.order_ids[order].extend(index.ids(author, order))
+            for post_id, (ts, likes, comments) in posts.items():
+                self.timestamps[post_id] = math.nan if ts is None else ts
+                self.likes[post_id] = likes
+                self.comments[post_id] = comments
+        # Same keys as _sort_keys, rebuilt from the arrays
+        self.sort_keys = {
+            'id': None,
+            'date': lambda i: (math.inf if math.isnan(self.timestamps[i]) else -self.timestamps[i], i),
+            'engagement': lambda i: (-self.likes[i], -self.comments[i], i),
+        }
+
+    def count(self, author):
+        start, stop = self.spans.get(author, (0, 0))
+        return stop - start
+
+    def _span(self, author, order):
+        start, stop = self.spans.get(author, (0, 0))
+        return self.order_ids[order][start:stop]
+
+    def ids(self, author, order='id', start=0, stop=None):
+        return self._span(author, order)[start:stop].tolist()
+
+    def page(self, author, number, page_size=10, order='date'):
+        start = max(0, number) * page_size
+        return self.ids(author, order, start, start + page_size)
+
+    def top(self, author, k, order='engagement'):
+        return self.ids(author, order, 0, k)
+
+    def merged(self, authors, order='id'):
+        return heapq.merge(*(self._span(a, order) for a in authors), key=self.sort_keys[order])
+
+    def authors(self):
+        return list(self.spans)
+
+def get_author_posts(metadata):
+    return getattr(metadata, 'author_posts', None)
@@ -0,0 +1,67 @@
+# batch.py
+#
+# Shared work for batches of questions (eval jobs, bulk API calls). Asking an
+# engine hundreds of questions in a loop repeats the same lookups, and on a
+# plain list every lookup is a full scan that normalizes each row again.
+# run_batch parses every question first and groups the lookups their branches
+# will make by kind (author, keyword, month, ...). Each group is resolved at
+# once: with an index, one lookup per distinct argument; without one, a single
+# pass over the rows that normalizes the row's field once and tests every
+# argument of the group against it. The engine then answers each distinct
+# question as usual and its lookup functions take their rows from that table
+# (see prefetched), so batch answers are exactly the loop's answers.
+
+import contextvars
+
+from metadata_index import get_index
+
+_lookups = contextvars.ContextVar("batch_lookups", default=None)
+
+def prefetched(kind, arg):
+    # Rows resolved for this lookup by the running batch, else None
+    lookups = _lookups.get()
+    if lookups is None:
+        return None
+    return lookups.get((kind, arg))
+
+def grouped_scan(metadata, needles, value, match):
+    # needles: arg -> prepared needle. One pass; value(row) is computed once
+    # per row and match(needle, value) decides each arg
+    hits = {arg: [] for arg in needles}
+    items = list(needles.items())
+    for row in metadata:
+        v = value(row)
+        for arg, needle in items:
+            if match(needle, v):
+                hits[arg].append(row)
+    return hits
+
+def resolve(metadata, wanted, kinds):
+    # wanted: kind -> args; kinds: kind -> (lookup, prepare, value, match),
+    # where lookup(metadata, arg) is the engine's own (index-aware) function
+    indexed = get_index(metadata) is not None
+    lookups = {}
+    for kind, args in wanted.items():
+        lookup, prepare, value, match = kinds[kind]
+        if indexed:
+            found = {arg: lookup(metadata, arg) for arg in args}
+        else:
+            found = grouped_scan(metadata, {arg: prepare(arg) for arg in args}, value, match)
+        for arg, rows in found.items():
+            lookups[(kind, arg)] = rows
+    return lookups
+
+def run_batch(metadata, questions, answer, parse, kinds):
+    # parse(question) -> [(kind, arg), ...] the question's branch will look up;
+    # a wrong guess only costs a wasted prefetch, never a different answer
+    unique = list(dict.fromkeys(questions))
+    wanted = {}
+    for question in unique:
+        for kind, arg in parse(question):
+            wanted.setdefault(kind, set()).add(arg)
+    token = _lookups.set(resolve(metadata, wanted, kinds))
+    try:
+        answers = {question: answer(metadata, question) for question in unique}
+    finally:
+        _lookups.reset(token)
+    return [answers[question] for question in questions]
@@ -0,0 +1,98 @@
+# bench_embeddings.py
+#
+# Parity and CPU throughput of the embedding backends on the same texts
+# (row_to_text of raw_metadata.json rows, or a synthetic corpus when there
+# is none). Every backend is compared to --reference (the torch model) by
+# per-text cosine similarity and by how many of each text's 10 nearest
+# neighbours it keeps, which is what FAISS search sees. Exits non-zero when a
+# backend's minimum cosine is below --min-cosine. Backends load in the order
+# given, so torch_imported is only meaningful for those before the torch one.
+#
+#   python export_onnx.py
+#   python bench_embeddings.py --backends onnx sentence-transformers --texts 2000
+#   EMBED_POOLING=mean python bench_embeddings.py --backends llama sentence-transformers
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from build_index import row_to_text
+from embedder import get_embedder
+
+def load_texts(path, limit):
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f)
+    else:
+        from benchmarks.corpus import generate_corpus
+        rows = generate_corpus(limit)
+    return [row_to_text(r) for r in rows[:limit]]
+
+def neighbours(embeddings, k):
+    unit = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+    sims = unit @ unit.T
+    np.fill_diagonal(sims, -np.inf)
+    return np.argsort(-sims, axis=1)[:, :k]
+
+def bench_backend(name, texts, repeat):
+    start = time.perf_counter()
+    embedder = get_embedder(name)
+    load_s = time.perf_counter() - start
+    embedder.encode(texts[:8])  # warm-up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        embeddings = embedder.encode(texts)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return embeddings, {
+        "load_s": round(load_s, 2),
+        "texts_per_s": round(len(texts) / best, 1),
+        "ms_per_text": round(best / len(texts) * 1000, 3),
+        "torch_imported": "torch" in sys.modules,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare embedding backends")
+    parser.add_argument("--backends", nargs="+", default=["onnx", "sentence-transformers"])
+    parser.add_argument("--reference", default="sentence-transformers")
+    parser.add_argument("--data", default="raw_metadata.json")
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    args = parser.parse_args()
+
+    texts = load_texts(args.data, args.texts)
+    results = {"texts": len(texts), "reference": args.reference, "backends": {}}
+    embeddings = {}
+    for name in args.backends:
+        embeddings[name], results["backends"][name] = bench_backend(name, texts, args.repeat)
+
+    ok = True
+    ref = embeddings.get(args.reference)
+    if ref is not None:
+        ref_nn = neighbours(ref, args.k)
+        for name, emb in embeddings.items():
+            if name == args.reference:
+                continue
+            cos = np.sum(ref * emb, axis=1) / (np.linalg.norm(ref, axis=1) * np.linalg.norm(emb, axis=1) + 1e-12)
+            nn = neighbours(emb, args.k)
+            overlap = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(ref_nn, nn)])
+            results["backends"][name].update({
+                "cosine_min": round(float(cos.min()), 4),
+                "cosine_mean": round(float(cos.mean()), 4),
+                f"top{args.k}_overlap": round(float(overlap), 3),
+            })
+            ok = ok and cos.min() >= args.min_cosine
+
+    print(json.dumps(results, indent=2))
+    if not ok:
+        sys.exit(f"Embedding parity below --min-cosine {args.min_cosine}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# bench_extract.py
+#
+# Parser microbenchmark on the saved HTML fixtures: the old BeautifulSoup
+# html.parser path (h1 + one div) against extract.extract_page with lxml
+# (full STANDARD_COLUMNS rows). --scale repeats each page's activity posts to
+# approximate a real, much larger LinkedIn page.
+
+import argparse
+import glob
+import json
+import os
+import re
+import time
+
+from bs4 import BeautifulSoup
+from extract import extract_page
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "linkedin", "in", "*.html")
+
+def parse_bs4(page_source):
+    soup = BeautifulSoup(page_source, "html.parser")
+    name = soup.find("h1").get_text(strip=True)
+    title = soup.find("div", class_="text-body-medium").get_text(strip=True)
+    return {"name": name, "title": title}
+
+def scale_page(page_source, scale):
+    posts = re.findall(r'(<div class="feed-shared-update-v2.*?</div>\s*</div>\s*(?=<div class="feed|</section>))', page_source, re.S)
+    if scale <= 1 or not posts:
+        return page_source
+    return page_source.replace("</section>\n  </main>", "".join(posts) * (scale - 1) + "</section>\n  </main>", 1)
+
+def time_parser(fn, pages, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for page in pages:
+            fn(page)
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(pages)) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark page parsing on saved fixtures")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--scale", type=int, default=50, help="repeat activity posts this many times per page")
+    args = parser.parse_args()
+
+    pages = []
+    for path in sorted(glob.glob(FIXTURES)):
+        with open(path, encoding="utf-8") as f:
+            pages.append(scale_page(f.read(), args.scale))
+
+    rows = sum(len(extract_page(p)["records"]) for p in pages)
+    results = {
+        "pages": len(pages),
+        "avg_page_kb": round(sum(len(p) for p in pages) / len(pages) / 1024, 1),
+        "rows_per_pass": rows,
+        "bs4_html_parser_us_per_page": round(time_parser(parse_bs4, pages, args.iterations), 1),
+        "lxml_xpath_us_per_page": round(time_parser(extract_page, pages, args.iterations), 1),
+    }
+    results["speedup"] = round(results["bs4_html_parser_us_per_page"] / results["lxml_xpath_us_per_page"], 2)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# bench_load.py
+#
+# Closed-loop load test against a running service.py instance: N client
+# threads send a mix of /query and /filter requests for a fixed duration and
+# the script reports throughput and latency percentiles per endpoint.
+#
+#   uvicorn service:app --port 8000 &
+#   python bench_load.py --url http://127.0.0.1:8000 --concurrency 32 --duration 30
+#
+#   # or let the script start a local instance first
+#   python bench_load.py --start --concurrency 32
+
+import argparse
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+QUESTIONS = {
+    "/query": [
+        "What is the most common type of post?",
+        "What is the average number of likes?",
+        "Who has the most followers?",
+        "How many followers does Madhuri Jain have",
+        "Give me profile details of Ashish Shah",
+    ],
+    "/filter": [
+        "Show profiles with followers over 5000",
+        "Show posts from March 2024",
+        "Which post has the most likes?",
+        "anything on hiring or leadership",
+        "Profiles whose description mentions data scientist",
+    ],
+}
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+def wait_for_health(url, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{url}/health", timeout=2).ok:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+def worker(url, tenant, mix, stop_at, results, lock, seed, api_key=None):
+    rng = random.Random(seed)
+    session = requests.Session()
+    if api_key:
+        session.headers["X-API-Key"] = api_key
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+    local = []
+    while time.monotonic() < stop_at:
+        endpoint = rng.choices(list(mix), weights=list(mix.values()))[0]
+        body = {"question": rng.choice(QUESTIONS[endpoint])}
+        if tenant:
+            body["tenant"] = tenant
+        start = time.perf_counter()
+        try:
+            ok = session.post(f"{url}{endpoint}", json=body, timeout=30).ok
+        except requests.RequestException:
+            ok = False
+        local.append((endpoint, time.perf_counter() - start, ok))
+    with lock:
+        results.extend(local)
+
+def run(url, concurrency, duration, tenant=None, mix=None, api_key=None):
+    mix = mix or {"/query": 1, "/filter": 1}
+    results, lock = [], threading.Lock()
+    stop_at = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=worker, args=(url, tenant, mix, stop_at, results, lock, i, api_key))
+        for i in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"{len(results)} requests in {elapsed:.1f}s with {concurrency} clients: {len(results) / elapsed:.1f} req/s")
+    for endpoint in sorted(set(e for e, _, _ in results)):
+        latencies = [d for e, d, ok in results if e == endpoint and ok]
+        errors = sum(1 for e, _, ok in results if e == endpoint and not ok)
+        print(
+            f"  {endpoint:<8} {len(latencies) / elapsed:8.1f} req/s   "
+            f"p50 {percentile(latencies, 50) * 1000:8.1f} ms   "
+            f"p95 {percentile(latencies, 95) * 1000:8.1f} ms   "
+            f"p99 {percentile(latencies, 99) * 1000:8.1f} ms   errors {errors}"
+        )
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the LinkedIn service")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--tenant", default=None)
+    parser.add_argument("--api-key", default=None, help="X-API-Key, when the service binds tenants to keys")
+    parser.add_argument("--query-weight", type=float, default=1.0)
+    parser.add_argument("--filter-weight", type=float, default=1.0)
+    parser.add_argument("--start", action="store_true", help="start a local uvicorn service:app first")
+    args = parser.parse_args()
+
+    server = None
+    if args.start:
+        port = args.url.rsplit(":", 1)[-1].rstrip("/")
+        server = subprocess.Popen([sys.executable, "-m", "uvicorn", "service:app", "--port", port, "--log-level", "warning"])
+    try:
+        if not wait_for_health(args.url):
+            sys.exit(f"Service at {args.url} is not healthy")
+        # One request per endpoint so first-call costs stay out of the numbers
+        for endpoint, questions in QUESTIONS.items():
+            requests.post(f"{args.url}{endpoint}", json={"question": questions[0], "tenant": args.tenant},
+                          headers={"X-API-Key": args.api_key} if args.api_key else None, timeout=60)
+        run(args.url, args.concurrency, args.duration, args.tenant,
+            {"/query": args.query_weight, "/filter": args.filter_weight}, args.api_key)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
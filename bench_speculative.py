@@ -0,0 +1,92 @@
+# bench_speculative.py
+#
+# Compares plain decoding against speculative decoding for local post
+# generation on the same prompts. Usage:
+#
+#   python bench_speculative.py --draft prompt-lookup
+#   python bench_speculative.py --draft models/tinyllama-1.1b.Q4_K_M.gguf
+
+import argparse
+import json
+import time
+
+from genpost import build_messages
+from llm_runtime import LLAMA_DRAFT, LLAMA_DRAFT_TOKENS, LLAMA_N_CTX, LLAMA_N_THREADS, load_local_llm
+
+PROMPTS = [
+    "I just got promoted to Senior Data Engineer at my company.",
+    "Our team shipped a new search feature that cut query latency in half.",
+    "I completed the AWS Solutions Architect certification this weekend.",
+    "We are hiring backend engineers in Bangalore.",
+    "Lessons learned from my first year as an engineering manager.",
+]
+
+def run(llm, draft_stats, prompts, max_tokens, temperature):
+    total_tokens = 0
+    total_time = 0.0
+    accepted_rates = []
+    for prompt in prompts:
+        if draft_stats is not None:
+            draft_stats.reset()
+        start = time.perf_counter()
+        response = llm.create_chat_completion(
+            messages=build_messages(prompt),
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+        elapsed = time.perf_counter() - start
+        n = response["usage"]["completion_tokens"]
+        total_tokens += n
+        total_time += elapsed
+        if draft_stats is not None:
+            accepted_rates.append(draft_stats.acceptance_rate(n))
+    result = {
+        "tokens": total_tokens,
+        "seconds": round(total_time, 3),
+        "tokens_per_s": round(total_tokens / total_time, 2) if total_time else 0.0,
+    }
+    if accepted_rates:
+        result["acceptance_rate"] = round(sum(accepted_rates) / len(accepted_rates), 3)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark speculative decoding for genpost")
+    parser.add_argument("--draft", default=LLAMA_DRAFT or "prompt-lookup",
+                        help='"prompt-lookup" or path to a draft GGUF sharing the target vocabulary')
+    parser.add_argument("--max-tokens", type=int, default=400)
+    # Greedy by default so both modes produce the same text
+    parser.add_argument("--temperature", type=float, default=0.0)
+    parser.add_argument("--out", default=None, help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    from speculative import make_draft_model
+
+    # Llama() only turns on logits_all when it is given a draft_model; the
+    # draft is swapped in below, so ask for it up front. Both runs then use
+    # the same settings and the drafted tokens are checked against real logits
+    llm = load_local_llm(draft=None, logits_all=True)
+    draft_stats = make_draft_model(args.draft, LLAMA_DRAFT_TOKENS, n_ctx=LLAMA_N_CTX, n_threads=LLAMA_N_THREADS)
+
+    # Warm-up so model load and first-eval costs don't land in either run
+    llm.create_chat_completion(messages=build_messages(PROMPTS[0]), max_tokens=8)
+
+    llm.draft_model = None
+    baseline = run(llm, None, PROMPTS, args.max_tokens, args.temperature)
+    llm.draft_model = draft_stats
+    speculative = run(llm, draft_stats, PROMPTS, args.max_tokens, args.temperature)
+
+    results = {
+        "draft": args.draft,
+        "num_pred_tokens": LLAMA_DRAFT_TOKENS,
+        "prompts": len(PROMPTS),
+        "baseline": baseline,
+        "speculative": speculative,
+        "speedup": round(speculative["tokens_per_s"] / baseline["tokens_per_s"], 2) if baseline["tokens_per_s"] else None,
+    }
+    print(json.dumps(results, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+# benchmarks
+#
+# Performance suite for the query engines:
+#
+#   python -m benchmarks.run_engines --rows 10000 100000
+#   python -m benchmarks.run_engines --rows 10000 --compare benchmarks/results/<old>.json
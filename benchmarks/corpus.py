@@ -0,0 +1,134 @@
+# benchmarks/corpus.py
+#
+# Synthetic LinkedIn-like corpora with realistic field shapes: a few prolific
+# authors and a long tail, log-normal followers, engagement correlated with
+# audience size, a skewed post-type mix and two years of post dates.
+
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+from schema import normalize_name
+
+FIRST_NAMES = [
+    "Madhuri", "Ashish", "Charanjeet", "Sadagopan", "Priya", "Rahul", "Ananya", "Vikram", "Sneha", "Arjun",
+    "Kavya", "Rohan", "Isha", "Karan", "Meera", "Aditya", "Neha", "Siddharth", "Pooja", "Nikhil",
+    "Emily", "James", "Sofia", "Lucas", "Olivia", "Mateo", "Chloe", "Noah", "Zara", "Ethan",
+]
+LAST_NAMES = [
+    "Jain", "Shah", "Kaur", "Rajaram", "Sharma", "Verma", "Iyer", "Reddy", "Nair", "Gupta",
+    "Menon", "Patel", "Singh", "Das", "Kapoor", "Chopra", "Bose", "Mehta", "Rao", "Joshi",
+    "Smith", "Garcia", "Müller", "Rossi", "Dubois", "Silva", "Kowalski", "Novak", "Tanaka", "Kim",
+]
+ROLES = [
+    "Full Stack Developer", "Backend Engineer", "Data Scientist", "Product Manager", "Legal Counsel",
+    "Engineering Manager", "DevOps Engineer", "UX Designer", "Talent Acquisition Lead", "Founder & CEO",
+    "Machine Learning Engineer", "QA Automation Engineer", "Solutions Architect", "Marketing Manager",
+]
+COMPANIES = [
+    "Microsoft", "Google", "Infosys", "TCS", "Flipkart", "Amazon", "Razorpay", "Zomato", "Accenture",
+    "Wipro", "Swiggy", "Freshworks", "Atlassian", "Stripe", "a stealth startup",
+]
+TOPICS = [
+    "hiring", "career growth", "Playwright testing", "system design", "remote work", "leadership",
+    "machine learning", "startup fundraising", "open source", "interview tips", "cloud costs",
+    "full stack development", "legal tech", "product launches", "mentorship", "data engineering",
+]
+TEMPLATES = [
+    "Excited to share that our team just shipped {topic} improvements at {company}!",
+    "{name_first} is #hiring. Know anyone who might be interested in {topic}?",
+    "New blog post on {topic}. Would love your thoughts.",
+    "Three lessons I learned about {topic} this year as a {role}.",
+    "Looking for recommendations on {topic} in Bangalore.",
+    "After {years} years at {company}, I'm starting a new chapter focused on {topic}.",
+    "Hot take: most teams get {topic} wrong. Here's what worked for us at {company}.",
+    "Thrilled to be speaking about {topic} at next week's meetup.",
+]
+POST_TYPES = [("Text", 0.55), ("Image", 0.2), ("Article", 0.1), ("Video", 0.1), ("Document", 0.05)]
+
+START_DATE = datetime(2023, 1, 1, tzinfo=timezone.utc)
+DATE_SPAN_DAYS = 730
+
+def _weighted(rng, pairs):
+    r = rng.random()
+    acc = 0.0
+    for value, weight in pairs:
+        acc += weight
+        if r <= acc:
+            return value
+    return pairs[-1][0]
+
+def _fmt_count(n, plus=False):
+    return f"{n:,}" + ("+" if plus else "")
+
+def make_profiles(n_profiles, rng):
+    profiles = []
+    seen = set()
+    for i in range(n_profiles):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if name in seen:
+            name = f"{name} {i}"
+        seen.add(name)
+        slug = normalize_name(name).replace(" ", "-")
+        followers = int(math.exp(rng.gauss(7.0, 1.6)))
+        profiles.append({
+            "name": name,
+            "profile_url": f"https://www.linkedin.com/in/{slug}",
+            "description": f"{rng.choice(ROLES)} at {rng.choice(COMPANIES)}",
+            "followers": followers,
+        })
+    return profiles
+
+def generate_corpus(rows, seed=42, typed=True, posts_per_author=20):
+    # typed=True mirrors build_index.clean_and_standardize output (int counts,
+    # their display texts, postTimestamp, authorNorm/nameNorm); typed=False
+    # mirrors the old raw strings
+    rng = random.Random(seed)
+    profiles = make_profiles(max(1, rows // posts_per_author), rng)
+    # Zipf-like author activity: a few authors post a lot
+    weights = [1.0 / (rank + 1) ** 0.9 for rank in range(len(profiles))]
+    authors = rng.choices(profiles, weights=weights, k=rows)
+
+    corpus = []
+    for i, profile in enumerate(authors):
+        topic = rng.choice(TOPICS)
+        content = rng.choice(TEMPLATES).format(
+            topic=topic, company=rng.choice(COMPANIES), role=rng.choice(ROLES),
+            name_first=profile["name"].split()[0], years=rng.randint(2, 12),
+        )
+        reach = max(1.0, profile["followers"] ** 0.6)
+        likes = int(reach * math.exp(rng.gauss(0, 0.8)))
+        comments = int(likes * rng.uniform(0.01, 0.12))
+        reposts = int(likes * rng.uniform(0.0, 0.05))
+        posted = START_DATE + timedelta(days=rng.random() * DATE_SPAN_DAYS)
+        activity = 7000000000000000000 + i
+        row = {
+            "name": profile["name"],
+            "profile_url": profile["profile_url"],
+            "author": profile["name"],
+            "authorUrl": profile["profile_url"],
+            "description": profile["description"],
+            "postContent": content,
+            "postUrl": f"https://www.linkedin.com/feed/update/urn:li:activity:{activity}",
+            "postDate": posted.strftime("%Y-%m-%d %H:%M:%S"),
+            "type": _weighted(rng, POST_TYPES),
+            "likeCount": likes,
+            "commentCount": comments,
+            "repostCount": reposts,
+            "followers": profile["followers"],
+        }
+        if typed:
+            row["postTimestamp"] = int(posted.timestamp())
+            row["authorNorm"] = normalize_name(row["author"])
+            row["nameNorm"] = normalize_name(row["name"])
+            row["likeCountText"] = _fmt_count(likes)
+            row["commentCountText"] = _fmt_count(comments)
+            row["repostCountText"] = _fmt_count(reposts)
+            row["followersText"] = _fmt_count(profile["followers"], plus=profile["followers"] > 500)
+        else:
+            row["likeCount"] = _fmt_count(likes)
+            row["commentCount"] = _fmt_count(comments)
+            row["repostCount"] = _fmt_count(reposts)
+            row["followers"] = _fmt_count(profile["followers"], plus=profile["followers"] > 500)
+        corpus.append(row)
+    return corpus
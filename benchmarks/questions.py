@@ -0,0 +1,97 @@
+# benchmarks/questions.py
+#
+# Fixed question mix per engine, one or more questions for every intent
+# branch the engine can reach. Names, URLs and months are drawn from the
+# corpus so lookups hit real rows. Branches that an earlier regex always
+# shadows (linkedin_filter's role+followers, query_utils' "reposted by") are
+# left out since no question can reach them.
+
+import random
+from datetime import datetime
+
+NO_MATCH = "zzqx blorp"
+
+def sample_values(corpus, seed=7):
+    rng = random.Random(seed)
+    row = rng.choice(corpus)
+    # A second row from a different author for the author+URL question
+    other = rng.choice(corpus)
+    dt = datetime.strptime(row["postDate"], "%Y-%m-%d %H:%M:%S")
+    return {
+        "name": row["name"],
+        "author": other["author"],
+        "post_url": row["postUrl"],
+        "author_post_url": other["postUrl"],
+        "profile_url": row["profile_url"],
+        "month": dt.strftime("%B"),
+        "year": dt.year,
+    }
+
+LINKEDIN_FILTER = [
+    ("filter.author_posts", "Give me posts by {name}"),
+    ("filter.followers_threshold", "Show profiles with followers over 5000"),
+    ("filter.description_attribute", "Profiles whose description mentions data scientist"),
+    ("filter.quoted_keyword", "Show posts mention \"system design\""),
+    ("filter.month_year", "Show posts from {month} {year}"),
+    ("filter.month_year", "Show posts in {month}"),
+    ("filter.max_likes", "Which post has the most likes?"),
+    ("filter.max_comments", "Which post has the highest comments?"),
+    ("filter.post_url", "Show the post with postUrl\"{post_url}\""),
+    ("filter.distinct_text_authors", "How many distinct authors have Text posts?"),
+    ("filter.keyword_fallback", "anything on kubernetes or playwright"),
+    ("filter.no_match", NO_MATCH),
+]
+
+LINKEDIN_QUERY_ANSWER = [
+    ("answer.profile_details", "Give me profile details of {name}"),
+    ("answer.name_title_by_profile_url", "What is the name and title of the person with profile URL {profile_url}"),
+    ("answer.followers_by_name", "How many followers does {name} have"),
+    ("answer.content_by_post_url", "What is the postContent of the post with postUrl {post_url}"),
+    ("answer.type_by_post_url", "What type of post is {post_url}"),
+    ("answer.likes_by_author_and_url", "What is the likeCount of the post authored by {author}, postUrl {author_post_url}"),
+    ("answer.author_by_keyword", "Who is the author of the post mentioning mentorship"),
+    ("answer.most_common_type", "What is the most common type of post?"),
+    ("answer.post_count_by_author", "How many posts were made by {name}"),
+    ("answer.average_likes", "What is the average number of likes?"),
+    ("answer.details_by_keyword", "Give me details of a post that mentions leadership"),
+    ("answer.max_followers", "Who has the most followers?"),
+    ("answer.max_likes", "Which post has the most likes?"),
+    ("answer.max_comments", "Which post has the most comments?"),
+    ("answer.quoted_keyword", "Anything about \"system design\"?"),
+    ("answer.any_keyword", "kubernetes migration hiring"),
+    ("answer.no_answer", NO_MATCH),
+]
+
+QA_ENGINE = [
+    ("qa.author_posts", "posts by {name}"),
+    ("qa.followers_threshold", "followers over 5000"),
+    ("qa.keyword", "posts about system design"),
+    ("qa.month_year", "posts from {month} {year}"),
+    ("qa.distinct_text_authors", "how many distinct authors have text posts"),
+    ("qa.max_article_likes", "highest likeCount article"),
+    ("qa.fallback", NO_MATCH),
+]
+
+QUERY_UTILS = [
+    ("utils.person", "details of {name}"),
+    ("utils.followers_threshold", "followers over 5000"),
+    ("utils.description_attribute", "role is data scientist"),
+    ("utils.quoted_keyword", "posts mention \"system design\""),
+    ("utils.month_year", "posts from {month} {year}"),
+    ("utils.max_article_likes", "highest likeCount article"),
+    ("utils.post_url", "postUrl\"{post_url}\""),
+    ("utils.two_quoted_description", "is there a \"microsoft\" \"full stack developer\""),
+    ("utils.distinct_text_authors", "how many distinct authors have text posts"),
+    ("utils.fallback", NO_MATCH),
+]
+
+QUESTION_SETS = {
+    "linkedin_filter": LINKEDIN_FILTER,
+    "linkedin_query_answer": LINKEDIN_QUERY_ANSWER,
+    "qa_engine": QA_ENGINE,
+    "query_utils": QUERY_UTILS,
+}
+
+def build_questions(engine, corpus, seed=7):
+    values = sample_values(corpus, seed)
+    return [(intent, template.format(**values)) for intent, template in QUESTION_SETS[engine]]
@@ -0,0 +1,234 @@
+# benchmarks/run_engines.py
+#
+# Per-intent latency (p50/p95) and peak memory of the query engines on
+# synthetic corpora. Results go to benchmarks/results/<commit>.json so runs
+# from different commits can be diffed with --compare.
+#
+#   python -m benchmarks.run_engines --rows 10000 100000
+#   python -m benchmarks.run_engines --rows 10000 --engines linkedin_filter --compare benchmarks/results/abc1234.json
+#
+# Engines with a batch entry point also get a throughput line: --batch
+# questions (the question set with varying names/URLs) answered in a loop
+# and in one batch call, in questions per second.
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.questions import build_questions
+from metadata_index import IndexedMetadata
+from partitions import build_metadata
+from tracing import trace
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# engine name -> (module, entry point); all take (metadata, question)
+ENGINES = {
+    "linkedin_filter": ("linkedin_filter", "apply_filters"),
+    "linkedin_query_answer": ("linkedin_query_answer", "answer_linkedin_query"),
+    "qa_engine": ("qa_engine", "apply_filters"),
+    "query_utils": ("query_utils", "apply_filters"),
+}
+
+# engine name -> batch entry point taking (metadata, questions)
+BATCH_ENGINES = {
+    "linkedin_filter": ("linkedin_filter", "apply_filters_many"),
+    "linkedin_query_answer": ("linkedin_query_answer", "answer_many"),
+}
+
+def load_engine(name, engines=ENGINES):
+    module, func = engines[name]
+    return getattr(importlib.import_module(module), func)
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return "unknown"
+
+def percentile(values, pct):
+    # Nearest-rank percentile; values need not be sorted
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+def observed_intent(fn, corpus, question):
+    # linkedin_filter / linkedin_query_answer mark the branch they took
+    with trace("benchmark") as record:
+        fn(corpus, question)
+    return record["intent"]
+
+def peak_memory(fn, corpus, question):
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn(corpus, question)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def bench_engine(name, corpus, repeat):
+    fn = load_engine(name)
+    by_intent = {}
+    for label, question in build_questions(name, corpus):
+        # Warm-up call doubles as the intent check for engines that trace
+        intent = observed_intent(fn, corpus, question) or label
+        if intent != label:
+            print(f"  note: {name} question {question!r} took branch {intent}, expected {label}")
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(corpus, question)
+            timings.append(time.perf_counter() - start)
+        entry = by_intent.setdefault(intent, {"questions": [], "timings": [], "peak_bytes": 0})
+        entry["questions"].append(question)
+        entry["timings"].extend(timings)
+        entry["peak_bytes"] = max(entry["peak_bytes"], peak_memory(fn, corpus, question))
+
+    report = {}
+    for intent, entry in sorted(by_intent.items()):
+        timings = entry["timings"]
+        report[intent] = {
+            "n": len(timings),
+            "p50_ms": round(percentile(timings, 50) * 1000, 3),
+            "p95_ms": round(percentile(timings, 95) * 1000, 3),
+            "mean_ms": round(sum(timings) / len(timings) * 1000, 3),
+            "peak_kb": round(entry["peak_bytes"] / 1024, 1),
+            "questions": entry["questions"],
+        }
+    return report
+
+def batch_questions(name, corpus, size):
+    questions, seed = [], 0
+    while len(questions) < size:
+        questions.extend(q for _, q in build_questions(name, corpus, seed=seed))
+        seed += 1
+    return questions[:size]
+
+def bench_batch(name, corpus, size):
+    fn, many = load_engine(name), load_engine(name, BATCH_ENGINES)
+    questions = batch_questions(name, corpus, size)
+    start = time.perf_counter()
+    for question in questions:
+        fn(corpus, question)
+    loop_s = time.perf_counter() - start
+    start = time.perf_counter()
+    many(corpus, questions)
+    batch_s = time.perf_counter() - start
+    return {
+        "questions": len(questions),
+        "loop_qps": round(len(questions) / loop_s, 1),
+        "batch_qps": round(len(questions) / batch_s, 1),
+        "speedup": round(loop_s / batch_s, 2),
+    }
+
+def run(rows_list, engines, repeat, seed=42, typed=True, indexed=False, columnar=False, batch=0):
+    results = {
+        "commit": git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "typed": typed,
+        "indexed": indexed,
+        "columnar": columnar,
+        "repeat": repeat,
+        "batch": batch,
+        "corpora": {},
+    }
+    for rows in rows_list:
+        tracemalloc.start()
+        start = time.perf_counter()
+        corpus = generate_corpus(rows, seed=seed, typed=typed)
+        if columnar:
+            # Indexes plus column-backed rows; the generated dicts are freed
+            corpus = build_metadata(corpus, columnar=True)
+        elif indexed:
+            # What a loaded partition serves: rows plus their indexes
+            corpus = IndexedMetadata(corpus)
+        build_s = time.perf_counter() - start
+        corpus_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{rows} rows generated in {build_s:.1f}s ({corpus_bytes / 2**20:.1f} MiB)")
+
+        entry = {"generate_s": round(build_s, 3), "corpus_mb": round(corpus_bytes / 2**20, 1), "engines": {}, "batch": {}}
+        for name in engines:
+            print(f"  {name}")
+            entry["engines"][name] = bench_engine(name, corpus, repeat)
+            if batch and name in BATCH_ENGINES:
+                entry["batch"][name] = bench_batch(name, corpus, batch)
+        results["corpora"][str(rows)] = entry
+        del corpus
+    return results
+
+def print_report(results):
+    for rows, entry in results["corpora"].items():
+        print(f"\n== {rows} rows ==")
+        for name, report in entry["engines"].items():
+            print(f"{name}")
+            for intent, stats in report.items():
+                print(f"  {intent:<36} p50 {stats['p50_ms']:>10.3f} ms   p95 {stats['p95_ms']:>10.3f} ms   peak {stats['peak_kb']:>10.1f} KiB")
+            stats = entry.get("batch", {}).get(name)
+            if stats:
+                print(f"  {'batch x' + str(stats['questions']):<36} loop {stats['loop_qps']:>10.1f} q/s   "
+                      f"batch {stats['batch_qps']:>10.1f} q/s   {stats['speedup']:.2f}x")
+
+def compare(results, baseline):
+    # p50 ratios against an older results file; >1.0 means slower now
+    print(f"\n== vs {baseline.get('commit', '?')} (p50 ratio, peak ratio) ==")
+    for rows, entry in results["corpora"].items():
+        old_entry = baseline.get("corpora", {}).get(rows)
+        if not old_entry:
+            continue
+        for name, report in entry["engines"].items():
+            old_report = old_entry["engines"].get(name, {})
+            for intent, stats in report.items():
+                old = old_report.get(intent)
+                if not old or not old["p50_ms"]:
+                    continue
+                ratio = stats["p50_ms"] / old["p50_ms"]
+                peak = stats["peak_kb"] / old["peak_kb"] if old["peak_kb"] else float("nan")
+                flag = "  <-- slower" if ratio > 1.2 else ""
+                print(f"  {rows:>8} {name:<22} {intent:<36} {ratio:6.2f}x  {peak:6.2f}x{flag}")
+            stats, old = entry.get("batch", {}).get(name), old_entry.get("batch", {}).get(name)
+            if stats and old:
+                # Throughput, so <1.0 means slower now
+                ratio = stats["batch_qps"] / old["batch_qps"]
+                flag = "  <-- slower" if ratio < 1 / 1.2 else ""
+                print(f"  {rows:>8} {name:<22} {'batch q/s':<36} {ratio:6.2f}x{flag}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the LinkedIn query engines")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000])
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--raw", action="store_true", help="use raw string counts/dates instead of typed rows")
+    parser.add_argument("--indexed", action="store_true", help="wrap the corpus in IndexedMetadata like a loaded partition")
+    parser.add_argument("--columnar", action="store_true", help="indexed, with rows packed into a ColumnStore")
+    parser.add_argument("--batch", type=int, default=100, help="questions per batch throughput run (0 to skip)")
+    parser.add_argument("--out", help="results path (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="older results file to compare against")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.engines, args.repeat, args.seed, typed=not args.raw,
+                  indexed=args.indexed, columnar=args.columnar, batch=args.batch)
+    print_report(results)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nSaved {out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,34 @@ import json
 import faiss
 import os
 from embedder import get_embeddings
+from schema import COUNT_COLUMNS, DISPLAY_COLUMNS, STANDARD_COLUMNS, STORED_COLUMNS, TEXT_COLUMNS, display_count, normalize_name
 
-STANDARD_COLUMNS = [
-    'name', 'profile_url', 'author', 'authorUrl', 'description',
-    'postContent', 'postUrl', 'postDate', 'type', 'likeCount',
-    'commentCount', 'repostCount', 'followers'
-]
+COUNT_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+def parse_counts(series: pd.Series) -> pd.Series:
+    # "1,234" / "940+" / "1.2K" -> Int64, unparseable -> <NA>
+    parts = series.astype(str).str.replace(',', '', regex=False).str.lower().str.extract(r'(\d+(?:\.\d+)?)\s*([km]?)')
+    numbers = pd.to_numeric(parts[0], errors='coerce')
+    multiplier = parts[1].map(COUNT_SUFFIXES).fillna(1)
+    return (numbers * multiplier).round().astype('Int64')
+
+def count_texts(series: pd.Series) -> pd.Series:
+    # Display strings of a count column; read_csv makes numeric columns floats
+    if pd.api.types.is_numeric_dtype(series):
+        return series.map(lambda v: '' if pd.isna(v) else str(int(v)) if float(v).is_integer() else str(v))
+    return series.fillna('').astype(str).str.strip()
+
+def parse_timestamps(series: pd.Series) -> pd.Series:
+    # postDate -> epoch seconds (UTC), unparseable -> <NA>
+    dates = pd.to_datetime(series.replace('', None), errors='coerce', utc=True, format='mixed')
+    seconds = (dates - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+    return seconds.astype('Int64')
+
+def normalize_names(series: pd.Series) -> pd.Series:
+    # Authors repeat on every post, so normalize each distinct name once
+    series = series.fillna('').astype(str)
+    uniques = series.unique()
+    return series.map(dict(zip(uniques, map(normalize_name, uniques))))
 
 def clean_and_standardize(df: pd.DataFrame) -> pd.DataFrame:
     df.columns = [col.strip().lower() for col in df.columns]
@@ -26,7 +48,19 @@ def clean_and_standardize(df: pd.DataFrame) -> pd.DataFrame:
     for col in STANDARD_COLUMNS:
         if col not in df.columns:
             df[col] = ''
-    return df[STANDARD_COLUMNS]
+    df = df[STANDARD_COLUMNS].copy()
+    df[TEXT_COLUMNS] = df[TEXT_COLUMNS].fillna('').astype(str)
+    for col in COUNT_COLUMNS:
+        df[DISPLAY_COLUMNS[col]] = count_texts(df[col])
+        df[col] = parse_counts(df[col])
+    df['postTimestamp'] = parse_timestamps(df['postDate'])
+    df['authorNorm'] = normalize_names(df['author'])
+    df['nameNorm'] = normalize_names(df['name'])
+    return df[STORED_COLUMNS]
+
+def to_records(df: pd.DataFrame) -> list:
+    # JSON-safe dicts: <NA> counts/timestamps become None
+    return df.astype(object).where(df.notna(), None).to_dict(orient='records')
 
 def load_and_prepare_profiles(csv_files):
     df_list = []
@@ -40,13 +74,14 @@ def load_and_prepare_profiles(csv_files):
         else:
             print(f"File not found: {file}")
 
-    combined_df = pd.concat(df_list, ignore_index=True).fillna('')
+    combined_df = pd.concat(df_list, ignore_index=True)
     combined_df.to_json("raw_metadata.json", orient="records", indent=2)
     print("Saved raw_metadata.json with shape:", combined_df.shape)
-    texts = [row_to_text(row) for _, row in combined_df.iterrows()]
+    texts = [row_to_text(row) for row in to_records(combined_df)]
     return texts
 
 def row_to_text(row):
+    row = {k: ('' if v is None else v) for k, v in dict(row).items()}
     return f"""Name: {row.get('name', '')}
 Profile URL: {row.get('profile_url', '')}
 Author: {row.get('author', '')}
@@ -56,10 +91,10 @@ Post Content: {row.get('postContent', '')}
 Post URL: {row.get('postUrl', '')}
 Post Date: {row.get('postDate', '')}
 Type: {row.get('type', '')}
-Likes: {row.get('likeCount', '')}
-Comments: {row.get('commentCount', '')}
-Reposts: {row.get('repostCount', '')}
-Followers: {row.get('followers', '')}
+Likes: {display_count(row, 'likeCount', '')}
+Comments: {display_count(row, 'commentCount', '')}
+Reposts: {display_count(row, 'repostCount', '')}
+Followers: {display_count(row, 'followers', '')}
 """
 
 def build_and_save_index(texts, index_path="linkedin_index.faiss", docs_path="docs.json"):
@@ -0,0 +1,253 @@
+# columnar.py
+#
+# Compact in-memory layout for a loaded snapshot. raw_metadata.json repeats
+# the profile (name, profile_url, description, followers) on every post and
+# stores low-cardinality fields like `type` as a full string per row; as a
+# list of dicts that is a few KB per row. ColumnStore keeps instead
+#
+#   profiles  one tuple per distinct profile, posts refer to it by profile id
+#   columns   one column per post field:
+#               ints      int32 array (int64 if a value needs it) for typed
+#                         counts / postTimestamp
+#               codes     int32 codes into a table of distinct strings (type,
+#                         author, authorUrl, ...)
+#               arena     a code into a table of shared prefixes plus the rest
+#                         of each string in one UTF-8 blob with offsets
+#                         (postUrl, postDate: nearly every value is unique)
+#               objects   plain list, for anything mixed (untyped old files)
+#
+# Engines still see rows as mappings: Row is a two-slot view that reads its
+# fields out of the columns on access, so `item.get('postContent', '')`
+# works unchanged. Rows crossing a process or JSON boundary should be copied
+# with dict(row).
+#
+# Measured on a synthetic 20k-post snapshot: rows as dicts 20.6 MiB, columns
+# plus Row views 5.1 MiB (4x). A whole partition goes from 33.7 to 11.9 MiB;
+# what remains is mostly the query indexes in metadata_index (5.5 MiB), which
+# are shared by both layouts and not covered here.
+
+import sys
+from array import array
+from collections.abc import Mapping
+
+from schema import DISPLAY_COLUMNS, NORMALIZED_FIELDS
+
+PROFILE_COLUMNS = ['name', 'profile_url', 'description', 'followers', DISPLAY_COLUMNS['followers'], NORMALIZED_FIELDS['name']]
+CODES_MAX_RATIO = 0.5  # distinct/rows above this goes to the arena
+INT_NULL = -(2 ** 63)
+INT32_NULL = -(2 ** 31)
+
+# ----------------------------
+# Columns
+# ----------------------------
+
+class IntColumn:
+    # 32-bit storage when every value fits, which counts and epoch seconds
+    # before 2038 do; 64-bit otherwise
+    def __init__(self, values):
+        narrow = all(v is None or INT32_NULL < v < 2 ** 31 for v in values)
+        self.null = INT32_NULL if narrow else INT_NULL
+        self.data = array('i' if narrow else 'q', (self.null if v is None else v for v in values))
+
+    def get(self, i):
+        v = self.data[i]
+        return None if v == self.null else v
+
+    def nbytes(self):
+        return self.data.itemsize * len(self.data)
+
+class CodeColumn:
+    def __init__(self, values):
+        # Keyed by (type, value) so 1, 1.0 and True stay distinct values
+        table = {}
+        self.codes = array('i', (table.setdefault((type(v), v), len(table)) for v in values))
+        self.values = [sys.intern(v) if isinstance(v, str) else v for _, v in table]
+
+    def get(self, i):
+        return self.values[self.codes[i]]
+
+    def nbytes(self):
+        return self.codes.itemsize * len(self.codes) + sum(sys.getsizeof(v) for v in self.values)
+
+class ArenaColumn:
+    # Each value is split at the last occurrence of one separator, chosen per
+    # column to minimize size: the prefix becomes a code into a table of
+    # distinct prefixes and only the suffix goes into the blob. postUrl keeps
+    # "https://www.linkedin.com/feed/update/urn:li:activity:" once and the
+    # 19-digit id per row; a column with no shared prefixes is stored whole.
+    SEPARATORS = '/: -_'
+    PREFIX_OVERHEAD = 64  # bytes per distinct prefix (string object + table slot)
+
+    def __init__(self, values):
+        self.nulls = {i for i, v in enumerate(values) if v is None}
+        strings = ['' if v is None else v for v in values]
+        self.sep = self._best_separator(strings)
+        prefixes = {}
+        codes = []
+        chunks = []
+        for v in strings:
+            cut = v.rfind(self.sep) + 1 if self.sep else 0
+            codes.append(prefixes.setdefault(v[:cut], len(prefixes)))
+            chunks.append(v[cut:].encode("utf-8"))
+        self.prefixes = [sys.intern(p) for p in prefixes]
+        self.prefix_codes = array('H' if len(prefixes) <= 2 ** 16 else 'i', codes)
+        self.blob = b"".join(chunks)
+        self.offsets = array('I' if len(self.blob) < 2 ** 32 else 'q', [0])
+        end = 0
+        for b in chunks:
+            end += len(b)
+            self.offsets.append(end)
+
+    @classmethod
+    def _best_separator(cls, strings):
+        best, best_cost = '', sum(map(len, strings))
+        for sep in cls.SEPARATORS:
+            prefixes = set()
+            suffix_len = 0
+            for v in strings:
+                cut = v.rfind(sep) + 1
+                prefixes.add(v[:cut])
+                suffix_len += len(v) - cut
+            cost = suffix_len + 2 * len(strings) + sum(len(p) + cls.PREFIX_OVERHEAD for p in prefixes)
+            if cost < best_cost:
+                best, best_cost = sep, cost
+        return best
+
+    def get(self, i):
+        if self.nulls and i in self.nulls:
+            return None
+        suffix = self.blob[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+        return self.prefixes[self.prefix_codes[i]] + suffix
+
+    def nbytes(self):
+        return (len(self.blob) + self.offsets.itemsize * len(self.offsets)
+                + self.prefix_codes.itemsize * len(self.prefix_codes) + sum(sys.getsizeof(p) for p in self.prefixes))
+
+class ObjectColumn:
+    def __init__(self, values):
+        self.values = list(values)
+
+    def get(self, i):
+        return self.values[i]
+
+    def nbytes(self):
+        return sys.getsizeof(self.values)
+
+def make_column(values):
+    if all(v is None or (type(v) is int and INT_NULL < v < 2 ** 63) for v in values):
+        return IntColumn(values)
+    if all(v is None or type(v) is str for v in values):
+        distinct = len(set(values))
+        if distinct <= max(1, len(values) * CODES_MAX_RATIO):
+            return CodeColumn(values)
+        return ArenaColumn(values)
+    if all(isinstance(v, (str, int, float, bool, type(None))) for v in values):
+        return CodeColumn(values)
+    return ObjectColumn(values)
+
+# ----------------------------
+# Store and row views
+# ----------------------------
+
+class ColumnStore:
+    def __init__(self, records):
+        n = len(records)
+        # Key layout per row; a snapshot normally has exactly one
+        layouts = {}
+        self.layout_codes = array('i', (layouts.setdefault(tuple(r), len(layouts)) for r in records))
+        self.layouts = list(layouts)
+        self.layout_sets = [frozenset(layout) for layout in self.layouts]
+        self.uniform = len(self.layouts) == 1
+        keys = list(dict.fromkeys(k for layout in self.layouts for k in layout))
+
+        profile_fields = [k for k in PROFILE_COLUMNS if k in keys]
+        profiles = {}
+        self.profile_ids = array('i', (
+            profiles.setdefault(tuple((type(v), v) for v in map(r.get, profile_fields)), len(profiles))
+            for r in records
+        ))
+        self.profiles = [tuple(sys.intern(v) if isinstance(v, str) else v for _, v in p) for p in profiles]
+        self.profile_fields = profile_fields
+
+        self.columns = {}
+        for key in keys:
+            if key not in profile_fields:
+                self.columns[key] = make_column([r.get(key) for r in records])
+
+        self.getters = {}
+        for pos, key in enumerate(profile_fields):
+            self.getters[key] = self._profile_getter(pos)
+        for key, column in self.columns.items():
+            self.getters[key] = column.get
+        self.size = n
+
+    def _profile_getter(self, pos):
+        profiles, ids = self.profiles, self.profile_ids
+        return lambda i: profiles[ids[i]][pos]
+
+    def has(self, i, key):
+        return key in self.layout_sets[0 if self.uniform else self.layout_codes[i]]
+
+    def keys(self, i):
+        return self.layouts[self.layout_codes[i]]
+
+    def rows(self):
+        return [Row(self, i) for i in range(self.size)]
+
+    def profile(self, i):
+        return dict(zip(self.profile_fields, self.profiles[self.profile_ids[i]]))
+
+    def nbytes(self):
+        # Approximate resident size of the columns and profile table
+        profile_bytes = sum(sys.getsizeof(p) + sum(sys.getsizeof(v) for v in p) for p in self.profiles)
+        return (self.profile_ids.itemsize * self.size + self.layout_codes.itemsize * self.size
+                + profile_bytes + sum(c.nbytes() for c in self.columns.values()))
+
+class Row(Mapping):
+    __slots__ = ('_store', '_i')
+
+    def __init__(self, store, i):
+        self._store = store
+        self._i = i
+
+    def get(self, key, default=None):
+        store = self._store
+        getter = store.getters.get(key)
+        if getter is None or not (store.uniform or store.has(self._i, key)):
+            return default
+        return getter(self._i)
+
+    def __getitem__(self, key):
+        store = self._store
+        getter = store.getters.get(key)
+        if getter is None or not (store.uniform or store.has(self._i, key)):
+            raise KeyError(key)
+        return getter(self._i)
+
+    def __contains__(self, key):
+        return key in self._store.getters and self._store.has(self._i, key)
+
+    def __iter__(self):
+        return iter(self._store.keys(self._i))
+
+    def __len__(self):
+        return len(self._store.keys(self._i))
+
+    def __eq__(self, other):
+        if isinstance(other, Row):
+            if other._store is self._store:
+                return other._i == self._i
+        return Mapping.__eq__(self, other)
+
+    # Equal to a dict with the same items, so unhashable like one
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __reduce__(self):
+        # Pickles (process pools, caches) carry the row's values, not the store
+        return (dict, (dict(self),))
+
+def to_dicts(rows):
+    return [dict(r) for r in rows]
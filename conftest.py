@@ -0,0 +1,6 @@
+# conftest.py
+#
+# Keep pytest to this repo's own test_*.py files: llama.cpp is vendored with
+# its own test suites, and test_llama.py is a manual install check.
+
+collect_ignore = ["llama.cpp", "test_llama.py"]
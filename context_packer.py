@@ -0,0 +1,187 @@
+# context_packer.py
+#
+# Token-budgeted packing of retrieved docs into the RAG prompt. Docs are the
+# "Key: value" text blocks produced by build_index.row_to_text (or the short
+# accuracy.py corpus); only the fields relevant to the question's intent are
+# kept (all of them for a doc that has none of those), long free-text fields are cut to a per-field budget, and docs are
+# added in retrieval order until the context budget is used up.
+
+import re
+
+FIELD_ORDER = [
+    'name', 'profile_url', 'author', 'authorUrl', 'description',
+    'postContent', 'postUrl', 'postDate', 'type', 'likeCount',
+    'commentCount', 'repostCount', 'followers'
+]
+
+FIELD_LABELS = {
+    'name': 'Name',
+    'profile_url': 'profileUrl',
+    'author': 'Author',
+    'authorUrl': 'authorUrl',
+    'description': 'Description',
+    'postContent': 'postContent',
+    'postUrl': 'postUrl',
+    'postDate': 'postDate',
+    'type': 'type',
+    'likeCount': 'likeCount',
+    'commentCount': 'commentCount',
+    'repostCount': 'repostCount',
+    'followers': 'followers',
+}
+
+# Doc keys seen in the wild, lowercased with spaces/underscores removed
+FIELD_ALIASES = {
+    'name': 'name',
+    'profileurl': 'profile_url',
+    'author': 'author',
+    'authorurl': 'authorUrl',
+    'description': 'description',
+    'title': 'description',
+    'postcontent': 'postContent',
+    'posturl': 'postUrl',
+    'postdate': 'postDate',
+    'type': 'type',
+    'likecount': 'likeCount',
+    'likes': 'likeCount',
+    'commentcount': 'commentCount',
+    'comments': 'commentCount',
+    'repostcount': 'repostCount',
+    'reposts': 'repostCount',
+    'followers': 'followers',
+}
+
+LONG_FIELDS = ('postContent', 'description')
+
+# Fields that say whose doc it is rather than answer anything
+IDENTITY_FIELDS = {'name', 'author', 'profile_url', 'authorUrl', 'postUrl'}
+
+# (pattern, fields) pairs; every matching intent contributes its fields
+INTENT_FIELDS = [
+    (r'follower', ['name', 'author', 'followers']),
+    (r'postcontent|content|say|said|wrote|written', ['author', 'postUrl', 'postContent']),
+    (r'author|who|written by|posted by', ['author', 'postUrl', 'postContent']),
+    (r'type of post|post type|\btype\b|article|video|image', ['author', 'postUrl', 'type']),
+    (r'like', ['author', 'postUrl', 'likeCount']),
+    (r'comment', ['author', 'postUrl', 'commentCount']),
+    (r'repost|share', ['author', 'postUrl', 'repostCount']),
+    (r'when|date|month|year|posted on', ['author', 'postUrl', 'postDate']),
+    (r'title|role|position|description|headline|works? at', ['name', 'author', 'description']),
+    (r'profile', ['name', 'profile_url', 'description', 'followers']),
+    (r'mention|about|keyword|contain', ['author', 'postUrl', 'postContent']),
+    (r'https?://|url', ['postUrl']),
+]
+
+# ----------------------------
+# Token counting
+# ----------------------------
+
+class TokenCounter:
+    def __init__(self, llm=None):
+        self.llm = llm
+
+    def tokenize(self, text):
+        return self.llm.tokenize(text.encode("utf-8"), add_bos=False)
+
+    def count(self, text):
+        if not text:
+            return 0
+        if self.llm is None:
+            # Rough estimate for LLaMA-style BPE vocabularies
+            return len(text) // 4 + 1
+        return len(self.tokenize(text))
+
+    def truncate(self, text, max_tokens):
+        if self.count(text) <= max_tokens:
+            return text
+        if self.llm is None:
+            cut = text[:max_tokens * 4]
+        else:
+            tokens = self.tokenize(text)[:max_tokens]
+            cut = self.llm.detokenize(tokens).decode("utf-8", errors="ignore")
+        return shorten_text(cut)
+
+def shorten_text(cut):
+    # Prefer ending on a sentence, then on a word, so the model sees clean text
+    m = re.search(r'^(.*[.!?])\s', cut, re.S)
+    if m and len(m.group(1)) > len(cut) // 2:
+        return m.group(1) + " …"
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip() + " …"
+
+# ----------------------------
+# Doc parsing and intent
+# ----------------------------
+
+def parse_doc(doc):
+    if isinstance(doc, dict):
+        return {k: str(v) for k, v in doc.items() if k in FIELD_LABELS}
+    fields = {}
+    current = None
+    for line in doc.splitlines():
+        m = re.match(r'^\s*([A-Za-z _]+):\s?(.*)$', line)
+        key = FIELD_ALIASES.get(re.sub(r'[\s_]', '', m.group(1)).lower()) if m else None
+        if key:
+            current = key
+            fields[key] = m.group(2).strip()
+        elif current:
+            # Continuation of a multi-line value (post content usually)
+            fields[current] += "\n" + line
+    return fields
+
+def fields_for_query(query):
+    q = query.lower()
+    fields = set()
+    for pattern, intent_fields in INTENT_FIELDS:
+        if re.search(pattern, q):
+            fields.update(intent_fields)
+    # Nothing recognisable: keep everything rather than guess
+    return fields or set(FIELD_ORDER)
+
+# ----------------------------
+# Packing
+# ----------------------------
+
+def render_doc(fields, keep):
+    lines = [f"{FIELD_LABELS[k]}: {fields[k]}" for k in FIELD_ORDER if k in keep and fields.get(k)]
+    return "\n".join(lines)
+
+def doc_fields(fields, wanted):
+    # A doc without any of the fields the intent asks for (a "followers"
+    # question over a post that only has likeCount) is kept whole: cut down
+    # to its author it could not answer anything
+    if any(fields.get(k) for k in wanted - IDENTITY_FIELDS):
+        return wanted
+    return set(FIELD_ORDER)
+
+def pack_docs(query, docs, counter, budget, max_field_tokens=256, min_field_tokens=24):
+    wanted = fields_for_query(query)
+    blocks = []
+    used = 0
+    for doc in docs:
+        fields = parse_doc(doc)
+        keep = doc_fields(fields, wanted)
+        for k in LONG_FIELDS:
+            if k in keep and fields.get(k):
+                fields[k] = counter.truncate(fields[k], max_field_tokens)
+
+        header = f"Post {len(blocks) + 1}:\n"
+        block = header + render_doc(fields, keep)
+        cost = counter.count(block + "\n\n")
+        if used + cost > budget:
+            # Squeeze the long fields into whatever budget is left
+            fixed = counter.count(header + render_doc(fields, keep - set(LONG_FIELDS)) + "\n\n")
+            long_keys = [k for k in LONG_FIELDS if k in keep and fields.get(k)]
+            room = budget - used - fixed - 8 * len(long_keys)
+            if not long_keys or room < min_field_tokens * len(long_keys):
+                continue
+            for k in long_keys:
+                fields[k] = counter.truncate(fields[k], room // len(long_keys))
+            block = header + render_doc(fields, keep)
+            cost = counter.count(block + "\n\n")
+            if used + cost > budget:
+                continue
+        blocks.append(block)
+        used += cost
+    return "\n\n".join(blocks), used
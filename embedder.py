@@ -1,8 +1,148 @@
-from sentence_transformers import SentenceTransformer
+# embedder.py
+#
+# Sentence embeddings for build_index, the pipeline and semantic search.
+# EMBED_BACKEND selects the runtime:
+#   sentence-transformers  all-MiniLM-L6-v2 through torch (default)
+#   onnx                   the same model exported by export_onnx.py with
+#                          dynamic int8 quantization, run by ONNX Runtime with
+#                          the Rust `tokenizers` tokenizer; torch is never imported
+#   llama                  a GGUF embedding model through llama-cpp-python, the
+#                          runtime LLM_BACKEND=local already generates with
+# Vectors from different backends/models are not interchangeable: rebuild the
+# FAISS index (build_index.py) after switching.
+# The model loads on the first get_embeddings call, so importing this module
+# (build_index, pipeline, service) stays cheap.
+
+import os
+import threading
+
 import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "sentence-transformers")
+EMBED_MODEL = os.getenv("EMBED_MODEL", "all-MiniLM-L6-v2")
+EMBED_BATCH = int(os.getenv("EMBED_BATCH", "64"))
+EMBED_MAX_LENGTH = 256  # all-MiniLM-L6-v2's max_seq_length
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "models/all-MiniLM-L6-v2-onnx")
+ONNX_MODEL_FILE = "model_int8.onnx"
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))  # 0 = ONNX Runtime's default
+# Converted with llama.cpp/convert_hf_to_gguf.py, see export_onnx.py
+EMBED_GGUF_PATH = os.getenv("EMBED_GGUF_PATH", "models/all-MiniLM-L6-v2.Q8_0.gguf")
+EMBED_GGUF_CTX = int(os.getenv("EMBED_GGUF_CTX", "512"))
+# mean | cls | last | none (per-token output, mean-pooled here) | model (the GGUF's own)
+EMBED_POOLING = os.getenv("EMBED_POOLING", "mean")
+
+_lock = threading.Lock()
+_embedders = {}
+
+# ----------------------------
+# Backends
+# ----------------------------
+
+class SentenceTransformerEmbedder:
+    def __init__(self, model_name=EMBED_MODEL):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts):
+        return self.model.encode(texts, batch_size=EMBED_BATCH, convert_to_numpy=True).astype('float32')
+
+def mean_pool(hidden, mask):
+    # Mean over real tokens, then unit length: the model's Pooling + Normalize modules
+    mask = mask[..., None].astype(hidden.dtype)
+    pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+class OnnxEmbedder:
+    def __init__(self, model_dir=ONNX_MODEL_DIR, threads=ONNX_THREADS, batch_size=EMBED_BATCH):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(EMBED_MAX_LENGTH)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, ONNX_MODEL_FILE), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.batch_size = batch_size
+
+    def encode(self, texts):
+        texts = [t or "" for t in texts]
+        # Similar lengths batched together keep padding (and wasted work) small
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        out = np.zeros((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            encodings = self.tokenizer.encode_batch([texts[i] for i in batch])
+            ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": ids, "attention_mask": mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.zeros_like(ids)
+            hidden = self.session.run(None, feeds)[0]
+            if not out.shape[1]:
+                out = np.zeros((len(texts), hidden.shape[-1]), dtype=np.float32)
+            out[batch] = mean_pool(hidden, mask)
+        return out
+
+POOLING_TYPES = {"model": -1, "none": 0, "mean": 1, "cls": 2, "last": 3}  # llama_pooling_type
+
+class LlamaEmbedder:
+    def __init__(self, model_path=EMBED_GGUF_PATH, pooling=EMBED_POOLING, batch_size=EMBED_BATCH):
+        from llama_cpp import Llama
+        if pooling not in POOLING_TYPES:
+            raise ValueError(f"Unknown EMBED_POOLING: {pooling!r} (expected one of {', '.join(POOLING_TYPES)})")
+        self.pooling = pooling
+        self.batch_size = batch_size
+        # Encoder models attend over the whole sequence, so a text has to fit in
+        # one micro-batch: n_batch = n_ubatch = n_ctx
+        self.model = Llama(
+            model_path=model_path,
+            embedding=True,
+            pooling_type=POOLING_TYPES[pooling],
+            n_ctx=EMBED_GGUF_CTX,
+            n_batch=EMBED_GGUF_CTX,
+            n_ubatch=EMBED_GGUF_CTX,
+            n_threads=int(os.getenv("LLAMA_N_THREADS", "4")),
+            verbose=False,
+        )
+
+    def encode(self, texts):
+        texts = [t or " " for t in texts]
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            response = self.model.create_embedding(input=texts[start:start + self.batch_size])
+            for item in sorted(response["data"], key=lambda d: d["index"]):
+                emb = np.asarray(item["embedding"], dtype=np.float32)
+                if emb.ndim == 2:  # pooling "none": one vector per token
+                    emb = emb.mean(axis=0)
+                vectors.append(emb)
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        out = np.vstack(vectors)
+        return out / np.clip(np.linalg.norm(out, axis=1, keepdims=True), 1e-12, None)
+
+BACKENDS = {
+    "sentence-transformers": SentenceTransformerEmbedder,
+    "onnx": OnnxEmbedder,
+    "llama": LlamaEmbedder,
+}
 
-model = SentenceTransformer('all-MiniLM-L6-v2')
+def get_embedder(backend=None):
+    backend = backend or EMBED_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown EMBED_BACKEND: {backend!r} (expected one of {', '.join(BACKENDS)})")
+    with _lock:
+        if backend not in _embedders:
+            _embedders[backend] = BACKENDS[backend]()
+        return _embedders[backend]
 
 def get_embeddings(text_list):
-    embeddings = model.encode(text_list, convert_to_numpy=True).astype('float32')
-    return embeddings
+    return get_embedder().encode(list(text_list))
@@ -0,0 +1,69 @@
+# export_onnx.py
+#
+# One-off export of the embedding model for EMBED_BACKEND=onnx: the
+# transformer goes to ONNX (torch and transformers are only needed here),
+# its weights get dynamic int8 quantization through onnxruntime, and the
+# fast tokenizer is saved as tokenizer.json for the `tokenizers` library.
+#
+#   python export_onnx.py                  # -> models/all-MiniLM-L6-v2-onnx/
+#   python bench_embeddings.py --backends onnx sentence-transformers
+#
+# EMBED_BACKEND=llama needs the same model as GGUF (EMBED_GGUF_PATH), made by
+# the converter in the vendored llama.cpp checkout (needs its gguf-py deps):
+#
+#   huggingface-cli download sentence-transformers/all-MiniLM-L6-v2 --local-dir models/all-MiniLM-L6-v2
+#   python llama.cpp/convert_hf_to_gguf.py models/all-MiniLM-L6-v2 \
+#       --outtype q8_0 --outfile models/all-MiniLM-L6-v2.Q8_0.gguf
+#   python bench_embeddings.py --backends llama sentence-transformers
+
+import argparse
+import os
+
+from embedder import EMBED_MODEL, ONNX_MODEL_DIR, ONNX_MODEL_FILE
+
+INPUTS = ["input_ids", "attention_mask", "token_type_ids"]
+
+def export(model_name=EMBED_MODEL, out_dir=ONNX_MODEL_DIR, opset=14, keep_fp32=False):
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    repo = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(repo)
+    tokenizer.save_pretrained(out_dir)
+    model = AutoModel.from_pretrained(repo).eval()
+
+    sample = tokenizer(["An example LinkedIn post about hiring."], return_tensors="pt")
+    fp32_path = os.path.join(out_dir, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in INPUTS),
+            fp32_path,
+            input_names=INPUTS,
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: {0: "batch", 1: "sequence"} for name in INPUTS + ["last_hidden_state"]},
+            opset_version=opset,
+        )
+
+    int8_path = os.path.join(out_dir, ONNX_MODEL_FILE)
+    # Weights of the MatMul/Gemm layers to int8; activations are quantized per batch at run time
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    if not keep_fp32:
+        os.remove(fp32_path)
+    return int8_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the embedding model to int8 ONNX")
+    parser.add_argument("--model", default=EMBED_MODEL)
+    parser.add_argument("--out", default=ONNX_MODEL_DIR)
+    parser.add_argument("--opset", type=int, default=14)
+    parser.add_argument("--keep-fp32", action="store_true", help="keep the unquantized model.onnx as well")
+    args = parser.parse_args()
+
+    path = export(args.model, args.out, args.opset, args.keep_fp32)
+    print(f"Saved {path} ({os.path.getsize(path) / 2**20:.1f} MiB)")
+
+if __name__ == "__main__":
+    main()
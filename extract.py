@@ -0,0 +1,98 @@
+# extract.py
+#
+# Targeted extraction of LinkedIn profile/activity pages with lxml. XPath
+# expressions are compiled once at import and evaluated against the parsed
+# tree, so a page costs one parse plus a handful of lookups. Pages become rows
+# in the build_index.STANDARD_COLUMNS schema: one row per post, or a single
+# profile-only row when the page has no activity.
+
+import re
+
+from lxml import etree, html as lxml_html
+from schema import STANDARD_COLUMNS
+
+def _cls(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Profile header
+X_NAME = etree.XPath("string((//h1)[1])")
+X_DESCRIPTION = etree.XPath(f"string((//div[{_cls('text-body-medium')}])[1])")
+X_FOLLOWERS = etree.XPath("string((//li[contains(., 'followers')]//span[1] | //p[contains(., 'followers')])[1])")
+X_CANONICAL = etree.XPath("string(//link[@rel='canonical']/@href)")
+
+# Activity posts
+X_POSTS = etree.XPath(f"//div[{_cls('feed-shared-update-v2')}][@data-urn]")
+X_POST_URN = etree.XPath("string(@data-urn)")
+X_POST_AUTHOR = etree.XPath(f"string(.//span[{_cls('update-components-actor__name')}]//span[@aria-hidden='true'])")
+X_POST_AUTHOR_URL = etree.XPath(f"string(.//a[{_cls('update-components-actor__meta-link')}]/@href)")
+X_POST_DATE = etree.XPath(f"string(.//span[{_cls('update-components-actor__sub-description')}]//span[@aria-hidden='true'])")
+X_POST_CONTENT = etree.XPath(f"string(.//div[{_cls('update-components-text')}])")
+X_POST_LIKES = etree.XPath(f"string(.//span[{_cls('social-details-social-counts__reactions-count')}])")
+X_POST_COMMENTS = etree.XPath("string(.//li[contains(., 'comment')])")
+X_POST_REPOSTS = etree.XPath("string(.//li[contains(., 'repost')])")
+X_POST_ARTICLE = etree.XPath(f"boolean(.//div[{_cls('update-components-article')}])")
+X_POST_VIDEO = etree.XPath(f"boolean(.//div[{_cls('update-components-linkedin-video')}])")
+X_POST_IMAGE = etree.XPath(f"boolean(.//div[{_cls('update-components-image')}])")
+
+# "12,530", "940+", "1.2K followers": the K/M suffix stays for parse_counts
+COUNT_RE = re.compile(r'\d[\d,.]*(?:\s?[KkMm]\b)?\+?')
+
+def _text(value):
+    return " ".join(value.split())
+
+def _count(value):
+    m = COUNT_RE.search(value)
+    return m.group(0) if m else ''
+
+def _strip_query(url):
+    return url.split("?", 1)[0].rstrip("/") if url else ''
+
+def _post_type(node):
+    if X_POST_ARTICLE(node):
+        return 'Article'
+    if X_POST_VIDEO(node):
+        return 'Video'
+    if X_POST_IMAGE(node):
+        return 'Image'
+    return 'Text'
+
+def extract_page(page_source, url=''):
+    tree = lxml_html.fromstring(page_source)
+    profile = {
+        'name': _text(X_NAME(tree)),
+        'profile_url': _strip_query(X_CANONICAL(tree)) or _strip_query(url),
+        'description': _text(X_DESCRIPTION(tree)),
+        'followers': _count(X_FOLLOWERS(tree)),
+    }
+
+    rows = []
+    for node in X_POSTS(tree):
+        urn = X_POST_URN(node)
+        row = dict.fromkeys(STANDARD_COLUMNS, '')
+        row.update(profile)
+        row.update({
+            'author': _text(X_POST_AUTHOR(node)) or profile['name'],
+            'authorUrl': _strip_query(X_POST_AUTHOR_URL(node)) or profile['profile_url'],
+            'postContent': _text(X_POST_CONTENT(node)),
+            'postUrl': f"https://www.linkedin.com/feed/update/{urn}" if urn else '',
+            'postDate': _text(X_POST_DATE(node)).rstrip(' •'),
+            'type': _post_type(node),
+            'likeCount': _count(X_POST_LIKES(node)),
+            'commentCount': _count(X_POST_COMMENTS(node)),
+            'repostCount': _count(X_POST_REPOSTS(node)),
+        })
+        rows.append(row)
+
+    if not rows:
+        row = dict.fromkeys(STANDARD_COLUMNS, '')
+        row.update(profile)
+        rows.append(row)
+
+    # name/title are kept at the top level for vector_store and older consumers
+    return {"url": url, "name": profile['name'], "title": profile['description'], "records": rows}
+
+def extract_page_safe(page_source, url=''):
+    try:
+        return extract_page(page_source, url)
+    except Exception as e:
+        return {"url": url, "error": f"parse failed: {e}"}
@@ -1,13 +1,7 @@
-from llama_cpp import Llama
+from llm_runtime import LLAMA_DRAFT, LLAMA_MODEL_PATH, get_local_llm
 
-MODEL_PATH = "models/llama-7b.Q4_K_M.gguf"
-
-print(f"Loading model from: {MODEL_PATH} ...")
-llm = Llama(model_path=MODEL_PATH)
-print("Model loaded successfully!")
-
-def generate_linkedin_post(user_input: str) -> str:
-    messages = [
+def build_messages(user_input: str) -> list:
+    return [
         {
             "role": "system",
             "content": (
@@ -22,18 +16,22 @@ def generate_linkedin_post(user_input: str) -> str:
         }
     ]
 
-    response = llm.chat_completion(
-        messages=messages,
+def generate_linkedin_post(user_input: str) -> str:
+    response = get_local_llm().create_chat_completion(
+        messages=build_messages(user_input),
         max_tokens=400,
         temperature=0.7,
         top_p=0.9,
     )
 
-    post = response.choices[0].message["content"].strip()
+    post = response["choices"][0]["message"]["content"].strip()
     return post
 
 
 if __name__ == "__main__":
+    print(f"Loading model from: {LLAMA_MODEL_PATH} ...")
+    get_local_llm()
+    print(f"Model loaded successfully! (speculative draft: {LLAMA_DRAFT or 'off'})")
     print("Welcome to LinkedIn Post Generator (type 'exit' to quit)")
     while True:
         user_input = input("\nEnter your achievement/event for LinkedIn post: ")
@@ -0,0 +1,66 @@
+# grammars.py
+#
+# JSON schema -> GBNF grammar compilation through the vendored
+# llama.cpp/examples/json_schema_to_grammar.py, cached per schema so each
+# structured-output call only pays for grammar parsing once.
+
+import importlib.util
+import json
+import os
+from functools import lru_cache
+
+JSON_SCHEMA_TO_GRAMMAR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "llama.cpp", "examples", "json_schema_to_grammar.py"
+)
+
+# Short answer plus the postUrl of the post it came from
+ANSWER_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "answer": {"type": "string", "maxLength": 200},
+        "postUrl": {"type": "string", "maxLength": 200},
+    },
+    "required": ["answer", "postUrl"],
+    "additionalProperties": False,
+}
+
+@lru_cache(maxsize=1)
+def _converter_module():
+    spec = importlib.util.spec_from_file_location("json_schema_to_grammar", JSON_SCHEMA_TO_GRAMMAR)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _schema_key(schema):
+    return json.dumps(schema, sort_keys=True)
+
+@lru_cache(maxsize=64)
+def _compile_gbnf(schema_key, prop_order):
+    module = _converter_module()
+    converter = module.SchemaConverter(
+        prop_order={name: idx for idx, name in enumerate(prop_order)},
+        allow_fetch=False,
+        dotall=False,
+        raw_pattern=False,
+    )
+    schema = converter.resolve_refs(json.loads(schema_key), "input")
+    converter.visit(schema, "")
+    return converter.format_grammar()
+
+def schema_to_gbnf(schema, prop_order=()):
+    return _compile_gbnf(_schema_key(schema), tuple(prop_order))
+
+@lru_cache(maxsize=64)
+def _llama_grammar(schema_key, prop_order):
+    from llama_cpp import LlamaGrammar
+    return LlamaGrammar.from_string(_compile_gbnf(schema_key, prop_order), verbose=False)
+
+def get_grammar(schema, prop_order=()):
+    return _llama_grammar(_schema_key(schema), tuple(prop_order))
+
+def parse_structured(text, field="answer"):
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return text.strip(), None
+    return str(data.get(field, "")).strip(), data
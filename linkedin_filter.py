@@ -5,6 +5,13 @@ from dateutil.parser import parse as dateparse
 from unidecode import unidecode
 import json
 from collections import Counter
+from schema import canonical_post_url, count_value, display_count, normalize_name, normalized_field, post_datetime
+from tracing import mark_intent
+from metadata_index import closest_rows, get_index
+from aggregates import get_aggregates
+from author_posts import get_author_posts
+from batch import prefetched, run_batch
+from result_cursor import PAGE_SIZE, ResultCursor
 
 # ----------------------------
 # Text normalization utilities
@@ -38,51 +45,96 @@ def filter_by_field(metadata, field, value, exact=False):
     return results
 
 def filter_by_author(metadata, author_name):
-    author_norm = normalize_text(author_name)
-    return [post for post in metadata if author_norm in normalize_text(post.get('author', ''))]
+    rows = prefetched('author', author_name)
+    if rows is not None:
+        return rows
+    index = get_index(metadata)
+    if index is not None:
+        # Substring match via the name index; apply_filters tries typos later
+        return metadata.rows_at(index.names['author'].lookup(author_name, fuzzy=False))
+    author_norm = normalize_name(author_name)
+    return [post for post in metadata if author_norm in normalized_field(post, 'author')]
 
 def filter_by_post_url(metadata, url_fragment):
     url_fragment = normalize_text(url_fragment)
     return [item for item in metadata if url_fragment in normalize_text(item.get('postUrl', ''))]
 
 def filter_by_keyword_in_post_content(metadata, keyword):
+    rows = prefetched('keyword', keyword)
+    if rows is not None:
+        return rows
     keyword = normalize_text(keyword)
+    index = get_index(metadata)
+    if index is not None:
+        return metadata.rows_at(index.text['postContent'].containing(keyword))
     return [item for item in metadata if keyword in normalize_text(item.get('postContent', ''))]
 
 def filter_by_attribute_in_description(metadata, attribute):
+    rows = prefetched('description', attribute)
+    if rows is not None:
+        return rows
     attr_norm = normalize_text(attribute)
+    index = get_index(metadata)
+    if index is not None:
+        return metadata.rows_at(index.text['description'].containing(attr_norm))
     return [item for item in metadata if attr_norm in normalize_text(item.get('description', ''))]
 
 def filter_by_numeric_threshold(metadata, field, threshold, op='>'):
+    index = get_index(metadata)
+    if index is not None and field in index.numeric:
+        return metadata.rows_at(index.threshold(field, threshold, op))
     results = []
     for item in metadata:
-        val_str = str(item.get(field, "")).replace('+', '').replace(',', '').strip()
-        try:
-            val = float(re.findall(r'[\d.]+', val_str)[0])
-        except Exception:
+        val = count_value(item, field)
+        if val is None:
             continue
         if (op == '>' and val > threshold) or (op == '>=' and val >= threshold) or \
            (op == '<' and val < threshold) or (op == '<=' and val <= threshold):
             results.append(item)
     return results
 
+def filter_by_any_keyword(metadata, keywords):
+    rows = prefetched('any_keyword', tuple(keywords))
+    if rows is not None:
+        return rows
+    index = get_index(metadata)
+    if index is not None:
+        return metadata.rows_at(index.with_any_token(keywords))
+    def keyword_match(post):
+        post_tokens = normalize_and_tokenize(post.get('postContent', ''))
+        return any(token in post_tokens for token in keywords)
+    return [post for post in metadata if keyword_match(post)]
+
 def filter_posts_in_month_year(metadata, month_name, year=None):
+    rows = prefetched('month', (month_name, year))
+    if rows is not None:
+        return rows
     try:
         month_num = datetime.strptime(month_name, "%B").month if month_name else None
     except Exception:
         return []
-    results = []
-    for item in metadata:
-        post_date = item.get('postDate', '')
-        try:
-            dt = dateparse(post_date, fuzzy=True)
-            if dt.month == month_num and (year is None or dt.year == year):
-                results.append(item)
-        except Exception:
-            continue
-    return results
+    index = get_index(metadata)
+    if index is not None and month_num:
+        # Timestamped rows come from the index; only untimed ones are parsed
+        timed = index.in_month(month_num, year)
+        untimed = [i for i in index.untimed() if _in_month(metadata[i], month_num, year)]
+        return metadata.rows_at(sorted(list(timed) + untimed))
+    return [item for item in metadata if _in_month(item, month_num, year)]
+
+def _post_dt(item):
+    try:
+        return post_datetime(item) or dateparse(item.get('postDate', ''), fuzzy=True)
+    except Exception:
+        return None
+
+def _in_month(item, month_num, year):
+    dt = _post_dt(item)
+    return dt is not None and dt.month == month_num and (year is None or dt.year == year)
 
 def count_distinct_authors_text_posts(metadata):
+    aggregates = get_aggregates(metadata)
+    if aggregates is not None:
+        return aggregates.distinct_text_authors()
     text_posts = [i for i in metadata if normalize_text(i.get('type', '')) == 'text']
     distinct_authors = set(i.get('author', '') for i in text_posts)
     return len(distinct_authors)
@@ -91,58 +143,94 @@ def count_distinct_authors_text_posts(metadata):
 # Core logic to apply question-based filters
 # ----------------------------
 
+PERSON_RE = re.compile(r'(?:post details of|posts shared by|posts by|post by|posts of|post of|posts from|post from|details about posts of)\s+([\w\s]+)')
+FOLLOWERS_RE = re.compile(r'followers.*?(?:greater|more|above|over|>|>=)\s*(\d+)')
+ROLE_RE = re.compile(r'(?:role|position|title|description).*?(?:is|mentions|contains|with|that mentions|with)\s*["\']?([\w\s]+)["\']?')
+QUOTED_KEYWORD_RE = re.compile(r'post[s]? (?:content )?(?:mention|contain|with|about|that has)?\s*[\'"]([^\'"]+)[\'"]')
+MONTH_RE = re.compile(r'posts? (?:from|in) (\w+)(?: (\d{4}))?')
+ROLE_FOLLOWERS_RE = re.compile(r'(?:role|position|title).*?["\']?([\w\s]+)["\'].*followers.*?(?:greater|more|above|over|>|>=)\s*(\d+)')
+MAX_LIKES_RE = re.compile(r'(most|highest|max).*like')
+MAX_COMMENTS_RE = re.compile(r'(most|highest|max).*comment')
+POST_URL_RE = re.compile(r'posturl.*?["\']?([^"\']+)["\']?')
+FALLBACK_STOPWORDS = {
+    'give', 'me', 'details', 'of', 'the', 'which', 'that', 'has', 'have', 'mention',
+    'mentions', 'post', 'posts', 'content', 'show', 'display', 'with', 'who', 'whose',
+    'what', 'is', 'in', 'and', 'or', 'a', 'an', 'by', 'for', 'from', 'about'
+}
+
+def is_distinct_text_authors(q):
+    return 'how many' in q and 'distinct authors' in q and 'text' in q
+
+def fallback_keywords(question):
+    return [token for token in normalize_and_tokenize(question) if token not in FALLBACK_STOPWORDS and len(token) > 2]
+
 def apply_filters(metadata, question):
     q = normalize_text(question)
 
     # 1. Check if question asks about a person’s posts/details using common phrases
-    m_person = re.search(r'(?:post details of|posts shared by|posts by|post by|posts of|post of|posts from|post from|details about posts of)\s+([\w\s]+)', q)
+    m_person = PERSON_RE.search(q)
     if m_person:
+        mark_intent("filter.author_posts")
         person_name = m_person.group(1).strip()
         matched_posts = filter_by_author(metadata, person_name)
         if matched_posts:
             return matched_posts
 
     # 2. Followers filter
-    m_followers = re.search(r'followers.*?(?:greater|more|above|over|>|>=)\s*(\d+)', q)
+    m_followers = FOLLOWERS_RE.search(q)
     if m_followers:
+        mark_intent("filter.followers_threshold")
         thr = float(m_followers.group(1))
         return filter_by_numeric_threshold(metadata, 'followers', thr, '>')
 
     # 3. Role/title in description
-    m_role = re.search(r'(?:role|position|title|description).*?(?:is|mentions|contains|with|that mentions|with)\s*["\']?([\w\s]+)["\']?', q)
+    m_role = ROLE_RE.search(q)
     if m_role:
+        mark_intent("filter.description_attribute")
         attr = m_role.group(1).strip().lower()
         return filter_by_attribute_in_description(metadata, attr)
 
     # 4. Exact quoted keyword in post content
-    m_kw = re.search(r'post[s]? (?:content )?(?:mention|contain|with|about|that has)?\s*[\'"]([^\'"]+)[\'"]', q)
+    m_kw = QUOTED_KEYWORD_RE.search(q)
     if m_kw:
+        mark_intent("filter.quoted_keyword")
         kw = m_kw.group(1)
         return filter_by_keyword_in_post_content(metadata, kw)
 
     # 5. Posts from a month/year
-    m_date = re.search(r'posts? (?:from|in) (\w+)(?: (\d{4}))?', q)
+    m_date = MONTH_RE.search(q)
     if m_date:
+        mark_intent("filter.month_year")
         month = m_date.group(1).capitalize()
         year = int(m_date.group(2)) if m_date.group(2) else None
         return filter_posts_in_month_year(metadata, month, year)
 
+    # 5b. A misspelt person: only now, so "posts from june" is never read as "jane"
+    if m_person:
+        matched_posts = closest_rows(metadata, m_person.group(1).strip(), fields=('author',))
+        if matched_posts:
+            mark_intent("filter.author_posts")
+            return matched_posts
+
     # 6. Role + followers
-    m_role_fol = re.search(r'(?:role|position|title).*?["\']?([\w\s]+)["\'].*followers.*?(?:greater|more|above|over|>|>=)\s*(\d+)', q)
+    m_role_fol = ROLE_FOLLOWERS_RE.search(q)
     if m_role_fol:
+        mark_intent("filter.role_and_followers")
         role = m_role_fol.group(1).strip().lower()
         thr = float(m_role_fol.group(2))
         filtered = [i for i in filter_by_attribute_in_description(metadata, role) if i in filter_by_numeric_threshold(metadata, 'followers', thr, '>')]
         return filtered
 
     # 7. Post with max likes
-    if re.search(r'(most|highest|max).*like', q):
+    if MAX_LIKES_RE.search(q):
+        mark_intent("filter.max_likes")
         def parse_likes(post):
-            val = post.get('likeCount', 0)
-            try:
-                return float(str(val).replace(",", "").replace("+", "").strip())
-            except:
-                return 0
+            return count_value(post, 'likeCount') or 0
+
+        index = get_index(metadata)
+        top = index.first_max('likeCount') if index is not None else None
+        if top is not None:
+            return [metadata[top]]
 
         filtered_posts = [post for post in metadata if parse_likes(post) > 0]
         if not filtered_posts:
@@ -154,13 +242,15 @@ def apply_filters(metadata, question):
                 return [post]
 
     # 8. Post with max comments
-    if re.search(r'(most|highest|max).*comment', q):
+    if MAX_COMMENTS_RE.search(q):
+        mark_intent("filter.max_comments")
         def parse_comments(post):
-            val = post.get('commentCount', 0)
-            try:
-                return float(str(val).replace(",", "").replace("+", "").strip())
-            except:
-                return 0
+            return count_value(post, 'commentCount') or 0
+
+        index = get_index(metadata)
+        top = index.first_max('commentCount') if index is not None else None
+        if top is not None:
+            return [metadata[top]]
 
         filtered_posts = [post for post in metadata if parse_comments(post) > 0]
         if not filtered_posts:
@@ -172,35 +262,125 @@ def apply_filters(metadata, question):
                 return [post]
 
     # 9. Specific post URL
-    m_url = re.search(r'posturl.*?["\']?([^"\']+)["\']?', q)
+    m_url = POST_URL_RE.search(q)
     if m_url:
+        mark_intent("filter.post_url")
         url = m_url.group(1).strip()
-        return [i for i in metadata if i.get('postUrl', '').strip() == url]
+        index = get_index(metadata)
+        if index is not None:
+            return metadata.rows_at(index.by_url('postUrl', url))
+        key = canonical_post_url(url)
+        return [i for i in metadata if key and canonical_post_url(i.get('postUrl')) == key]
 
     # 10. Count distinct authors with text posts
-    if 'how many' in q and 'distinct authors' in q and 'text' in q:
+    if is_distinct_text_authors(q):
+        mark_intent("filter.distinct_text_authors")
         count = count_distinct_authors_text_posts(metadata)
         return [{"name": f"Count of distinct authors with Text posts: {count}"}]
 
     # 11. Fallback: keyword search in post content, but avoid common stopwords
-    stopwords = {
-        'give', 'me', 'details', 'of', 'the', 'which', 'that', 'has', 'have', 'mention',
-        'mentions', 'post', 'posts', 'content', 'show', 'display', 'with', 'who', 'whose',
-        'what', 'is', 'in', 'and', 'or', 'a', 'an', 'by', 'for', 'from', 'about'
-    }
-    question_tokens = normalize_and_tokenize(question)
-    keywords = [token for token in question_tokens if token not in stopwords and len(token) > 2]
-
+    keywords = fallback_keywords(question)
     if keywords:
-        def keyword_match(post):
-            post_tokens = normalize_and_tokenize(post.get('postContent', ''))
-            return any(token in post_tokens for token in keywords)
-        fallback_results = [post for post in metadata if keyword_match(post)]
+        mark_intent("filter.keyword_fallback")
+        fallback_results = filter_by_any_keyword(metadata, keywords)
         if fallback_results:
             return fallback_results
 
+    mark_intent("filter.no_match")
     return []
 
+# ----------------------------
+# Batches
+# ----------------------------
+
+def _contains(needle, value):
+    return needle in value
+
+def _month_needle(arg):
+    month_name, year = arg
+    try:
+        return (datetime.strptime(month_name, "%B").month if month_name else None), year
+    except Exception:
+        return None, year
+
+def _in_month_needle(needle, dt):
+    month_num, year = needle
+    return month_num is not None and dt is not None and dt.month == month_num and (year is None or dt.year == year)
+
+# lookup kind -> (lookup, prepare arg, row value, match) for batch.run_batch
+BATCH_KINDS = {
+    'author': (filter_by_author, normalize_name, lambda row: normalized_field(row, 'author'), _contains),
+    'description': (filter_by_attribute_in_description, normalize_text,
+                    lambda row: normalize_text(row.get('description', '')), _contains),
+    'keyword': (filter_by_keyword_in_post_content, normalize_text,
+                lambda row: normalize_text(row.get('postContent', '')), _contains),
+    'month': (lambda metadata, arg: filter_posts_in_month_year(metadata, *arg), _month_needle, _post_dt, _in_month_needle),
+    'any_keyword': (filter_by_any_keyword, tuple, lambda row: set(normalize_and_tokenize(row.get('postContent', ''))),
+                    lambda keywords, tokens: any(token in tokens for token in keywords)),
+}
+
+def batch_lookups(question):
+    # The lookup apply_filters' first matching branch makes; branches that
+    # need no row scan (thresholds, maxima, URLs, counts) prefetch nothing
+    q = normalize_text(question)
+    m = PERSON_RE.search(q)
+    if m:
+        return [('author', m.group(1).strip())]
+    if FOLLOWERS_RE.search(q):
+        return []
+    m = ROLE_RE.search(q)
+    if m:
+        return [('description', m.group(1).strip().lower())]
+    m = QUOTED_KEYWORD_RE.search(q)
+    if m:
+        return [('keyword', m.group(1))]
+    m = MONTH_RE.search(q)
+    if m:
+        return [('month', (m.group(1).capitalize(), int(m.group(2)) if m.group(2) else None))]
+    if (ROLE_FOLLOWERS_RE.search(q) or MAX_LIKES_RE.search(q) or MAX_COMMENTS_RE.search(q)
+            or POST_URL_RE.search(q) or is_distinct_text_authors(q)):
+        return []
+    keywords = fallback_keywords(question)
+    return [('any_keyword', tuple(keywords))] if keywords else []
+
+def apply_filters_many(metadata, questions):
+    # apply_filters for every question, sharing scans and lookups across the batch
+    return run_batch(metadata, questions, apply_filters, batch_lookups, BATCH_KINDS)
+
+# ----------------------------
+# Paged results
+# ----------------------------
+
+def engagement_key(post):
+    return (count_value(post, 'likeCount') or 0, count_value(post, 'commentCount') or 0)
+
+def author_cursor(metadata, question, page_size=PAGE_SIZE):
+    # Branch 1 of apply_filters served from the author -> posts index: the
+    # matched authors' posts come out already in engagement order, so a page
+    # costs a merge of presorted lists rather than ranking every match
+    index, author_posts = get_index(metadata), get_author_posts(metadata)
+    m_person = PERSON_RE.search(normalize_text(question))
+    if index is None or author_posts is None or not m_person:
+        return None
+    names = index.names['author'].match(m_person.group(1).strip(), fuzzy=False)
+    if not names or not all(names):
+        return None
+    mark_intent("filter.author_posts")
+    ranked = (metadata[i] for i in author_posts.merged(names, 'engagement'))
+    return ResultCursor(ranked, page_size=page_size)
+
+def filter_cursor(metadata, question, page_size=PAGE_SIZE):
+    # Same matches as apply_filters, ranked by engagement and formatted a page at a time.
+    # Only the author listing is produced lazily; the other branches build their
+    # full match list in apply_filters and the cursor saves just the full sort
+    cursor = author_cursor(metadata, question, page_size)
+    if cursor is not None:
+        return cursor
+    results = apply_filters(metadata, question)
+    # Single-row answers (max likes, distinct author count) need no ranking
+    key = engagement_key if len(results) > 1 else None
+    return ResultCursor(results, key=key, page_size=page_size)
+
 # ----------------------------
 # Output formatter
 # ----------------------------
@@ -217,7 +397,7 @@ def format_results(posts):
         block = f"""
 👤 **Name**: {post.get('name', 'N/A')}
 🔗 **Profile URL**: {post.get('profile_url', 'N/A')}
-👥 **Followers**: {post.get('followers', 'N/A')}
+👥 **Followers**: {display_count(post, 'followers')}
 
 📝 **Post Content**:
 {post.get('postContent', 'N/A')}
@@ -225,10 +405,23 @@ def format_results(posts):
 📎 **Post URL**: {post.get('postUrl', 'N/A')}
 📅 **Post Date**: {post.get('postDate', 'N/A')}
 📌 **Type**: {post.get('type', 'N/A')}
-👍 **Likes**: {post.get('likeCount', 'N/A')} | 💬 **Comments**: {post.get('commentCount', 'N/A')} | 🔁 **Reposts**: {post.get('repostCount', 'N/A')}
+👍 **Likes**: {display_count(post, 'likeCount')} | 💬 **Comments**: {display_count(post, 'commentCount')} | 🔁 **Reposts**: {display_count(post, 'repostCount')}
 
 👤 **Author**: {post.get('author', 'N/A')} ([LinkedIn]({post.get('authorUrl', '#')}))
         """.strip()
         results.append(block)
 
     return "\n\n---\n\n".join(results)
+
+def format_page(cursor, number):
+    # Labels from what the page pulled: an exact count once the matches ran
+    # out, else "N+", so a lazy cursor is never materialized just for a header
+    posts = cursor.page(number)
+    cursor.has_next(number)
+    seen, exact = cursor.count()
+    if not posts or (exact and seen == 1):
+        return format_results(posts)
+    start = number * cursor.page_size
+    total = seen if exact else f"{seen}+"
+    header = f"Showing {start + 1}–{start + len(posts)} of {total} results"
+    return header + "\n\n" + format_results(posts)
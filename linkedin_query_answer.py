@@ -2,6 +2,12 @@ import re
 import string
 from unidecode import unidecode
 from collections import Counter
+from schema import NORMALIZED_FIELDS, canonical_post_url, canonical_profile_url, count_value, display_count, normalize_name, normalized_field
+from tracing import mark_intent
+from author_posts import get_author_posts
+from metadata_index import closest_rows, get_index, name_index
+from aggregates import get_aggregates
+from batch import prefetched, run_batch
 
 # --- Utility functions ---
 
@@ -20,31 +26,119 @@ def normalize_and_tokenize(text):
 # --- Metadata filtering ---
 
 def filter_by_field(metadata, field, value, exact=False):
-    value_norm = normalize_text(value)
+    results = _match_field(metadata, field, value, exact)
+    if not results and not exact and field in NORMALIZED_FIELDS:
+        # No substring match: the closest names, on every layout
+        return closest_rows(metadata, value, fields=(field,))
+    return results
+
+def _match_field(metadata, field, value, exact):
+    index = get_index(metadata)
+    if field in NORMALIZED_FIELDS and index is not None:
+        names = index.names[field]
+        return metadata.rows_at(names.exact(value) if exact else names.lookup(value, fuzzy=False))
+    if field in NORMALIZED_FIELDS:
+        # author/name are pre-normalized at build time
+        value_norm = normalize_name(value)
+        get_value = lambda item: normalized_field(item, field)
+    else:
+        value_norm = normalize_text(value)
+        get_value = lambda item: normalize_text(str(item.get(field, "")))
     results = []
     for item in metadata:
-        item_val = normalize_text(str(item.get(field, "")))
+        item_val = get_value(item)
         if exact and item_val == value_norm:
             results.append(item)
         elif not exact and value_norm in item_val:
             results.append(item)
     return results
 
-def filter_by_post_url(metadata, url_fragment):
+def same_post(key, url):
+    # canonical_post_url(url) == key, skipping the parse when the post id is not in the URL
+    if not key:
+        return False
+    post_id = key.rsplit(':', 1)[-1]
+    if post_id.isdigit() and post_id not in str(url or ''):
+        return False
+    return canonical_post_url(url) == key
+
+def match_post_url(rows, url_fragment):
+    # Canonical match first (tracking params, URN spellings); a bare fragment
+    # that is not a full post URL still gets the substring test
+    key = canonical_post_url(url_fragment)
+    matched = [item for item in rows if same_post(key, item.get('postUrl'))]
+    if matched:
+        return matched
     url_fragment = normalize_text(url_fragment)
-    return [item for item in metadata if url_fragment in normalize_text(item.get('postUrl', ''))]
+    return [item for item in rows if url_fragment in normalize_text(item.get('postUrl', ''))]
+
+def filter_by_post_url(metadata, url_fragment):
+    rows = prefetched('post_url', url_fragment)
+    if rows is not None:
+        # A plain-list batch prefetches both kinds of match
+        return match_post_url(rows, url_fragment)
+    index = get_index(metadata)
+    if index is not None:
+        matched = metadata.rows_at(index.by_url('postUrl', url_fragment))
+        if matched:
+            return matched
+        url_fragment = normalize_text(url_fragment)
+        return [item for item in metadata if url_fragment in normalize_text(item.get('postUrl', ''))]
+    return match_post_url(metadata, url_fragment)
+
+def filter_by_profile_url(metadata, url, field='profile_url'):
+    index = get_index(metadata)
+    if index is not None:
+        return metadata.rows_at(index.by_url(field, url))
+    key = canonical_profile_url(url)
+    slug = key.split(':')[-1]
+    return [item for item in metadata if key and slug in str(item.get(field, '')).lower()
+            and canonical_profile_url(item.get(field)) == key]
 
 def filter_by_keyword_in_post_content(metadata, keyword):
+    rows = prefetched('keyword', keyword)
+    if rows is not None:
+        return rows
     keyword = normalize_text(keyword)
+    index = get_index(metadata)
+    if index is not None:
+        return metadata.rows_at(index.text['postContent'].containing(keyword))
     return [item for item in metadata if keyword in normalize_text(item.get('postContent', ''))]
 
 def filter_by_author(metadata, author_name):
     return filter_by_field(metadata, 'author', author_name)
 
 def filter_by_name(metadata, name):
+    rows = prefetched('name', name)
+    if rows is not None:
+        # A plain-list batch prefetches substring matches only
+        return rows or closest_rows(metadata, name, fields=('name',))
     return filter_by_field(metadata, 'name', name)
 
+def count_posts_by_author(metadata, author):
+    # (count, None) for an exact author; a misspelt one counts the posts of the
+    # closest author name, returned as its display name, but only when that
+    # match is unique: tied names would add up unrelated authors
+    author_norm = normalize_name(author)
+    index = get_index(metadata)
+    author_posts = get_author_posts(metadata)
+    if index is not None and author_posts is not None:
+        count = author_posts.count(author_norm)
+    else:
+        count = sum(1 for post in metadata if normalized_field(post, 'author') == author_norm)
+    if count or not author_norm:
+        return count, None
+    names = name_index(metadata, 'author')
+    closest = names.closest(author_norm)
+    if len(closest) != 1:
+        return 0, None
+    rows = names.rows(closest)
+    return len(rows), metadata[int(rows[0])].get('author') or closest[0]
+
 def get_most_common_post_type(metadata):
+    aggregates = get_aggregates(metadata)
+    if aggregates is not None:
+        return aggregates.most_common_type()
     types = [normalize_text(post.get('type', '')) for post in metadata if post.get('type')]
     if not types:
         return None
@@ -52,32 +146,45 @@ def get_most_common_post_type(metadata):
     return most_common[0][0] if most_common else None
 
 def calculate_average_likecount(metadata):
+    aggregates = get_aggregates(metadata)
+    if aggregates is not None:
+        return aggregates.average_likes()
     likes = []
     for post in metadata:
-        val = str(post.get('likeCount', '')).replace('+', '').replace(',', '').strip()
-        try:
-            likes.append(float(val))
-        except:
-            continue
+        val = count_value(post, 'likeCount')
+        if val is not None:
+            likes.append(val)
     if not likes:
         return None
     return sum(likes) / len(likes)
 
 # --- Main function to interpret query and answer ---
 
+PROFILE_DETAILS_RE = re.compile(r'profile details of ([\w\s]+)')
+NAME_TITLE_BY_URL_RE = re.compile(r'name and title.*profile url[^\w]*(https?://[^\s]+)')
+FOLLOWERS_BY_NAME_RE = re.compile(r'how many followers does ([\w\s]+) have')
+CONTENT_BY_URL_RE = re.compile(r'postcontent.*posturl[^\w]*(https?://[^\s]+)')
+TYPE_BY_URL_RE = re.compile(r'type of post.*(https?://[^\s]+)')
+LIKES_BY_AUTHOR_URL_RE = re.compile(r'likecount.*post authored by ([\w\s]+).*posturl[^\w]*(https?://[^\s]+)')
+AUTHOR_BY_KEYWORD_RE = re.compile(r'author.*post.*mentioning [\'"]?([\w\s]+)[\'"]?')
+POST_COUNT_RE = re.compile(r'how many posts were made by[\'\"]?([\w\s]+)[\'\"]?')
+DETAILS_BY_KEYWORD_RE = re.compile(r'details.*mentions[\'"]?([\w\s]+)[\'"]?')
+QUOTED_RE = re.compile(r'["\']([\w\s]+)["\']')
+
 def answer_linkedin_query(metadata, question):
     q = normalize_text(question)
 
     # 0. Profile details by person name, e.g. "give me profile details of Madhuri Jain"
-    m = re.search(r'profile details of ([\w\s]+)', q)
+    m = PROFILE_DETAILS_RE.search(q)
     if m:
+        mark_intent("answer.profile_details")
         person = m.group(1).strip()
         matched = filter_by_name(metadata, person)
         if matched:
             p = matched[0]
             name = p.get('name', 'N/A')
             title = p.get('description', p.get('title', 'N/A'))
-            followers = p.get('followers', 'N/A')
+            followers = display_count(p, 'followers')
             profile_url = p.get('profileUrl', p.get('profile_url', 'N/A'))
             return (
                 f"Profile details for {person.title()}:\n"
@@ -90,10 +197,11 @@ def answer_linkedin_query(metadata, question):
             return f"No profile details found for '{person}'."
 
     # 1. Name and title by profile URL
-    m = re.search(r'name and title.*profile url[^\w]*(https?://[^\s]+)', q)
+    m = NAME_TITLE_BY_URL_RE.search(q)
     if m:
+        mark_intent("answer.name_title_by_profile_url")
         url = m.group(1)
-        matched = filter_by_post_url(metadata, url)
+        matched = filter_by_profile_url(metadata, url)
         if matched:
             p = matched[0]
             name = p.get('name', 'N/A')
@@ -101,17 +209,19 @@ def answer_linkedin_query(metadata, question):
             return f"The person's name and title is '{name} - {title}'."
 
     # 2. Followers count by person name
-    m = re.search(r'how many followers does ([\w\s]+) have', q)
+    m = FOLLOWERS_BY_NAME_RE.search(q)
     if m:
+        mark_intent("answer.followers_by_name")
         person = m.group(1)
         matched = filter_by_name(metadata, person)
         if matched:
-            followers = matched[0].get('followers', 'N/A')
+            followers = display_count(matched[0], 'followers')
             return f"{person.title()} has '{followers}' followers."
 
     # 3. Post content by postUrl
-    m = re.search(r'postcontent.*posturl[^\w]*(https?://[^\s]+)', q)
+    m = CONTENT_BY_URL_RE.search(q)
     if m:
+        mark_intent("answer.content_by_post_url")
         url = m.group(1)
         matched = filter_by_post_url(metadata, url)
         if matched:
@@ -120,8 +230,9 @@ def answer_linkedin_query(metadata, question):
             return f"The `postContent` is '{content}'\n🔗 Post URL: {url_}"
 
     # 4. Type of post by URL
-    m = re.search(r'type of post.*(https?://[^\s]+)', q)
+    m = TYPE_BY_URL_RE.search(q)
     if m:
+        mark_intent("answer.type_by_post_url")
         url = m.group(1)
         matched = filter_by_post_url(metadata, url)
         if matched:
@@ -129,19 +240,21 @@ def answer_linkedin_query(metadata, question):
             return f"The post is of type '{post_type}'."
 
     # 5. LikeCount by author and postUrl
-    m = re.search(r'likecount.*post authored by ([\w\s]+).*posturl[^\w]*(https?://[^\s]+)', q)
+    m = LIKES_BY_AUTHOR_URL_RE.search(q)
     if m:
+        mark_intent("answer.likes_by_author_and_url")
         author = m.group(1)
         url = m.group(2)
         candidates = filter_by_post_url(metadata, url)
-        candidates = [c for c in candidates if normalize_text(c.get('author', '')) == normalize_text(author)]
+        candidates = [c for c in candidates if normalized_field(c, 'author') == normalize_name(author)]
         if candidates:
-            likecount = candidates[0].get('likeCount', 'N/A')
+            likecount = display_count(candidates[0], 'likeCount')
             return f"The `likeCount` is '{likecount}'."
 
     # 6. Author by keyword in postContent
-    m = re.search(r'author.*post.*mentioning [\'"]?([\w\s]+)[\'"]?', q)
+    m = AUTHOR_BY_KEYWORD_RE.search(q)
     if m:
+        mark_intent("answer.author_by_keyword")
         keyword = m.group(1)
         matched = filter_by_keyword_in_post_content(metadata, keyword)
         if matched:
@@ -150,26 +263,32 @@ def answer_linkedin_query(metadata, question):
 
     # 7. Most common type of post
     if "most common type of post" in q or "most frequent type of post" in q:
+        mark_intent("answer.most_common_type")
         post_type = get_most_common_post_type(metadata)
         if post_type:
             return f"The most common type of post is '{post_type.capitalize()}'."
 
     # 8. Number of posts made by author
-    m = re.search(r'how many posts were made by[\'\"]?([\w\s]+)[\'\"]?', q)
+    m = POST_COUNT_RE.search(q)
     if m:
+        mark_intent("answer.post_count_by_author")
         author = m.group(1)
-        count = sum(1 for post in metadata if normalize_text(post.get('author', '')) == normalize_text(author))
+        count, closest = count_posts_by_author(metadata, author)
+        if closest:
+            return f"'{count}' posts were made by {closest} (closest match to '{author.strip()}') as the author."
         return f"'{count}' posts were made by {author} as the author."
 
     # 9. Average likeCount
     if "average likecount" in q or "average number of likes" in q:
+        mark_intent("answer.average_likes")
         avg = calculate_average_likecount(metadata)
         if avg is not None:
             return f"The average `likeCount` for all posts is approximately '{round(avg, 2)}'."
 
     # 10. Details about posts mentioning a keyword
-    m = re.search(r'details.*mentions[\'"]?([\w\s]+)[\'"]?', q)
+    m = DETAILS_BY_KEYWORD_RE.search(q)
     if m:
+        mark_intent("answer.details_by_keyword")
         keyword = m.group(1)
         matched = filter_by_keyword_in_post_content(metadata, keyword)
         if matched:
@@ -180,24 +299,23 @@ def answer_linkedin_query(metadata, question):
                 f"Post Content: '{post.get('postContent', 'N/A')}', "
                 f"Author: '{post.get('author', 'N/A')}', "
                 f"Post Date: '{post.get('postDate', 'N/A')}', "
-                f"Like Count: '{post.get('likeCount', 'N/A')}'.\n"
+                f"Like Count: '{display_count(post, 'likeCount')}'.\n"
                 f"🔗 Post URL: {url_}"
             )
 
     # 11. Profile with maximum followers
     if "maximum followers" in q or "most followers" in q or "highest followers" in q:
+        mark_intent("answer.max_followers")
         def parse_followers(post):
-            val = str(post.get('followers', '')).replace('+', '').replace(',', '').strip()
-            try:
-                return float(re.findall(r'[\d.]+', val)[0])
-            except:
-                return 0
+            return count_value(post, 'followers') or 0
 
-        top_profile = max(metadata, key=parse_followers, default=None)
+        index = get_index(metadata)
+        top = index.first_max('followers') if index is not None else None
+        top_profile = metadata[top] if top is not None else max(metadata, key=parse_followers, default=None)
         if top_profile:
             name = top_profile.get("name", "N/A")
             title = top_profile.get("description", top_profile.get("title", "N/A"))
-            followers = top_profile.get("followers", "N/A")
+            followers = display_count(top_profile, 'followers')
             profile_url = top_profile.get("profile_url", top_profile.get("profileUrl", "N/A"))
             return (
                 f"The person with the most followers is '{name} - {title}' "
@@ -206,17 +324,17 @@ def answer_linkedin_query(metadata, question):
 
     # 12. Post with maximum likes
     if "maximum likes" in q or "most likes" in q or "highest likes" in q:
+        mark_intent("answer.max_likes")
         def parse_likes(post):
-            try:
-                return float(str(post.get('likeCount', '0')).replace('+', '').replace(',', '').strip())
-            except:
-                return 0
+            return count_value(post, 'likeCount') or 0
 
-        liked_post = max(metadata, key=parse_likes, default=None)
+        index = get_index(metadata)
+        top = index.first_max('likeCount') if index is not None else None
+        liked_post = metadata[top] if top is not None else max(metadata, key=parse_likes, default=None)
         if liked_post:
             content = liked_post.get('postContent', 'N/A')
             author = liked_post.get('author', 'N/A')
-            likecount = liked_post.get('likeCount', 'N/A')
+            likecount = display_count(liked_post, 'likeCount')
             url = liked_post.get('postUrl', 'N/A')
             return (
                 f"The post with the most likes has '{likecount}' likes.\n\n"
@@ -225,17 +343,17 @@ def answer_linkedin_query(metadata, question):
 
     # 13. Post with maximum comments
     if "maximum comments" in q or "most comments" in q or "highest comments" in q:
+        mark_intent("answer.max_comments")
         def parse_comments(post):
-            try:
-                return float(str(post.get('commentCount', '0')).replace('+', '').replace(',', '').strip())
-            except:
-                return 0
+            return count_value(post, 'commentCount') or 0
 
-        commented_post = max(metadata, key=parse_comments, default=None)
+        index = get_index(metadata)
+        top = index.first_max('commentCount') if index is not None else None
+        commented_post = metadata[top] if top is not None else max(metadata, key=parse_comments, default=None)
         if commented_post:
             content = commented_post.get('postContent', 'N/A')
             author = commented_post.get('author', 'N/A')
-            comments = commented_post.get('commentCount', 'N/A')
+            comments = display_count(commented_post, 'commentCount')
             url = commented_post.get('postUrl', 'N/A')
             return (
                 f"The post with the most comments has '{comments}' comments.\n\n"
@@ -243,8 +361,9 @@ def answer_linkedin_query(metadata, question):
             )
 
     # 🔥 Enhanced fallback: quoted keyword
-    m = re.search(r'["\']([\w\s]+)["\']', question)
+    m = QUOTED_RE.search(question)
     if m:
+        mark_intent("answer.quoted_keyword")
         quoted_kw = m.group(1)
         matched = filter_by_keyword_in_post_content(metadata, quoted_kw)
         if matched:
@@ -260,6 +379,7 @@ def answer_linkedin_query(metadata, question):
     for token in tokens:
         matched = filter_by_keyword_in_post_content(metadata, token)
         if matched:
+            mark_intent("answer.any_keyword")
             post = matched[0]
             url_ = post.get('postUrl', 'N/A')
             return (
@@ -267,4 +387,56 @@ def answer_linkedin_query(metadata, question):
                 f"🔗 Post URL: {url_}"
             )
 
+    mark_intent("answer.no_answer")
     return "Sorry, I couldn't find an answer to that question."
+
+# --- Batches ---
+
+def _contains(needle, value):
+    return needle in value
+
+def _post_url_match(needle, value):
+    # Either half of match_post_url; filter_by_post_url picks between them
+    key, fragment = needle
+    return fragment in value[1] or same_post(key, value[0])
+
+# lookup kind -> (lookup, prepare arg, row value, match) for batch.run_batch
+BATCH_KINDS = {
+    'name': (filter_by_name, normalize_name, lambda row: normalized_field(row, 'name'), _contains),
+    'post_url': (filter_by_post_url, lambda url: (canonical_post_url(url), normalize_text(url)),
+                 lambda row: (row.get('postUrl'), normalize_text(row.get('postUrl', ''))), _post_url_match),
+    'keyword': (filter_by_keyword_in_post_content, normalize_text,
+                lambda row: normalize_text(row.get('postContent', '')), _contains),
+}
+
+LOOKUP_BRANCHES = [
+    (PROFILE_DETAILS_RE, lambda m: ('name', m.group(1).strip())),
+    (FOLLOWERS_BY_NAME_RE, lambda m: ('name', m.group(1))),
+    (CONTENT_BY_URL_RE, lambda m: ('post_url', m.group(1))),
+    (TYPE_BY_URL_RE, lambda m: ('post_url', m.group(1))),
+    (LIKES_BY_AUTHOR_URL_RE, lambda m: ('post_url', m.group(2))),
+    (AUTHOR_BY_KEYWORD_RE, lambda m: ('keyword', m.group(1))),
+    (DETAILS_BY_KEYWORD_RE, lambda m: ('keyword', m.group(1))),
+]
+# Phrases of the branches answered from aggregates or the numeric index
+DIRECT_PHRASES = (
+    "most common type of post", "most frequent type of post", "average likecount", "average number of likes",
+    "maximum followers", "most followers", "highest followers", "maximum likes", "most likes", "highest likes",
+    "maximum comments", "most comments", "highest comments",
+)
+
+def batch_lookups(question):
+    # Lookups of every branch the question matches; the keyword fallbacks
+    # only for questions no branch takes
+    q = normalize_text(question)
+    lookups = [arg(m) for regex, arg in LOOKUP_BRANCHES for m in [regex.search(q)] if m]
+    if lookups or NAME_TITLE_BY_URL_RE.search(q) or POST_COUNT_RE.search(q) or any(p in q for p in DIRECT_PHRASES):
+        return lookups
+    m = QUOTED_RE.search(question)
+    if m:
+        return [('keyword', m.group(1))]
+    return [('keyword', token) for token in normalize_and_tokenize(q)]
+
+def answer_many(metadata, questions):
+    # answer_linkedin_query for every question, sharing scans and lookups across the batch
+    return run_batch(metadata, questions, answer_linkedin_query, batch_lookups, BATCH_KINDS)
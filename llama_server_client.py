@@ -0,0 +1,198 @@
+# llama_server_client.py
+#
+# Client for a local llama-server (llama.cpp/tools/server) over its
+# OpenAI-compatible HTTP API. Start the server once, e.g.
+#
+#   python llama_server_client.py --model models/llama-7b.Q4_K_M.gguf --parallel 4
+#
+# and every Streamlit worker shares the same model instance; concurrent
+# requests are spread over the server's slots with continuous batching.
+
+import argparse
+import os
+import subprocess
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+LLAMA_SERVER_URL = os.getenv("LLAMA_SERVER_URL", "http://127.0.0.1:8080")
+LLAMA_SERVER_API_KEY = os.getenv("LLAMA_SERVER_API_KEY")
+LLAMA_SERVER_POOL_SIZE = int(os.getenv("LLAMA_SERVER_POOL_SIZE", "8"))
+LLAMA_SERVER_TIMEOUT = float(os.getenv("LLAMA_SERVER_TIMEOUT", "120"))
+LLAMA_SERVER_BIN = os.getenv("LLAMA_SERVER_BIN", "llama.cpp/build/bin/llama-server")
+
+HEALTH_TTL = 5.0
+
+class LlamaServerError(RuntimeError):
+    pass
+
+class LlamaServerClient:
+    def __init__(self, base_url=LLAMA_SERVER_URL, pool_size=LLAMA_SERVER_POOL_SIZE,
+                 timeout=LLAMA_SERVER_TIMEOUT, api_key=LLAMA_SERVER_API_KEY):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        # Keep-alive pool sized to the number of concurrent requests we expect;
+        # only idempotent GETs (health/props) are retried automatically.
+        retry = Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 504], allowed_methods=["GET"])
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+        self._health_lock = threading.Lock()
+        self._healthy_until = 0.0
+        self._model_id = None
+
+    # ----------------------------
+    # Health and server properties
+    # ----------------------------
+
+    def health(self):
+        try:
+            r = self.session.get(f"{self.base_url}/health", timeout=5)
+        except requests.RequestException:
+            return False
+        # 503 means the server is up but still loading the model
+        return r.status_code == 200
+
+    def wait_until_ready(self, timeout=120, interval=0.5):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.health():
+                return True
+            time.sleep(interval)
+        raise LlamaServerError(f"llama-server at {self.base_url} not ready after {timeout}s")
+
+    def ensure_healthy(self):
+        now = time.time()
+        if now < self._healthy_until:
+            return
+        with self._health_lock:
+            if time.time() < self._healthy_until:
+                return
+            if not self.health():
+                raise LlamaServerError(f"llama-server at {self.base_url} is not healthy")
+            # The server may have been restarted on another model since the last check
+            self._model_id = None
+            self._healthy_until = time.time() + HEALTH_TTL
+
+    def props(self):
+        r = self.session.get(f"{self.base_url}/props", timeout=10)
+        r.raise_for_status()
+        return r.json()
+
+    def model_id(self):
+        # The model the server actually loaded (for cache keys), re-read after
+        # every fresh health check
+        self.ensure_healthy()
+        model = self._model_id
+        if model is None:
+            model = self.props().get("model_path")
+            if not model:
+                r = self.session.get(f"{self.base_url}/v1/models", timeout=10)
+                r.raise_for_status()
+                model = r.json()["data"][0]["id"]
+            self._model_id = model
+        return model
+
+    def total_slots(self):
+        return self.props().get("total_slots", 1)
+
+    # ----------------------------
+    # OpenAI-compatible endpoints
+    # ----------------------------
+
+    def _post(self, path, payload):
+        self.ensure_healthy()
+        try:
+            r = self.session.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            # Force a fresh health check on the next call
+            self._healthy_until = 0.0
+            raise LlamaServerError(f"llama-server request failed: {e}") from e
+        if r.status_code != 200:
+            raise LlamaServerError(f"llama-server returned {r.status_code}: {r.text[:200]}")
+        return r.json()
+
+    def chat_completion(self, messages, temperature=0.7, max_tokens=300, **params):
+        payload = {
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            # Reuse the slot's KV cache for the shared system-prompt prefix
+            "cache_prompt": True,
+        }
+        payload.update({k: v for k, v in params.items() if v is not None})
+        data = self._post("/v1/chat/completions", payload)
+        return data["choices"][0]["message"]["content"].strip()
+
+    def completion(self, prompt, temperature=0.7, max_tokens=150, stop=None, **params):
+        payload = {
+            "prompt": prompt,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "cache_prompt": True,
+        }
+        if stop:
+            payload["stop"] = stop
+        payload.update({k: v for k, v in params.items() if v is not None})
+        data = self._post("/v1/completions", payload)
+        return data["choices"][0]["text"].strip()
+
+    def close(self):
+        self.session.close()
+
+# ----------------------------
+# Launching the server
+# ----------------------------
+
+def server_command(model_path, host="127.0.0.1", port=8080, parallel=4, n_ctx=2048,
+                   n_threads=None, binary=LLAMA_SERVER_BIN, extra_args=None):
+    # llama-server splits --ctx-size across slots, so give each slot the full n_ctx
+    cmd = [
+        binary,
+        "--model", model_path,
+        "--host", host,
+        "--port", str(port),
+        "--parallel", str(parallel),
+        "--ctx-size", str(n_ctx * parallel),
+        "--cont-batching",
+    ]
+    if n_threads:
+        cmd += ["--threads", str(n_threads)]
+    if extra_args:
+        cmd += list(extra_args)
+    return cmd
+
+def main():
+    parser = argparse.ArgumentParser(description="Launch a local llama-server for the LinkedIn assistant")
+    parser.add_argument("--model", default=os.getenv("LLAMA_MODEL_PATH", "models/llama-7b.Q4_K_M.gguf"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--parallel", type=int, default=4)
+    parser.add_argument("--ctx-size", type=int, default=2048)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--binary", default=LLAMA_SERVER_BIN)
+    args = parser.parse_args()
+
+    cmd = server_command(args.model, args.host, args.port, args.parallel, args.ctx_size, args.threads, args.binary)
+    print("Starting:", " ".join(cmd))
+    proc = subprocess.Popen(cmd)
+    try:
+        LlamaServerClient(f"http://{args.host}:{args.port}").wait_until_ready()
+        print(f"llama-server ready on http://{args.host}:{args.port} with {args.parallel} slots")
+        proc.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Also on a failed start (timeout, bad model path, port in use)
+        if proc.poll() is None:
+            proc.terminate()
+            proc.wait()
+
+if __name__ == "__main__":
+    main()
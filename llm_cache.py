@@ -0,0 +1,134 @@
+# llm_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite")
+CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Sampled generations (the app's drafts at temperature 0.7) must differ per
+# call, so by default only temperature-0 or seeded requests are memoized:
+# the app and postcontent.py are uncached, generate_new_posts.py passes a seed
+CACHE_ONLY_DETERMINISTIC = os.getenv("LLM_CACHE_ONLY_DETERMINISTIC", "1") == "1"
+
+# ----------------------------
+# Cache keys
+# ----------------------------
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def hash_messages(messages):
+    # A plain prompt string is treated as a single user message so that
+    # completion-style and chat-style calls share one key space.
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    return _sha256(json.dumps(messages, sort_keys=True, ensure_ascii=False))
+
+def make_cache_key(backend, model, messages, temperature, max_tokens, **extra):
+    parts = {
+        "backend": backend,
+        "model": model,
+        "messages": hash_messages(messages),
+        "temperature": round(float(temperature), 4),
+        "max_tokens": int(max_tokens),
+    }
+    # Extra sampling params (top_p, grammar, ...) change the output too
+    for k, v in extra.items():
+        if v is not None:
+            parts[k] = v
+    return _sha256(json.dumps(parts, sort_keys=True, default=str))
+
+# ----------------------------
+# Persistent generation cache
+# ----------------------------
+
+class GenerationCache:
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES, only_deterministic=CACHE_ONLY_DETERMINISTIC):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.only_deterministic = only_deterministic
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS generations (
+                key TEXT PRIMARY KEY,
+                backend TEXT,
+                model TEXT,
+                temperature REAL,
+                max_tokens INTEGER,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_generations_lru ON generations(last_used_at)")
+
+    def should_cache(self, temperature, seed=None):
+        return not self.only_deterministic or float(temperature) == 0.0 or seed is not None
+
+    def get(self, backend, model, messages, temperature, max_tokens, **extra):
+        if not self.should_cache(temperature, extra.get("seed")):
+            return None
+        key = make_cache_key(backend, model, messages, temperature, max_tokens, **extra)
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM generations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE generations SET last_used_at = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put(self, backend, model, messages, temperature, max_tokens, response, **extra):
+        if not self.should_cache(temperature, extra.get("seed")) or response is None:
+            return
+        key = make_cache_key(backend, model, messages, temperature, max_tokens, **extra)
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO generations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, backend, model, float(temperature), int(max_tokens), response, size, now, now),
+            )
+            self._evict()
+
+    def _evict(self):
+        # Drop least-recently-used entries until the stored responses fit in max_bytes
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM generations").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM generations ORDER BY last_used_at ASC"):
+            victims.append((key,))
+            freed += size
+            if total - freed <= self.max_bytes:
+                break
+        self._conn.executemany("DELETE FROM generations WHERE key = ?", victims)
+
+    def stats(self):
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM generations").fetchone()
+        return {"entries": count, "bytes": total, "max_bytes": self.max_bytes}
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM generations")
+
+    def close(self):
+        self._conn.close()
+
+_default_cache = None
+
+def get_default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = GenerationCache()
+    return _default_cache
@@ -0,0 +1,115 @@
+# llm_runtime.py
+#
+# Shared text-generation runtime. LLM_BACKEND selects where generations run:
+#   openai        - OpenAI chat completions (default)
+#   llama-server  - a local llama-server shared by all app workers
+#   local         - an in-process llama-cpp-python model
+
+import os
+import threading
+
+from dotenv import load_dotenv
+from llm_cache import get_default_cache
+from tracing import set_attr, span
+
+load_dotenv()
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4")
+LLAMA_MODEL_PATH = os.getenv("LLAMA_MODEL_PATH", "models/llama-7b.Q4_K_M.gguf")
+LLAMA_N_CTX = int(os.getenv("LLAMA_N_CTX", "2048"))
+LLAMA_N_THREADS = int(os.getenv("LLAMA_N_THREADS", "4"))
+# Speculative decoding for the local backend: "", "prompt-lookup" or a draft .gguf path
+LLAMA_DRAFT = os.getenv("LLAMA_DRAFT", "")
+LLAMA_DRAFT_TOKENS = int(os.getenv("LLAMA_DRAFT_TOKENS", "8"))
+
+_lock = threading.Lock()
+_openai_client = None
+_llama_server = None
+_local_llm = None
+
+def get_openai_client():
+    global _openai_client
+    with _lock:
+        if _openai_client is None:
+            from openai import OpenAI
+            _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _openai_client
+
+def get_llama_server():
+    global _llama_server
+    with _lock:
+        if _llama_server is None:
+            from llama_server_client import LlamaServerClient
+            _llama_server = LlamaServerClient()
+    return _llama_server
+
+def load_local_llm(model_path=LLAMA_MODEL_PATH, draft=LLAMA_DRAFT, **kwargs):
+    from llama_cpp import Llama
+    draft_model = None
+    if draft:
+        from speculative import make_draft_model
+        draft_model = make_draft_model(draft, LLAMA_DRAFT_TOKENS, n_ctx=LLAMA_N_CTX, n_threads=LLAMA_N_THREADS)
+    return Llama(
+        model_path=model_path,
+        n_ctx=LLAMA_N_CTX,
+        n_threads=LLAMA_N_THREADS,
+        draft_model=draft_model,
+        verbose=False,
+        **kwargs
+    )
+
+def get_local_llm():
+    global _local_llm
+    with _lock:
+        if _local_llm is None:
+            _local_llm = load_local_llm()
+    return _local_llm
+
+def model_name(backend):
+    # Part of the cache key, so it names the model that actually generates
+    if backend == "openai":
+        return OPENAI_MODEL
+    if backend == "llama-server":
+        return get_llama_server().model_id()
+    return os.path.basename(LLAMA_MODEL_PATH)
+
+def chat(messages, temperature=0.7, max_tokens=300, backend=None, model=None, cache=None, **params):
+    backend = backend or LLM_BACKEND
+    model = model or model_name(backend)
+    cache = cache if cache is not None else get_default_cache()
+
+    with span("llm_cache_lookup"):
+        hit = cache.get(backend, model, messages, temperature, max_tokens, **params)
+    set_attr("llm_cache", "hit" if hit is not None else "miss")
+    if hit is not None:
+        return hit
+
+    with span(f"llm_{backend}", model=model):
+        content = _generate(backend, model, messages, temperature, max_tokens, **params)
+    cache.put(backend, model, messages, temperature, max_tokens, content, **params)
+    return content
+
+def _generate(backend, model, messages, temperature, max_tokens, **params):
+    if backend == "openai":
+        response = get_openai_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **params
+        )
+        content = response.choices[0].message.content.strip()
+    elif backend == "llama-server":
+        content = get_llama_server().chat_completion(messages, temperature=temperature, max_tokens=max_tokens, **params)
+    elif backend == "local":
+        response = get_local_llm().create_chat_completion(
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **params
+        )
+        content = response["choices"][0]["message"]["content"].strip()
+    else:
+        raise ValueError(f"Unknown LLM_BACKEND: {backend}")
+    return content
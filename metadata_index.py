@@ -0,0 +1,456 @@
+# metadata_index.py
+#
+# In-memory indexes over a loaded metadata snapshot. IndexedMetadata is still
+# a plain list of rows, so every engine keeps working on it unchanged; engines
+# that find a `.metadata_index` attribute (see get_index) use it to jump
+# straight to candidate rows instead of scanning. All lookups return row
+# positions in ascending order so results come back in the same order a scan
+# would produce.
+#
+#   tokens   postContent token -> positions (same tokenization as the engines)
+#   numeric  count field / postTimestamp -> values sorted, with their positions
+#   names    normalized author/name -> positions, plus a trigram index over the
+#            distinct names for substring and typo-tolerant person lookups
+#   urls     canonical postUrl / profile_url / authorUrl key -> positions,
+#            kept as sorted 64-bit key hashes rather than a dict of strings
+#   text     trigram posting lists over normalized postContent / description
+#            for quoted-phrase substring search (candidates, then verify)
+
+import hashlib
+import string
+from calendar import monthrange
+from datetime import datetime, timezone
+
+import numpy as np
+from unidecode import unidecode
+
+from aggregates import Aggregates
+from author_posts import AuthorPosts
+from schema import (
+    COUNT_COLUMNS, NORMALIZED_FIELDS, canonical_post_url, canonical_profile_url, count_value, normalize_name,
+    normalized_field
+)
+
+NUMERIC_FIELDS = COUNT_COLUMNS + ['postTimestamp']
+URL_FIELDS = {
+    'postUrl': canonical_post_url,
+    'profile_url': canonical_profile_url,
+    'authorUrl': canonical_profile_url,
+}
+
+TEXT_FIELDS = ['postContent', 'description']
+
+_PUNCT_TABLE = str.maketrans(string.punctuation, ' ' * len(string.punctuation))
+
+def tokenize(text):
+    if not text:
+        return []
+    return unidecode(text).lower().translate(_PUNCT_TABLE).split()
+
+def normalize_text(text):
+    if not text:
+        return ""
+    return unidecode(text).lower().strip()
+
+# ----------------------------
+# Person names
+# ----------------------------
+
+FUZZY_CANDIDATES = 32
+SHORT_WORD = 6  # one-word queries up to this length also get word-level candidates
+_EMPTY = np.empty(0, dtype=np.int32)
+
+def trigrams(text, pad=True):
+    text = f" {text} " if pad else text
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def edit_distance(a, b, limit):
+    # Optimal string alignment distance (a swap of two letters costs 1),
+    # giving up with limit + 1 once every cell in a row exceeds limit
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+def max_typos(query):
+    return 1 if len(query) < 8 else 2
+
+class NameIndex:
+    # Distinct normalized names of one field, each mapped to its row positions
+    def __init__(self, rows, field):
+        positions = {}
+        for pos, row in enumerate(rows):
+            positions.setdefault(normalized_field(row, field), []).append(pos)
+        self.names = list(positions)
+        self.positions = {name: np.array(p, dtype=np.int32) for name, p in positions.items()}
+        grams = {}
+        for i, name in enumerate(self.names):
+            for gram in trigrams(name):
+                grams.setdefault(gram, []).append(i)
+        self.grams = {gram: np.array(ids, dtype=np.int32) for gram, ids in grams.items()}
+        # Words of the names bucketed by length, for typos that share no trigram
+        self.words_by_len = {}
+        for i, name in enumerate(self.names):
+            for word in set(name.split()):
+                self.words_by_len.setdefault(len(word), {}).setdefault(word, []).append(i)
+
+    def rows(self, names):
+        arrays = [self.positions[n] for n in names]
+        return np.sort(np.concatenate(arrays)) if arrays else _EMPTY
+
+    def exact(self, query):
+        return self.positions.get(normalize_name(query), _EMPTY)
+
+    def containing(self, query):
+        # Names with the normalized query as a substring (the engines' `in` test);
+        # every query trigram must occur in the name, so only those are verified
+        query = normalize_name(query)
+        grams = trigrams(query, pad=False)
+        if not grams:
+            candidates = self.names
+        else:
+            ids = None
+            for gram in sorted(grams, key=lambda g: len(self.grams.get(g, _EMPTY))):
+                found = self.grams.get(gram)
+                if found is None:
+                    return []
+                ids = found if ids is None else np.intersect1d(ids, found, assume_unique=True)
+                if not len(ids):
+                    return []
+            candidates = [self.names[i] for i in ids]
+        return [name for name in candidates if query in name]
+
+    def closest(self, query, limit=None):
+        # Names within `limit` typos of the query, best distance only. A query
+        # shorter than the name is compared against each run of as many words
+        # ("madhri" vs "madhuri jain" -> "madhuri"); at equal distance a
+        # whole-name match beats a partial one
+        query = normalize_name(query)
+        if not query:
+            return []
+        limit = max_typos(query) if limit is None else limit
+        counts = {}
+        for gram in trigrams(query):
+            for i in self.grams.get(gram, ()):
+                counts[i] = counts.get(i, 0) + 1
+        ranked = sorted(counts, key=counts.get, reverse=True)[:FUZZY_CANDIDATES]
+        if " " not in query and (not ranked or len(query) <= SHORT_WORD):
+            # A swap in a short word can share no trigram with the name at all
+            ranked = list(dict.fromkeys(ranked + self._similar_words(query, limit)))
+        width = len(query.split())
+        best, matches = (limit + 1, 1), []
+        for i in ranked:
+            name = self.names[i]
+            words = name.split()
+            windows = [" ".join(words[k:k + width]) for k in range(len(words) - width + 1)]
+            d = (edit_distance(query, name, best[0]), 0)
+            if windows:
+                d = min(d, (min(edit_distance(query, w, best[0]) for w in windows), 1))
+            if d < best:
+                best, matches = d, [name]
+            elif d == best:
+                matches.append(name)
+        return matches if best[0] <= limit else []
+
+    def _similar_words(self, word, limit):
+        # Names with a word within `limit` edits of a one-word query ("jian" ->
+        # "jain" shares no trigram); only words of a reachable length are compared
+        ids = set()
+        for length in range(max(1, len(word) - limit), len(word) + limit + 1):
+            for candidate, name_ids in self.words_by_len.get(length, {}).items():
+                if edit_distance(word, candidate, limit) <= limit:
+                    ids.update(name_ids)
+        return sorted(ids)
+
+    def match(self, query, fuzzy=True):
+        # Substring matches as before; only when there are none, the closest names
+        names = self.containing(query)
+        if not names and fuzzy:
+            names = self.closest(query)
+        return names
+
+    def lookup(self, query, fuzzy=True):
+        return self.rows(self.match(query, fuzzy))
+
+# ----------------------------
+# URLs
+# ----------------------------
+
+def url_hash(key):
+    # Stable across processes, unlike hash(); 64 bits make a collision between
+    # two keys of one snapshot practically impossible
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little', signed=True)
+
+class UrlIndex:
+    # Canonical key -> positions. Nearly every postUrl is unique, so a dict of
+    # key strings to one-element arrays costs a few hundred bytes per row;
+    # here a row is one hash plus one position, found by binary search
+    def __init__(self, rows, field):
+        canonical = URL_FIELDS[field]
+        hashes, positions = [], []
+        for pos, row in enumerate(rows):
+            key = canonical(row.get(field))
+            if key:
+                hashes.append(url_hash(key))
+                positions.append(pos)
+        hashes = np.array(hashes, dtype=np.int64)
+        # Stable, so the positions of one key stay ascending
+        order = np.argsort(hashes, kind='stable')
+        self.hashes = hashes[order]
+        self.positions = np.array(positions, dtype=np.int32)[order]
+
+    def get(self, key):
+        h = url_hash(key)
+        lo = np.searchsorted(self.hashes, h, side='left')
+        hi = np.searchsorted(self.hashes, h, side='right')
+        return self.positions[lo:hi] if hi > lo else _EMPTY
+
+# ----------------------------
+# Substring search
+# ----------------------------
+
+class SubstringIndex:
+    # Trigram posting lists over the distinct normalized values of one field,
+    # like pg_trgm: a needle's trigrams must all occur in a matching value, so
+    # intersecting their postings gives a small candidate set that is then
+    # verified with a real substring test. Repeated values (descriptions
+    # repeat on every post) are indexed once. Normalized text is ASCII
+    # (unidecode), so values live in one bytes blob and trigrams are packed
+    # into ints, which keeps the build vectorized.
+    BUILD_CHUNK = 1 << 24  # blob bytes per vectorized build step
+
+    def __init__(self, rows, field):
+        ids = {}
+        row_values = np.empty(len(rows), dtype=np.int32)
+        for pos, row in enumerate(rows):
+            value = row.get(field, "")
+            value = normalize_text(value if isinstance(value, str) else str(value or ""))
+            row_values[pos] = ids.setdefault(value, len(ids))
+        values = list(ids)
+        # Rows of value v are order[starts[v]:starts[v + 1]]
+        self.row_values = row_values
+        self.order = np.argsort(row_values, kind='stable').astype(np.int32)
+        self.starts = np.searchsorted(row_values[self.order], np.arange(len(values) + 1)).astype(np.int64)
+
+        # Value v is blob[offsets[v]:offsets[v + 1] - 1]; the \0 separators keep
+        # matches and trigrams from spanning two values
+        self.blob = "\0".join(values).encode("ascii", "replace") + b"\0"
+        self.bytes = np.frombuffer(self.blob, dtype=np.uint8)
+        lengths = np.fromiter((len(v) + 1 for v in values), dtype=np.int64, count=len(values))
+        self.offsets = np.concatenate([[0], np.cumsum(lengths)])
+        self._build_grams()
+
+    def _build_grams(self):
+        keys = []
+        n_values = len(self.offsets) - 1
+        v = 0
+        while v < n_values:
+            end = int(np.searchsorted(self.offsets, self.offsets[v] + self.BUILD_CHUNK, side='right')) - 1
+            end = max(end, v + 1)
+            lo, hi = int(self.offsets[v]), int(self.offsets[end])
+            b = self.bytes[lo:hi].astype(np.int64)
+            doc = np.repeat(np.arange(v, end, dtype=np.int64), np.diff(self.offsets[v:end + 1]))
+            if len(b) >= 3:
+                valid = (b[:-2] != 0) & (b[1:-1] != 0) & (b[2:] != 0)
+                codes = (b[:-2] << 16) | (b[1:-1] << 8) | b[2:]
+                keys.append((codes[valid] << 32) | doc[:-2][valid])
+            v = end
+        # Sort-based dedupe: (gram, value) pairs, grouped by gram
+        keys = np.sort(np.concatenate(keys)) if keys else np.empty(0, dtype=np.int64)
+        if len(keys):
+            keys = keys[np.concatenate([[True], keys[1:] != keys[:-1]])]
+        grams = keys >> 32
+        first = np.flatnonzero(np.concatenate([[True], grams[1:] != grams[:-1]])) if len(keys) else _EMPTY
+        self.gram_codes = grams[first]
+        self.gram_starts = np.append(first, len(keys))
+        self.postings = (keys & 0xFFFFFFFF).astype(np.int32)
+
+    def _posting(self, code):
+        k = np.searchsorted(self.gram_codes, code)
+        if k == len(self.gram_codes) or self.gram_codes[k] != code:
+            return _EMPTY
+        return self.postings[self.gram_starts[k]:self.gram_starts[k + 1]]
+
+    def matching_values(self, needle):
+        if not needle.isascii() or "\0" in needle:
+            return _EMPTY
+        nb = needle.encode("ascii")
+        if len(nb) < 3:
+            # No trigrams to look up: compare the blob directly, vectorized
+            if not nb:
+                return np.arange(len(self.offsets) - 1)
+            hit = self.bytes[:len(self.bytes) - len(nb) + 1] == nb[0]
+            for k in range(1, len(nb)):
+                hit &= self.bytes[k:len(self.bytes) - len(nb) + 1 + k] == nb[k]
+            found = np.searchsorted(self.offsets, np.flatnonzero(hit), side='right') - 1
+            return found[np.concatenate([[True], found[1:] != found[:-1]])] if len(found) else found
+        codes = {(nb[k] << 16) | (nb[k + 1] << 8) | nb[k + 2] for k in range(len(nb) - 2)}
+        lists = sorted((self._posting(c) for c in codes), key=len)
+        ids = lists[0]
+        for found in lists[1:]:
+            if not len(ids):
+                break
+            ids = np.intersect1d(ids, found, assume_unique=True)
+        offsets, blob = self.offsets, self.blob
+        return [i for i in ids if blob.find(nb, offsets[i], offsets[i + 1] - 1) != -1]
+
+    def containing(self, needle):
+        # Row positions whose normalized value contains the already-normalized needle
+        ids = self.matching_values(needle)
+        if not len(ids):
+            return _EMPTY
+        if len(ids) < 64:
+            return np.sort(np.concatenate([self.order[self.starts[i]:self.starts[i + 1]] for i in ids]))
+        # Broad needles: one vectorized pass over the row -> value map
+        hit = np.zeros(len(self.starts) - 1, dtype=bool)
+        hit[np.asarray(ids, dtype=np.int64)] = True
+        return np.flatnonzero(hit[self.row_values]).astype(np.int32)
+
+class MetadataIndex:
+    def __init__(self, rows):
+        self.size = len(rows)
+        self.tokens = self._build_tokens(rows)
+        self.numeric = {field: self._build_numeric(rows, field) for field in NUMERIC_FIELDS}
+        self.names = {field: NameIndex(rows, field) for field in NORMALIZED_FIELDS}
+        self.urls = {field: UrlIndex(rows, field) for field in URL_FIELDS}
+        self.text = {field: SubstringIndex(rows, field) for field in TEXT_FIELDS}
+
+    def person(self, tokens, query=None):
+        # Rows where every token occurs in the author or the name; with no such
+        # row, rows whose author or name is closest to the full query
+        found = np.arange(self.size, dtype=np.int32)
+        for token in tokens:
+            hits = np.union1d(*(names.rows(names.containing(token)) for names in self.names.values()))
+            found = np.intersect1d(found, hits, assume_unique=True)
+            if not len(found):
+                break
+        if len(found) or not query:
+            return found
+        return np.union1d(*(names.rows(names.closest(query)) for names in self.names.values()))
+
+    @staticmethod
+    def _build_tokens(rows):
+        postings = {}
+        for pos, row in enumerate(rows):
+            for token in set(tokenize(row.get('postContent', ''))):
+                postings.setdefault(token, []).append(pos)
+        return {token: np.array(p, dtype=np.int32) for token, p in postings.items()}
+
+    @staticmethod
+    def _build_numeric(rows, field):
+        values, positions, missing = [], [], []
+        for pos, row in enumerate(rows):
+            val = count_value(row, field)
+            if val is None:
+                missing.append(pos)
+            else:
+                values.append(val)
+                positions.append(pos)
+        values = np.array(values, dtype=np.float64)
+        order = np.argsort(values, kind='stable')
+        return values[order], np.array(positions, dtype=np.int32)[order], np.array(missing, dtype=np.int32)
+
+    # ----------------------------
+    # Lookups (sorted positions)
+    # ----------------------------
+
+    def by_url(self, field, url):
+        key = URL_FIELDS[field](url)
+        return self.urls[field].get(key) if key else _EMPTY
+
+    def with_all_tokens(self, tokens):
+        # Rows whose postContent has every token (qa_engine/query_utils filter_by_keyword)
+        found = np.arange(self.size, dtype=np.int32)
+        for token in set(tokens):
+            found = np.intersect1d(found, self.tokens.get(token, _EMPTY), assume_unique=True)
+            if not len(found):
+                break
+        return found
+
+    def with_any_token(self, tokens):
+        lists = [self.tokens[t] for t in set(tokens) if t in self.tokens]
+        if not lists:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(lists))
+
+    def in_range(self, field, lo=None, hi=None, lo_inclusive=True, hi_inclusive=True):
+        values, positions, _ = self.numeric[field]
+        start = 0 if lo is None else np.searchsorted(values, lo, side='left' if lo_inclusive else 'right')
+        end = len(values) if hi is None else np.searchsorted(values, hi, side='right' if hi_inclusive else 'left')
+        return np.sort(positions[start:end])
+
+    def first_max(self, field):
+        # Position of the first row holding the field's largest value; None
+        # when no row is above 0 (callers fall back to their scan)
+        values, positions, _ = self.numeric[field]
+        if not len(values) or values[-1] <= 0:
+            return None
+        start = np.searchsorted(values, values[-1], side='left')
+        return int(positions[start:].min())
+
+    def threshold(self, field, threshold, op='>'):
+        if op == '>':
+            return self.in_range(field, lo=threshold, lo_inclusive=False)
+        if op == '>=':
+            return self.in_range(field, lo=threshold)
+        if op == '<':
+            return self.in_range(field, hi=threshold, hi_inclusive=False)
+        return self.in_range(field, hi=threshold)
+
+    def in_month(self, month, year=None):
+        # Rows with a postTimestamp in the given month (UTC), optionally one year only
+        values = self.numeric['postTimestamp'][0]
+        if not len(values):
+            return np.empty(0, dtype=np.int32)
+        if year is not None:
+            years = [year]
+        else:
+            first = datetime.fromtimestamp(values[0], timezone.utc).year
+            last = datetime.fromtimestamp(values[-1], timezone.utc).year
+            years = range(first, last + 1)
+        parts = []
+        for y in years:
+            start = datetime(y, month, 1, tzinfo=timezone.utc).timestamp()
+            end = start + monthrange(y, month)[1] * 86400
+            parts.append(self.in_range('postTimestamp', lo=start, hi=end, hi_inclusive=False))
+        return np.sort(np.concatenate(parts))
+
+    def untimed(self):
+        # Rows without a postTimestamp; callers fall back to parsing postDate
+        return self.numeric['postTimestamp'][2]
+
+class IndexedMetadata(list):
+    def __init__(self, rows, index=None, aggregates=None, author_posts=None):
+        super().__init__(rows)
+        self.metadata_index = index if index is not None else MetadataIndex(self)
+        self.aggregates = aggregates if aggregates is not None else Aggregates.from_rows(self)
+        self.author_posts = author_posts if author_posts is not None else AuthorPosts.from_rows(self)
+
+    def rows_at(self, positions):
+        return [self[i] for i in positions]
+
+def get_index(metadata):
+    return getattr(metadata, 'metadata_index', None)
+
+def name_index(metadata, field):
+    # The snapshot's NameIndex for field; a plain list gets a throwaway one,
+    # which costs about what one scan of it does
+    index = get_index(metadata)
+    return index.names[field] if index is not None else NameIndex(metadata, field)
+
+def closest_rows(metadata, query, fields=tuple(NORMALIZED_FIELDS)):
+    # Rows whose value in any of fields is closest to a misspelt query, in
+    # snapshot order; the typo fallback shared by every layout
+    found = [names.rows(names.closest(query)) for names in (name_index(metadata, f) for f in fields)]
+    return [metadata[int(i)] for i in np.unique(np.concatenate(found))]
@@ -0,0 +1,180 @@
+# metadata_store.py
+#
+# Upsertable metadata store keyed by canonical postUrl, plus the snapshot layout the
+# app reads from. A snapshot is an immutable directory
+#
+#   snapshots/<version>/raw_metadata.json, aggregates.json, author_posts.json, docs.json, ids.json, linkedin_index.faiss
+#
+# and snapshots/CURRENT names the live one. Publishing writes the directory
+# first and then swaps CURRENT with os.replace, so readers never see a
+# half-written snapshot.
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+from schema import STORED_COLUMNS, canonical_post_url, canonical_profile_url
+
+STORE_PATH = "metadata.sqlite"
+SNAPSHOT_ROOT = "snapshots"
+CURRENT_FILE = "CURRENT"
+
+def record_key(record):
+    # Posts are keyed by canonical postUrl, so the same post seen with other
+    # tracking params or URN spellings is one row (and one vector);
+    # profile-only rows (no activity) by their canonical profile
+    post_url = canonical_post_url(record.get('postUrl'))
+    if post_url:
+        return post_url
+    profile_url = canonical_profile_url(record.get('profile_url'))
+    return f"profile:{profile_url}" if profile_url else None
+
+def content_hash(record):
+    # A post seen again under another spelling of its URL is not a change
+    fields = {k: record.get(k, '') for k in STORED_COLUMNS}
+    fields['postUrl'] = canonical_post_url(fields['postUrl'])
+    payload = json.dumps(fields, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+class MetadataStore:
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT UNIQUE NOT NULL,
+                record TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                indexed_hash TEXT,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cursors (source TEXT PRIMARY KEY, position INTEGER NOT NULL)"
+        )
+
+    def upsert(self, records, on_change=None):
+        # Returns ids of records that are new or whose content changed;
+        # on_change(id, old, new) sees each change (old is None for inserts)
+        changed = []
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for record in records:
+                    key = record_key(record)
+                    if key is None:
+                        continue
+                    record = {k: record.get(k, '') for k in STORED_COLUMNS}
+                    h = content_hash(record)
+                    row = self._conn.execute("SELECT id, hash, record FROM records WHERE key = ?", (key,)).fetchone()
+                    if row is None:
+                        cur = self._conn.execute(
+                            "INSERT INTO records (key, record, hash, updated_at) VALUES (?, ?, ?, ?)",
+                            (key, json.dumps(record, ensure_ascii=False), h, now),
+                        )
+                        changed.append(cur.lastrowid)
+                        if on_change:
+                            on_change(cur.lastrowid, None, record)
+                    elif row[1] != h:
+                        self._conn.execute(
+                            "UPDATE records SET record = ?, hash = ?, updated_at = ? WHERE id = ?",
+                            (json.dumps(record, ensure_ascii=False), h, now, row[0]),
+                        )
+                        changed.append(row[0])
+                        if on_change:
+                            on_change(row[0], json.loads(row[2]), record)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return changed
+
+    def unindexed_ids(self):
+        # Records whose current content is not yet in the published index
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM records WHERE indexed_hash IS NULL OR indexed_hash != hash ORDER BY id"
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def mark_indexed(self, ids):
+        with self._lock:
+            self._conn.executemany("UPDATE records SET indexed_hash = hash WHERE id = ?", [(int(i),) for i in ids])
+
+    def get(self, ids):
+        out = {}
+        with self._lock:
+            for i in ids:
+                row = self._conn.execute("SELECT record FROM records WHERE id = ?", (int(i),)).fetchone()
+                if row:
+                    out[int(i)] = json.loads(row[0])
+        return out
+
+    def all(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT id, record FROM records ORDER BY id").fetchall()
+        return [(i, json.loads(r)) for i, r in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def get_cursor(self, source):
+        with self._lock:
+            row = self._conn.execute("SELECT position FROM cursors WHERE source = ?", (source,)).fetchone()
+        return row[0] if row else 0
+
+    def set_cursor(self, source, position):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO cursors VALUES (?, ?)", (source, position))
+
+    def close(self):
+        self._conn.close()
+
+# ----------------------------
+# Snapshots
+# ----------------------------
+
+def current_version(root=SNAPSHOT_ROOT):
+    try:
+        with open(os.path.join(root, CURRENT_FILE), "r") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def snapshot_dir(version, root=SNAPSHOT_ROOT):
+    return os.path.join(root, version)
+
+def publish_snapshot(write_files, root=SNAPSHOT_ROOT, keep=3):
+    # write_files(tmp_dir) writes every artifact; the directory is renamed into
+    # place and CURRENT is swapped atomically afterwards
+    version = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}"
+    os.makedirs(root, exist_ok=True)
+    tmp_dir = os.path.join(root, f".{version}.tmp")
+    os.makedirs(tmp_dir)
+    write_files(tmp_dir)
+    os.rename(tmp_dir, snapshot_dir(version, root))
+
+    tmp_current = os.path.join(root, f".{CURRENT_FILE}.tmp")
+    with open(tmp_current, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_current, os.path.join(root, CURRENT_FILE))
+    prune_snapshots(root, keep)
+    return version
+
+def prune_snapshots(root=SNAPSHOT_ROOT, keep=3):
+    versions = sorted(d for d in os.listdir(root) if not d.startswith(".") and d != CURRENT_FILE)
+    live = current_version(root)
+    for version in versions[:-keep]:
+        if version != live:
+            shutil.rmtree(snapshot_dir(version, root), ignore_errors=True)
@@ -0,0 +1,235 @@
+# partitions.py
+#
+# Tenant-scoped storage. Each tenant gets its own directory
+#
+#   tenants/<tenant>/metadata.sqlite     upsert store (pipeline.py --tenant)
+#   tenants/<tenant>/snapshots/...       published snapshots, same layout as metadata_store
+#
+# and the app asks for a Partition: that tenant's live snapshot as
+# IndexedMetadata (rows plus inverted/numeric indexes) and its FAISS index.
+# Partitions load on first use and at most MAX_RESIDENT_TENANTS stay in
+# memory; the least recently used one is dropped when another loads. A
+# resident partition is reloaded when its tenant publishes a new snapshot.
+#
+# The "default" tenant keeps the original single-tenant layout
+# (snapshots/, metadata.sqlite, raw_metadata.json).
+#
+# With COLUMNAR_METADATA on (the default) the loaded rows are packed into a
+# columnar.ColumnStore once the indexes are built and the JSON dicts are
+# dropped; the partition's rows are then read-only views over its columns.
+
+import hmac
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from aggregates import AGGREGATES_FILE, Aggregates
+from author_posts import AUTHOR_POSTS_FILE, AuthorPosts
+from columnar import ColumnStore
+from metadata_index import IndexedMetadata, MetadataIndex
+from metadata_store import SNAPSHOT_ROOT, STORE_PATH, current_version, snapshot_dir
+
+TENANT_ROOT = os.getenv("TENANT_ROOT", "tenants")
+MAX_RESIDENT = int(os.getenv("MAX_RESIDENT_TENANTS", "8"))
+COLUMNAR = os.getenv("COLUMNAR_METADATA", "1") not in ("", "0", "false")
+DEFAULT_TENANT = "default"
+INDEX_FILE = "linkedin_index.faiss"
+
+TENANT_RE = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$')
+
+# ----------------------------
+# Tenant binding
+# ----------------------------
+# A client never picks its own tenant. The service maps each API key to one
+# tenant (TENANT_KEYS="key1:acme,key2:globex"); without keys, or in the app,
+# the deployment serves the single tenant named by TENANT. A tenant the client
+# asks for (?tenant=, the request body) must be the bound one.
+
+def parse_tenant_keys(spec):
+    keys = {}
+    for entry in (spec or "").split(","):
+        key, sep, tenant = entry.strip().partition(":")
+        if sep and key and tenant:
+            keys[key] = tenant
+    return keys
+
+TENANT_KEYS = parse_tenant_keys(os.getenv("TENANT_KEYS", ""))
+DEPLOYED_TENANT = os.getenv("TENANT", DEFAULT_TENANT)
+
+def bind_tenant(requested=None, api_key=None, keys=None, deployed=None):
+    # The tenant this caller may read; PermissionError for a missing or
+    # unknown key, or a requested tenant other than the bound one
+    keys = TENANT_KEYS if keys is None else keys
+    if keys:
+        tenant = next((t for k, t in keys.items() if hmac.compare_digest(k, api_key or "")), None)
+        if tenant is None:
+            raise PermissionError("Missing or unknown API key")
+    else:
+        tenant = deployed or DEPLOYED_TENANT
+    if requested and requested != tenant:
+        raise PermissionError(f"Not allowed to read tenant {requested!r}")
+    return tenant
+
+def tenant_paths(tenant=None, root=TENANT_ROOT):
+    if tenant in (None, "", DEFAULT_TENANT):
+        return {"store": STORE_PATH, "snapshots": SNAPSHOT_ROOT, "fallback": "raw_metadata.json"}
+    if not TENANT_RE.match(tenant):
+        # Tenant names become directory names
+        raise ValueError(f"Invalid tenant name: {tenant!r}")
+    base = os.path.join(root, tenant)
+    return {
+        "store": os.path.join(base, "metadata.sqlite"),
+        "snapshots": os.path.join(base, "snapshots"),
+        "fallback": os.path.join(base, "raw_metadata.json"),
+    }
+
+def build_metadata(rows, aggregates=None, author_posts=None, columnar=COLUMNAR):
+    if not columnar:
+        return IndexedMetadata(rows, aggregates=aggregates, author_posts=author_posts)
+    # Indexes and aggregates read the dicts once; only the columns stay resident
+    index = MetadataIndex(rows)
+    if aggregates is None:
+        aggregates = Aggregates.from_rows(rows)
+    if author_posts is None:
+        author_posts = AuthorPosts.from_rows(rows)
+    store = ColumnStore(rows)
+    metadata = IndexedMetadata(store.rows(), index, aggregates, author_posts.freeze())
+    metadata.columns = store
+    return metadata
+
+def list_tenants(root=TENANT_ROOT):
+    if not os.path.isdir(root):
+        return []
+    return sorted(d for d in os.listdir(root) if TENANT_RE.match(d) and os.path.isdir(os.path.join(root, d)))
+
+class Partition:
+    def __init__(self, tenant, version, metadata, directory=None):
+        self.tenant = tenant
+        self.version = version
+        self.key = version
+        self.metadata = metadata
+        self.directory = directory
+        self._vector_index = None
+        self._positions = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, tenant, paths, version):
+        if version is None:
+            with open(paths["fallback"], "r", encoding="utf-8") as f:
+                rows = json.load(f)
+            return cls(tenant, version, build_metadata(rows))
+        directory = snapshot_dir(version, paths["snapshots"])
+        with open(os.path.join(directory, "raw_metadata.json"), "r", encoding="utf-8") as f:
+            rows = json.load(f)
+        aggregates = None
+        path = os.path.join(directory, AGGREGATES_FILE)
+        if os.path.exists(path):
+            # Kept current by the pipeline; older snapshots recompute on load
+            with open(path, "r", encoding="utf-8") as f:
+                aggregates = Aggregates.from_dict(json.load(f))
+        author_posts = None
+        path = os.path.join(directory, AUTHOR_POSTS_FILE)
+        if os.path.exists(path):
+            # Published with store ids; rows are in ids.json order
+            with open(path, "r", encoding="utf-8") as f:
+                published = AuthorPosts.from_dict(json.load(f))
+            with open(os.path.join(directory, "ids.json"), "r") as f:
+                author_posts = published.remap({store_id: pos for pos, store_id in enumerate(json.load(f))})
+        return cls(tenant, version, build_metadata(rows, aggregates, author_posts), directory)
+
+    @property
+    def vector_index(self):
+        # FAISS is only read when a semantic search needs it
+        if self._vector_index is None and self.directory:
+            with self._lock:
+                if self._vector_index is None:
+                    import faiss
+                    path = os.path.join(self.directory, INDEX_FILE)
+                    if os.path.exists(path):
+                        self._vector_index = faiss.read_index(path)
+        return self._vector_index
+
+    def search(self, embeddings, k=5):
+        # Nearest rows for each query embedding; FAISS ids are store ids,
+        # mapped back to metadata positions through the snapshot's ids.json
+        index = self.vector_index
+        if index is None:
+            return [[] for _ in range(len(embeddings))]
+        if self._positions is None:
+            with open(os.path.join(self.directory, "ids.json"), "r") as f:
+                self._positions = {store_id: pos for pos, store_id in enumerate(json.load(f))}
+        distances, ids = index.search(embeddings, k)
+        results = []
+        for row_d, row_ids in zip(distances, ids):
+            hits = []
+            for d, i in zip(row_d, row_ids):
+                pos = self._positions.get(int(i))
+                if pos is not None:
+                    hits.append((self.metadata[pos], float(d)))
+            results.append(hits)
+        return results
+
+class PartitionManager:
+    def __init__(self, root=TENANT_ROOT, max_resident=MAX_RESIDENT):
+        self.root = root
+        self.max_resident = max(1, max_resident)
+        self._partitions = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}
+
+    def _version(self, paths):
+        version = current_version(paths["snapshots"])
+        if version is None and os.path.exists(paths["fallback"]):
+            # No snapshots yet: the fallback file's mtime stands in for a version
+            return None, f"file:{os.path.getmtime(paths['fallback'])}"
+        return version, version
+
+    def get(self, tenant=None):
+        tenant = tenant or DEFAULT_TENANT
+        paths = tenant_paths(tenant, self.root)
+        version, key = self._version(paths)
+        with self._lock:
+            partition = self._partitions.get(tenant)
+            if partition is not None and partition.key == key:
+                self._partitions.move_to_end(tenant)
+                return partition
+            loading = self._loading.setdefault(tenant, threading.Lock())
+        # Load outside the manager lock so one tenant's load never blocks another's reads
+        with loading:
+            with self._lock:
+                partition = self._partitions.get(tenant)
+                if partition is not None and partition.key == key:
+                    self._partitions.move_to_end(tenant)
+                    return partition
+            partition = Partition.load(tenant, paths, version)
+            partition.key = key
+            with self._lock:
+                self._partitions[tenant] = partition
+                self._partitions.move_to_end(tenant)
+                while len(self._partitions) > self.max_resident:
+                    self._partitions.popitem(last=False)
+        return partition
+
+    def resident(self):
+        with self._lock:
+            return list(self._partitions)
+
+    def evict(self, tenant):
+        with self._lock:
+            self._partitions.pop(tenant, None)
+
+_manager = None
+_manager_lock = threading.Lock()
+
+def get_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = PartitionManager()
+        return _manager
+
+def get_partition(tenant=None):
+    return get_manager().get(tenant)
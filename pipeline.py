@@ -0,0 +1,184 @@
+# pipeline.py
+#
+# Change-data-capture from scraper output to the app. Tails the scraper's
+# JSONL output, upserts records into the metadata store keyed by canonical
+# postUrl, re-embeds only new or changed records into an ID-mapped FAISS
+# index and publishes a fresh snapshot the app picks up on its next request.
+#
+#   python pipeline.py --seed-csv data/merged_profiles.csv   # one-off import
+#   python pipeline.py --watch linkedin_profiles.jsonl       # keep syncing
+#   python pipeline.py --tenant acme --seed-csv acme.csv     # tenants/acme/...
+
+import argparse
+import json
+import os
+import time
+
+import faiss
+import numpy as np
+import pandas as pd
+
+from aggregates import AGGREGATES_FILE, Aggregates
+from author_posts import AUTHOR_POSTS_FILE, AuthorPosts
+from build_index import clean_and_standardize, row_to_text, to_records
+from embedder import get_embeddings
+from metadata_store import (
+    SNAPSHOT_ROOT, STORE_PATH, MetadataStore, current_version, publish_snapshot, snapshot_dir
+)
+from partitions import tenant_paths
+
+SCRAPER_OUTPUT = "linkedin_profiles.jsonl"
+INDEX_FILE = "linkedin_index.faiss"
+EMBED_BATCH = 256
+
+def read_new_records(store, source):
+    # Reads complete lines appended since the stored byte offset; a partially
+    # written last line is left for the next poll
+    if not os.path.exists(source):
+        return [], 0
+    position = store.get_cursor(source)
+    if os.path.getsize(source) < position:
+        position = 0  # file was truncated or replaced
+    with open(source, "rb") as f:
+        f.seek(position)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    records = []
+    for line in data[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            page = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if "records" in page:
+            records.extend(page["records"])
+        elif "error" not in page:
+            records.append(page)
+    return records, position + end
+
+class IndexPipeline:
+    def __init__(self, store, root=SNAPSHOT_ROOT):
+        self.store = store
+        self.root = root
+        self.index = None
+        self.aggregates = None
+        self.author_posts = None
+        version = current_version(root)
+        if version:
+            path = os.path.join(snapshot_dir(version, root), INDEX_FILE)
+            if os.path.exists(path):
+                self.index = faiss.read_index(path)
+            path = os.path.join(snapshot_dir(version, root), AGGREGATES_FILE)
+            # Unpublished upserts from an interrupted run are not in the
+            # snapshot's aggregates, so those are rebuilt from the store instead
+            if os.path.exists(path) and not store.unindexed_ids():
+                with open(path, "r", encoding="utf-8") as f:
+                    self.aggregates = Aggregates.from_dict(json.load(f))
+                path = os.path.join(snapshot_dir(version, root), AUTHOR_POSTS_FILE)
+                if os.path.exists(path):
+                    with open(path, "r", encoding="utf-8") as f:
+                        self.author_posts = AuthorPosts.from_dict(json.load(f))
+
+    def embed(self, ids):
+        for start in range(0, len(ids), EMBED_BATCH):
+            batch = ids[start:start + EMBED_BATCH]
+            rows = self.store.get(batch)
+            embeddings = get_embeddings([row_to_text(rows[i]) for i in batch])
+            if self.index is None:
+                self.index = faiss.IndexIDMap2(faiss.IndexFlatL2(embeddings.shape[1]))
+            id_array = np.array(batch, dtype="int64")
+            # Changed records replace their old vector in place
+            self.index.remove_ids(id_array)
+            self.index.add_with_ids(embeddings, id_array)
+
+    def publish(self):
+        records = self.store.all()
+        if self.aggregates is None:
+            self.aggregates = Aggregates.from_rows(r for _, r in records)
+        if self.author_posts is None:
+            self.author_posts = AuthorPosts.from_records(records)
+
+        def write_files(tmp_dir):
+            with open(os.path.join(tmp_dir, "raw_metadata.json"), "w", encoding="utf-8") as f:
+                json.dump([r for _, r in records], f, ensure_ascii=False)
+            with open(os.path.join(tmp_dir, AGGREGATES_FILE), "w", encoding="utf-8") as f:
+                json.dump(self.aggregates.to_dict(), f, ensure_ascii=False)
+            with open(os.path.join(tmp_dir, AUTHOR_POSTS_FILE), "w", encoding="utf-8") as f:
+                json.dump(self.author_posts.to_dict(), f, ensure_ascii=False)
+            with open(os.path.join(tmp_dir, "docs.json"), "w", encoding="utf-8") as f:
+                json.dump([row_to_text(r) for _, r in records], f)
+            with open(os.path.join(tmp_dir, "ids.json"), "w") as f:
+                json.dump([i for i, _ in records], f)
+            faiss.write_index(self.index, os.path.join(tmp_dir, INDEX_FILE))
+
+        return publish_snapshot(write_files, self.root)
+
+    def sync(self, records=()):
+        if records:
+            # Same typing/normalization as a full build, so snapshots stay typed
+            changes = []
+            self.store.upsert(to_records(clean_and_standardize(pd.DataFrame(records))),
+                              on_change=lambda record_id, old, new: changes.append((record_id, old, new)))
+            for record_id, old, new in changes:
+                if self.aggregates is not None:
+                    self.aggregates.replace(old, new)
+                if self.author_posts is not None:
+                    self.author_posts.replace(record_id, old, new)
+        pending = self.store.unindexed_ids()
+        if not pending:
+            return None, 0
+        self.embed(pending)
+        version = self.publish()
+        self.store.mark_indexed(pending)
+        return version, len(pending)
+
+    def sync_source(self, source):
+        records, position = read_new_records(self.store, source)
+        version, changed = self.sync(records)
+        # Advance the cursor only once the changes are published
+        self.store.set_cursor(source, position)
+        return version, changed
+
+def seed_from_csv(pipeline, csv_path):
+    df = pd.read_csv(csv_path, encoding='utf-8')
+    return pipeline.sync(df.to_dict(orient="records"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync scraper output into the metadata store and FAISS index")
+    parser.add_argument("--tenant", default=None, help="sync into tenants/<tenant>/ instead of the default store")
+    parser.add_argument("--store", default=STORE_PATH)
+    parser.add_argument("--snapshots", default=SNAPSHOT_ROOT)
+    parser.add_argument("--seed-csv", default=None, help="import a merged profiles CSV before syncing")
+    parser.add_argument("--watch", default=None, nargs="?", const=SCRAPER_OUTPUT, help="scraper JSONL output to tail")
+    parser.add_argument("--interval", type=float, default=2.0)
+    args = parser.parse_args()
+
+    if args.tenant:
+        paths = tenant_paths(args.tenant)
+        os.makedirs(os.path.dirname(paths["store"]) or ".", exist_ok=True)
+        args.store, args.snapshots = paths["store"], paths["snapshots"]
+
+    store = MetadataStore(args.store)
+    pipeline = IndexPipeline(store, args.snapshots)
+
+    if args.seed_csv:
+        version, changed = seed_from_csv(pipeline, args.seed_csv)
+        print(f"Seeded {changed} records from {args.seed_csv} -> snapshot {version}")
+
+    if args.watch:
+        print(f"Watching {args.watch} (every {args.interval}s)")
+        try:
+            while True:
+                version, changed = pipeline.sync_source(args.watch)
+                if changed:
+                    print(f"Published snapshot {version} with {changed} new/changed records ({store.count()} total)")
+                time.sleep(args.interval)
+        except KeyboardInterrupt:
+            pass
+    elif not args.seed_csv:
+        version, changed = pipeline.sync_source(SCRAPER_OUTPUT)
+        print(f"Synced {changed} records" + (f" -> snapshot {version}" if version else ""))
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,5 @@
-import os
 import pandas as pd
-from openai import OpenAI
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# Get API key from env variable
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise ValueError("OPENAI_API_KEY environment variable is not set!")
-
-client = OpenAI(api_key=api_key)
+from llm_runtime import chat
 
 # Load CSV with LinkedIn posts
 csv_path = "/Users/sunitasapra/linkedin_llm_project/data/merged_profiles.csv"
@@ -21,17 +10,18 @@ df = df.dropna(subset=["postContent"])
 sample_posts = df["postContent"].sample(n=min(3, len(df))).tolist()
 
 # Build prompt
+sample_block = ''.join([f"- {post}\n" for post in sample_posts])
 prompt = f"""
 You are a LinkedIn content creator. Here are some sample posts:
 
-{''.join([f"- {post}\n" for post in sample_posts])}
+{sample_block}
 
 Please write a new, unique, professional LinkedIn post inspired by these themes. Maximum 120 words.
 """
 
-# Call OpenAI chat completions
-response = client.chat.completions.create(
-    model="gpt-4",
+# Generate on LLM_BACKEND; sampled and unseeded, so never cached: each run
+# samples new posts and should get a new draft
+generated_post = chat(
     messages=[
         {"role": "system", "content": "You are a professional LinkedIn content writer."},
         {"role": "user", "content": prompt}
@@ -40,7 +30,5 @@ response = client.chat.completions.create(
     max_tokens=300
 )
 
-generated_post = response.choices[0].message.content.strip()
-
 print("\n📝 Generated LinkedIn Post:\n")
 print(generated_post)
@@ -3,6 +3,10 @@ import string
 from datetime import datetime
 from dateutil.parser import parse as dateparse
 from unidecode import unidecode
+import numpy as np
+from schema import count_value, display_count, normalize_name, normalized_field, post_datetime
+from metadata_index import closest_rows, get_index
+from aggregates import get_aggregates
 
 def normalize_text(text):
     if not text:
@@ -18,6 +22,9 @@ def normalize_and_tokenize(text):
 
 def filter_by_keyword(metadata, keyword, field):
     kw_tokens = normalize_and_tokenize(keyword)
+    index = get_index(metadata)
+    if index is not None and field == 'postContent':
+        return metadata.rows_at(index.with_all_tokens(kw_tokens))
     results = []
     for item in metadata:
         text_tokens = normalize_and_tokenize(item.get(field, ""))
@@ -26,16 +33,21 @@ def filter_by_keyword(metadata, keyword, field):
     return results
 
 def filter_by_author(metadata, author_name):
-    query = normalize_text(author_name)
-    return [item for item in metadata if query in normalize_text(item.get("author", "")) or query in normalize_text(item.get("name", ""))]
+    index = get_index(metadata)
+    if index is not None:
+        author, name = index.names['author'], index.names['name']
+        matched = metadata.rows_at(np.union1d(author.lookup(author_name, fuzzy=False),
+                                              name.lookup(author_name, fuzzy=False)))
+    else:
+        query = normalize_name(author_name)
+        matched = [item for item in metadata if query in normalized_field(item, "author") or query in normalized_field(item, "name")]
+    return matched or closest_rows(metadata, author_name)
 
 def filter_by_numeric_threshold(metadata, field, threshold, op='>'):
     results = []
     for item in metadata:
-        val_str = str(item.get(field, "")).replace('+', '').replace(',', '').strip()
-        try:
-            val = float(re.findall(r'[\d.]+', val_str)[0])
-        except Exception:
+        val = count_value(item, field)
+        if val is None:
             continue
         if (op == '>' and val > threshold) or \
            (op == '>=' and val >= threshold) or \
@@ -46,6 +58,9 @@ def filter_by_numeric_threshold(metadata, field, threshold, op='>'):
 
 def filter_by_attribute_in_description(metadata, attribute):
     attr_norm = normalize_text(attribute)
+    index = get_index(metadata)
+    if index is not None:
+        return metadata.rows_at(index.text['description'].containing(attr_norm))
     return [item for item in metadata if attr_norm in normalize_text(item.get('description', ''))]
 
 def filter_posts_in_month_year(metadata, month_name, year=None):
@@ -54,7 +69,7 @@ def filter_posts_in_month_year(metadata, month_name, year=None):
     for item in metadata:
         post_date = item.get('postDate', '')
         try:
-            dt = dateparse(post_date, fuzzy=True)
+            dt = post_datetime(item) or dateparse(post_date, fuzzy=True)
             if dt.month == month_num and (year is None or dt.year == year):
                 results.append(item)
         except Exception:
@@ -62,6 +77,9 @@ def filter_posts_in_month_year(metadata, month_name, year=None):
     return results
 
 def count_distinct_authors_text_posts(metadata):
+    aggregates = get_aggregates(metadata)
+    if aggregates is not None:
+        return aggregates.distinct_text_authors()
     text_posts = [i for i in metadata if normalize_text(i.get('type', '')) == 'text']
     distinct_authors = set(i.get('author', '') for i in text_posts)
     return len(distinct_authors)
@@ -104,7 +122,7 @@ def apply_filters(metadata, question):
         articles = [i for i in metadata if normalize_text(i.get('type', '')) == 'article']
         if not articles:
             return []
-        max_like = max(articles, key=lambda x: x.get('likeCount', 0))
+        max_like = max(articles, key=lambda x: count_value(x, 'likeCount') or 0)
         return [max_like]
 
     # Fallback
@@ -122,7 +140,7 @@ def format_results(posts):
         block = f"""
 👤 **Name**: {post.get('name', 'N/A')}
 🔗 **Profile URL**: [{post.get('profile_url', 'N/A')}]({post.get('profile_url', 'N/A')})
-👥 **Followers**: {post.get('followers', 'N/A')}
+👥 **Followers**: {display_count(post, 'followers')}
 
 📝 **Post Content**:
 {post.get('postContent', 'N/A')}
@@ -130,7 +148,7 @@ def format_results(posts):
 📎 **Post URL**: [{post.get('postUrl', 'N/A')}]({post.get('postUrl', 'N/A')})
 📅 **Post Date**: {post.get('postDate', 'N/A')}
 📌 **Type**: {post.get('type', 'N/A')}
-👍 **Likes**: {post.get('likeCount', 'N/A')} | 💬 **Comments**: {post.get('commentCount', 'N/A')} | 🔁 **Reposts**: {post.get('repostCount', 'N/A')}
+👍 **Likes**: {display_count(post, 'likeCount')} | 💬 **Comments**: {display_count(post, 'commentCount')} | 🔁 **Reposts**: {display_count(post, 'repostCount')}
 
 👤 **Author**: {post.get('author', 'N/A')} ([LinkedIn]({post.get('authorUrl', '#')}))
 """
@@ -3,6 +3,10 @@ import string
 from datetime import datetime
 from dateutil.parser import parse as dateparse
 from unidecode import unidecode
+import numpy as np
+from schema import canonical_post_url, count_value, display_count, normalized_field, post_datetime
+from metadata_index import closest_rows, get_index
+from aggregates import get_aggregates
 
 
 def normalize_text(text):
@@ -23,10 +27,8 @@ def normalize_and_tokenize(text):
 def filter_by_numeric_threshold(metadata, field, threshold, op='>'):
     results = []
     for item in metadata:
-        val_str = str(item.get(field, "")).replace('+', '').replace(',', '').strip()
-        try:
-            val = float(re.findall(r'[\d.]+', val_str)[0])
-        except Exception:
+        val = count_value(item, field)
+        if val is None:
             continue
         if (op == '>' and val > threshold) or (op == '>=' and val >= threshold) or \
            (op == '<' and val < threshold) or (op == '<=' and val <= threshold):
@@ -36,6 +38,9 @@ def filter_by_numeric_threshold(metadata, field, threshold, op='>'):
 
 def filter_by_keyword(metadata, keyword, field):
     kw_tokens = normalize_and_tokenize(keyword)
+    index = get_index(metadata)
+    if index is not None and field == 'postContent':
+        return metadata.rows_at(index.with_all_tokens(kw_tokens))
     results = []
     for item in metadata:
         text_tokens = normalize_and_tokenize(item.get(field, ""))
@@ -46,6 +51,9 @@ def filter_by_keyword(metadata, keyword, field):
 
 def filter_by_attribute_in_description(metadata, attribute):
     attr_norm = normalize_text(attribute)
+    index = get_index(metadata)
+    if index is not None:
+        return metadata.rows_at(index.text['description'].containing(attr_norm))
     return [item for item in metadata if attr_norm in normalize_text(item.get('description', ''))]
 
 
@@ -58,7 +66,7 @@ def filter_posts_in_month_year(metadata, month_name, year=None):
     for item in metadata:
         post_date = item.get('postDate', '')
         try:
-            dt = dateparse(post_date, fuzzy=True)
+            dt = post_datetime(item) or dateparse(post_date, fuzzy=True)
             if dt.month == month_num and (year is None or dt.year == year):
                 results.append(item)
         except Exception:
@@ -67,6 +75,9 @@ def filter_posts_in_month_year(metadata, month_name, year=None):
 
 
 def count_distinct_authors_text_posts(metadata):
+    aggregates = get_aggregates(metadata)
+    if aggregates is not None:
+        return aggregates.distinct_text_authors()
     text_posts = [i for i in metadata if normalize_text(i.get('type', '')) == 'text']
     distinct_authors = set(i.get('author', '') for i in text_posts)
     return len(distinct_authors)
@@ -83,12 +94,16 @@ def apply_filters(metadata, question):
         person_tokens = normalize_and_tokenize(person_name)
 
         def match_person(post):
-            author = normalize_text(post.get('author', ''))
-            name = normalize_text(post.get('name', ''))
+            author = normalized_field(post, 'author')
+            name = normalized_field(post, 'name')
             combined = author + " " + name
             return all(token in combined for token in person_tokens)
 
-        matched = [post for post in metadata if match_person(post)]
+        index = get_index(metadata)
+        if index is not None:
+            matched = metadata.rows_at(index.person(person_tokens, person_name))
+        else:
+            matched = [post for post in metadata if match_person(post)] or closest_rows(metadata, person_name)
         if matched:
             return matched
 
@@ -133,19 +148,27 @@ def apply_filters(metadata, question):
         articles = [i for i in metadata if normalize_text(i.get('type', '')) == 'article']
         if not articles:
             return []
-        max_like = max(articles, key=lambda x: x.get('likeCount', 0))
+        max_like = max(articles, key=lambda x: count_value(x, 'likeCount') or 0)
         return [max_like]
 
     # 8. Specific post detail by postUrl
     m = re.search(r'posturl.*?["\']?([^"\']+)["\']?', q)
     if m:
         url = m.group(1).strip()
-        return [i for i in metadata if i.get('postUrl','').strip() == url]
+        index = get_index(metadata)
+        if index is not None:
+            return metadata.rows_at(index.by_url('postUrl', url))
+        key = canonical_post_url(url)
+        return [i for i in metadata if key and canonical_post_url(i.get('postUrl')) == key]
 
     # 9. Existence check in description (e.g. Microsoft and Full Stack Developer)
     m = re.findall(r'["\']([^"\']+)["\']', question)
     if len(m) >= 2:
         kw1, kw2 = m[0].lower(), m[1].lower()
+        index = get_index(metadata)
+        if index is not None:
+            descriptions = index.text['description']
+            return metadata.rows_at(np.intersect1d(descriptions.containing(kw1), descriptions.containing(kw2)))
         filtered = [i for i in metadata if kw1 in normalize_text(i.get('description', '')) and kw2 in normalize_text(i.get('description', ''))]
         return filtered
 
@@ -158,7 +181,7 @@ def apply_filters(metadata, question):
     m = re.search(r'reposted.*by\s*([\w\s]+)', q)
     if m:
         person = m.group(1).strip().lower()
-        filtered = [i for i in metadata if normalize_text(i.get('author', '')) == person and i.get('repostCount', 0) > 0]
+        filtered = [i for i in metadata if normalized_field(i, 'author') == person and (count_value(i, 'repostCount') or 0) > 0]
         return filtered
 
     # Default fallback: return top 5 posts
@@ -177,7 +200,7 @@ def format_results(posts):
         block = f"""
 👤 **Name**: {post.get('name', 'N/A')}
 🔗 **Profile URL**: {post.get('profile_url', 'N/A')}
-👥 **Followers**: {post.get('followers', 'N/A')}
+👥 **Followers**: {display_count(post, 'followers')}
 
 📝 **Post Content**:
 {post.get('postContent', 'N/A')}
@@ -185,7 +208,7 @@ def format_results(posts):
 📎 **Post URL**: {post.get('postUrl', 'N/A')}
 📅 **Post Date**: {post.get('postDate', 'N/A')}
 📌 **Type**: {post.get('type', 'N/A')}
-👍 **Likes**: {post.get('likeCount', 'N/A')} | 💬 **Comments**: {post.get('commentCount', 'N/A')} | 🔁 **Reposts**: {post.get('repostCount', 'N/A')}
+👍 **Likes**: {display_count(post, 'likeCount')} | 💬 **Comments**: {display_count(post, 'commentCount')} | 🔁 **Reposts**: {display_count(post, 'repostCount')}
 
 👤 **Author**: {post.get('author', 'N/A')} ([LinkedIn]({post.get('authorUrl', '#')}))
         """.strip()
@@ -0,0 +1,89 @@
+# result_cursor.py
+#
+# Paged view over an engine's matches. Without a ranking key the cursor pulls
+# from the match iterable only as far as the requested page needs, which pays
+# off for lazy sources such as the author -> posts merge (already in
+# engagement order). With a key every match has to be seen, but the cursor
+# keeps a partial top-k (heapq.nlargest) instead of sorting them all, so page
+# 1 of a 50k-row fallback costs one scan plus a small heap.
+# Formatting is left to the caller and only ever sees one page; callers label
+# a lazy cursor from count() and has_next() rather than forcing total. A cursor can
+# be shared between sessions (semantic_cache), so reads take a lock.
+
+import heapq
+import threading
+
+PAGE_SIZE = 10
+
+class ResultCursor:
+    def __init__(self, results, key=None, page_size=PAGE_SIZE):
+        self.key = key
+        self.page_size = max(1, page_size)
+        self._source = iter(results)
+        self._items = []
+        self._exhausted = False
+        self._ranked = []
+        self._lock = threading.RLock()
+
+    def _pull(self, n=None):
+        # Materialize matches up to n (all when n is None)
+        while not self._exhausted and (n is None or len(self._items) < n):
+            try:
+                self._items.append(next(self._source))
+            except StopIteration:
+                self._exhausted = True
+
+    def _rank(self, n):
+        # Top-n by key, stable for ties, i.e. sorted(items, key, reverse=True)[:n]
+        self._pull()
+        n = min(n, len(self._items))
+        if len(self._ranked) < n:
+            if n * 4 >= len(self._items):
+                self._ranked = sorted(self._items, key=self.key, reverse=True)
+            else:
+                self._ranked = heapq.nlargest(n, self._items, key=self.key)
+        return self._ranked
+
+    def top(self, k):
+        with self._lock:
+            if self.key is None:
+                self._pull(k)
+                return self._items[:k]
+            return self._rank(k)[:k]
+
+    def page(self, number):
+        # Zero-based page number; an out-of-range page is empty
+        start = max(0, number) * self.page_size
+        return self.top(start + self.page_size)[start:]
+
+    def has_next(self, number):
+        need = (number + 1) * self.page_size + 1
+        with self._lock:
+            if self.key is None:
+                self._pull(need)
+            else:
+                self._pull()
+            return len(self._items) >= need
+
+    def count(self):
+        # (matches pulled so far, whether that is all of them); pulls nothing,
+        # so a lazy cursor can be labelled "N+" without materializing it
+        with self._lock:
+            return len(self._items), self._exhausted
+
+    @property
+    def total(self):
+        with self._lock:
+            self._pull()
+            return len(self._items)
+
+    def page_count(self):
+        return max(1, -(-self.total // self.page_size))
+
+    def __len__(self):
+        return self.total
+
+    def __bool__(self):
+        with self._lock:
+            self._pull(1)
+            return bool(self._items)
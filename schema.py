@@ -0,0 +1,116 @@
+# schema.py
+
+import re
+from datetime import datetime, timezone
+from urllib.parse import unquote, urlsplit
+
+from unidecode import unidecode
+
+STANDARD_COLUMNS = [
+    'name', 'profile_url', 'author', 'authorUrl', 'description',
+    'postContent', 'postUrl', 'postDate', 'type', 'likeCount',
+    'commentCount', 'repostCount', 'followers'
+]
+
+# Typed at build time by build_index.clean_and_standardize
+COUNT_COLUMNS = ['likeCount', 'commentCount', 'repostCount', 'followers']
+TEXT_COLUMNS = [c for c in STANDARD_COLUMNS if c not in COUNT_COLUMNS]
+
+# Counts as scraped ("940+", "1.2K") for display; the typed column loses them
+DISPLAY_COLUMNS = {c: f'{c}Text' for c in COUNT_COLUMNS}
+
+# Derived once at build time so query code never re-parses them
+DERIVED_COLUMNS = ['postTimestamp', 'authorNorm', 'nameNorm'] + list(DISPLAY_COLUMNS.values())
+NORMALIZED_FIELDS = {'author': 'authorNorm', 'name': 'nameNorm'}
+
+STORED_COLUMNS = STANDARD_COLUMNS + DERIVED_COLUMNS
+
+def normalize_name(text):
+    if not text:
+        return ""
+    return " ".join(unidecode(str(text)).lower().split())
+
+# ----------------------------
+# Typed accessors for query code
+# ----------------------------
+
+def count_value(item, field):
+    # Counts are ints in typed snapshots; untyped rows (old raw_metadata.json)
+    # fall back to parsing "1,234" / "940+" the way the engines always did
+    value = item.get(field)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    if value is None:
+        return None
+    found = re.findall(r'[\d.]+', str(value).replace('+', '').replace(',', ''))
+    try:
+        return float(found[0])
+    except (IndexError, ValueError):
+        return None
+
+def display_count(item, field, default='N/A'):
+    # The count as it was scraped; typed rows without the text column show
+    # the number, and a missing count shows as empty like the raw files did
+    text = item.get(DISPLAY_COLUMNS[field])
+    if text is not None:
+        return text
+    if field not in item:
+        return default
+    value = item[field]
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def normalized_field(item, field):
+    key = NORMALIZED_FIELDS.get(field)
+    if key and item.get(key) is not None:
+        return item[key]
+    return normalize_name(item.get(field, ""))
+
+def post_datetime(item):
+    ts = item.get('postTimestamp')
+    if isinstance(ts, (int, float)):
+        return datetime.fromtimestamp(ts, timezone.utc)
+    return None
+
+# ----------------------------
+# Canonical URLs
+# ----------------------------
+# Share links carry tracking params (?utm_source=..., ?trk=...) and the same
+# post shows up as /feed/update/urn:li:activity:<id>, /posts/<slug>_activity-<id>-xxxx
+# or with the URN percent-encoded. Keys reduce all of these to one string.
+
+POST_URN_RE = re.compile(r'(activity|share|ugcpost)[:-](\d{6,})')
+PROFILE_RE = re.compile(r'/(in|company|school)/([^/?#]+)')
+# Quotes and sentence punctuation a URL picks up when cut out of a question
+URL_TRAILING = '/"\'.,;:!)'
+
+def _url_parts(url):
+    url = unquote(str(url or '')).strip().strip('<>"\'').rstrip('.,;:!)').lower()
+    if not url:
+        return '', ''
+    if '://' not in url:
+        url = 'https://' + url
+    parts = urlsplit(url)
+    host = parts.netloc.split('@')[-1].split(':')[0]
+    for prefix in ('www.', 'm.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    # "…/in/name'?" only loses the '?' to urlsplit, so trim the path again
+    return host, parts.path.rstrip(URL_TRAILING)
+
+def canonical_post_url(url):
+    host, path = _url_parts(url)
+    m = POST_URN_RE.search(path)
+    if m:
+        return f"{m.group(1)}:{m.group(2)}"
+    return f"{host}{path}" if host or path else ''
+
+def canonical_profile_url(url):
+    host, path = _url_parts(url)
+    m = PROFILE_RE.search(path)
+    if m:
+        return f"{m.group(1)}:{m.group(2)}"
+    return f"{host}{path}" if host or path else ''
@@ -0,0 +1,175 @@
+# scrape_queue.py
+#
+# Persistent scrape job queue. Every URL has a status, a retry count and the
+# time it was last scraped, so a crashed run resumes where it stopped and
+# profiles fetched within the freshness window are not scraped again. A failed
+# URL is retried only after an exponential backoff (not_before), so a
+# rate-limited profile is not hit again straight away.
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+QUEUE_PATH = "scrape_queue.sqlite"
+MAX_ATTEMPTS = 3
+FRESHNESS_SECONDS = 7 * 24 * 3600
+RETRY_BACKOFF_SECONDS = 60     # doubled after every failed attempt
+MAX_BACKOFF_SECONDS = 3600
+
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+DONE = "done"
+FAILED = "failed"
+
+class ScrapeQueue:
+    def __init__(self, path=QUEUE_PATH, max_attempts=MAX_ATTEMPTS, freshness=FRESHNESS_SECONDS,
+                 backoff=RETRY_BACKOFF_SECONDS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.freshness = freshness
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                url TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                last_scraped_at REAL,
+                updated_at REAL NOT NULL,
+                not_before REAL NOT NULL DEFAULT 0
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, updated_at)")
+
+    def enqueue(self, urls):
+        # New URLs start pending; known URLs keep their state so history survives restarts
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs (url, status, attempts, updated_at) VALUES (?, ?, 0, ?)",
+                [(url, PENDING, now) for url in urls],
+            )
+
+    def recover(self):
+        # Jobs left in progress by a crashed run go back to the queue
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?", (PENDING, time.time(), IN_PROGRESS)
+            )
+        return cur.rowcount
+
+    def schedule_stale(self):
+        # Re-scrape profiles whose last successful scrape is older than the freshness window
+        cutoff = time.time() - self.freshness
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, not_before = 0, updated_at = ?"
+                " WHERE status = ? AND last_scraped_at < ?",
+                (PENDING, time.time(), DONE, cutoff),
+            )
+        return cur.rowcount
+
+    def claim(self, n):
+        # Pending URLs whose backoff has passed
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT url FROM jobs WHERE status = ? AND not_before <= ? ORDER BY updated_at LIMIT ?",
+                    (PENDING, time.time(), n),
+                ).fetchall()
+                urls = [r[0] for r in rows]
+                self._conn.executemany(
+                    "UPDATE jobs SET status = ?, updated_at = ? WHERE url = ?",
+                    [(IN_PROGRESS, time.time(), url) for url in urls],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return urls
+
+    def next_due(self):
+        # When the earliest backed-off pending URL may be claimed, None if nothing is pending
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(not_before) FROM jobs WHERE status = ?", (PENDING,)).fetchone()
+        return row[0]
+
+    def mark_done(self, url):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, last_error = NULL, last_scraped_at = ?, updated_at = ? WHERE url = ?",
+                (DONE, now, now, url),
+            )
+
+    def mark_failed(self, url, error):
+        with self._lock:
+            attempts = self._conn.execute("SELECT attempts FROM jobs WHERE url = ?", (url,)).fetchone()[0] + 1
+            status = FAILED if attempts >= self.max_attempts else PENDING
+            now = time.time()
+            not_before = now + min(self.backoff * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, last_error = ?, updated_at = ?, not_before = ? WHERE url = ?",
+                (status, attempts, str(error)[:500], now, not_before, url),
+            )
+        return status
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        self._conn.close()
+
+# ----------------------------
+# Incremental JSONL output
+# ----------------------------
+
+class JsonlWriter:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        torn = False
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+        self._f = open(path, "a", encoding="utf-8")
+        # Terminate a line torn by a crash so the next record starts cleanly
+        if torn:
+            self._f.write("\n")
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._f.write(line)
+            self._f.flush()
+            os.fsync(self._f.fileno())
+
+    def close(self):
+        self._f.close()
+
+def read_jsonl(path, key="url"):
+    # Later lines win, so a re-scraped profile replaces its older record
+    records = {}
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn final line from a crash mid-write
+                continue
+            records[record.get(key, len(records))] = record
+    return list(records.values())
@@ -1,45 +1,276 @@
 # scraper.py
 
-from selenium import webdriver
-from bs4 import BeautifulSoup
+import argparse
+import functools
+import os
+import threading
 import time
-import json
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 
-def get_linkedin_data(url, email, password):
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')  # No browser popup
-    driver = webdriver.Chrome(options=options)
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from extract import extract_page, extract_page_safe
+from scrape_queue import JsonlWriter, ScrapeQueue
+
+LOGIN_URL = "https://www.linkedin.com/login"
+WAIT_TIMEOUT = 15
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "linkedin")
+
+# ----------------------------
+# Politeness
+# ----------------------------
+
+class RateLimiter:
+    # Spaces page loads across all workers to at most `rate` per second
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+# ----------------------------
+# Browser sessions
+# ----------------------------
+
+class ScraperSession:
+    def __init__(self, email, password, login_url=LOGIN_URL, headless=True, timeout=WAIT_TIMEOUT):
+        options = webdriver.ChromeOptions()
+        if headless:
+            options.add_argument('--headless')  # No browser popup
+        self.driver = webdriver.Chrome(options=options)
+        self.email = email
+        self.password = password
+        self.login_url = login_url
+        self.timeout = timeout
+
+    def login(self):
+        self.driver.get(self.login_url)
+        wait = WebDriverWait(self.driver, self.timeout)
+        wait.until(EC.presence_of_element_located((By.ID, "username"))).send_keys(self.email)
+        self.driver.find_element(By.ID, "password").send_keys(self.password)
+        submit = self.driver.find_element(By.XPATH, "//button[@type='submit']")
+        submit.click()
+        # Logged in once the login form has been replaced by the next page
+        wait.until(EC.staleness_of(submit))
+
+    def fetch(self, url):
+        self.driver.get(url)
+        WebDriverWait(self.driver, self.timeout).until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
+        return self.driver.page_source
+
+    def close(self):
+        self.driver.quit()
+
+# ----------------------------
+# Concurrent scraper
+# ----------------------------
+
+class LinkedInScraper:
+    # One logged-in browser per worker thread, reused for every URL that worker handles
+    def __init__(self, email, password, workers=2, rate=0.5, login_url=LOGIN_URL,
+                 headless=True, timeout=WAIT_TIMEOUT, session_factory=ScraperSession, parse_workers=2):
+        self.email = email
+        self.password = password
+        self.workers = workers
+        self.parse_workers = parse_workers
+        self.login_url = login_url
+        self.headless = headless
+        self.timeout = timeout
+        self.session_factory = session_factory
+        self.rate_limiter = RateLimiter(rate)
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+        # Worker threads (and so their browsers) outlive a single scrape_iter call
+        self._browsers = None
 
-    driver.get("https://www.linkedin.com/login")
-    time.sleep(2)
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self.session_factory(self.email, self.password, self.login_url, self.headless, self.timeout)
+            with self._sessions_lock:
+                self._sessions.append(session)
+            self.rate_limiter.wait()
+            try:
+                session.login()
+            except Exception:
+                # Don't leave a browser open per failed login until close()
+                self._local.session = session
+                self._drop_session()
+                raise
+            self._local.session = session
+        return session
 
-    driver.find_element("id", "username").send_keys(email)
-    driver.find_element("id", "password").send_keys(password)
-    driver.find_element("xpath", "//button[@type='submit']").click()
-    time.sleep(3)
+    def _drop_session(self):
+        session = getattr(self._local, "session", None)
+        self._local.session = None
+        if session is not None:
+            with self._sessions_lock:
+                if session in self._sessions:
+                    self._sessions.remove(session)
+            try:
+                session.close()
+            except Exception:
+                pass
 
-    driver.get(url)
-    time.sleep(5)
+    def fetch(self, url):
+        session = self._session()
+        self.rate_limiter.wait()
+        try:
+            return session.fetch(url)
+        except Exception:
+            # A broken browser is not reused; the next URL logs in afresh
+            self._drop_session()
+            raise
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    driver.quit()
+    def scrape_one(self, url):
+        return extract_page(self.fetch(url), url)
 
-    name = soup.find("h1").get_text(strip=True)
-    title = soup.find("div", class_="text-body-medium").get_text(strip=True)
+    def _fetch_safe(self, url):
+        try:
+            return url, self.fetch(url), None
+        except Exception as e:
+            return url, None, str(e)
 
-    return {"name": name, "title": title}
+    def scrape(self, urls):
+        return list(self.scrape_iter(urls))
 
-def save_profiles():
-    email = "your_email"
-    password = "your_password"
-    urls = [
+    def _browser_pool(self):
+        if self._browsers is None:
+            self._browsers = ThreadPoolExecutor(max_workers=self.workers)
+        return self._browsers
+
+    def scrape_iter(self, urls):
+        # Browsers only fetch; parsing runs in a separate process pool so lxml
+        # work never holds up the next page load. Results are yielded in
+        # completion order as soon as each page is parsed. The browser pool is
+        # kept for the next call, so run_queue batches share logged-in sessions.
+        browsers = self._browser_pool()
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as parsers:
+            pending = {browsers.submit(self._fetch_safe, url) for url in urls}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if isinstance(result, tuple):
+                        url, html, error = result
+                        if error:
+                            yield {"url": url, "error": error}
+                        else:
+                            pending.add(parsers.submit(extract_page_safe, html, url))
+                    else:
+                        yield result
+
+    def close(self):
+        if self._browsers is not None:
+            self._browsers.shutdown(wait=True)
+            self._browsers = None
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            try:
+                session.close()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def get_linkedin_data(url, email, password):
+    with LinkedInScraper(email, password, workers=1) as scraper:
+        return scraper.scrape_one(url)
+
+# ----------------------------
+# Local fixtures
+# ----------------------------
+
+def serve_fixtures(directory=FIXTURES_DIR, port=0):
+    # Serves saved HTML pages on localhost so the scraper can run without LinkedIn
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+# ----------------------------
+# Resumable runs
+# ----------------------------
+
+def run_queue(queue, scraper, writer, batch_size=None):
+    # Claims pending URLs in batches; each result is written and checkpointed as it arrives
+    batch_size = batch_size or scraper.workers * 4
+    scraped = 0
+    while True:
+        urls = queue.claim(batch_size)
+        if not urls:
+            # Only failed URLs waiting out their backoff (if any) are left
+            due = queue.next_due()
+            if due is None:
+                break
+            time.sleep(max(0.0, due - time.time()))
+            continue
+        for result in scraper.scrape_iter(urls):
+            if "error" in result:
+                status = queue.mark_failed(result["url"], result["error"])
+                print(f"Failed {result['url']} ({status}): {result['error']}")
+                continue
+            result["scraped_at"] = time.time()
+            writer.write(result)
+            queue.mark_done(result["url"])
+            scraped += 1
+    return scraped
+
+def save_profiles(urls=None, email=None, password=None, workers=2, rate=0.5, login_url=LOGIN_URL,
+                  out_path="linkedin_profiles.jsonl", queue_path="scrape_queue.sqlite"):
+    email = email or os.getenv("LINKEDIN_EMAIL", "your_email")
+    password = password or os.getenv("LINKEDIN_PASSWORD", "your_password")
+    urls = urls or [
         "https://www.linkedin.com/in/example1",
         "https://www.linkedin.com/in/example2"
     ]
 
-    profiles = [get_linkedin_data(url, email, password) for url in urls]
-    with open("linkedin_profiles.json", "w") as f:
-        json.dump(profiles, f, indent=4)
+    queue = ScrapeQueue(queue_path)
+    queue.enqueue(urls)
+    recovered = queue.recover()
+    stale = queue.schedule_stale()
+    if recovered or stale:
+        print(f"Resuming: {recovered} interrupted, {stale} stale profiles re-queued")
+
+    writer = JsonlWriter(out_path)
+    try:
+        with LinkedInScraper(email, password, workers=workers, rate=rate, login_url=login_url) as scraper:
+            scraped = run_queue(queue, scraper, writer)
+    finally:
+        writer.close()
+    print(f"Scraped {scraped} profiles into {out_path}; queue: {queue.counts()}")
+    queue.close()
+    return scraped
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape LinkedIn profiles")
+    parser.add_argument("urls", nargs="*")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--rate", type=float, default=0.5, help="max page loads per second across workers")
+    parser.add_argument("--fixtures", action="store_true", help="scrape the local HTML fixtures instead of LinkedIn")
+    args = parser.parse_args()
 
-# Uncomment to run scraping:
-# save_profiles()
+    if args.fixtures:
+        server, base = serve_fixtures()
+        urls = args.urls or [f"{base}/in/example1.html", f"{base}/in/example2.html"]
+        save_profiles(urls, "fixture@example.com", "fixture", args.workers, args.rate, login_url=f"{base}/login.html",
+                      out_path="fixture_profiles.jsonl", queue_path="fixture_queue.sqlite")
+        server.shutdown()
+    else:
+        save_profiles(args.urls or None, workers=args.workers, rate=args.rate)
@@ -0,0 +1,190 @@
+# semantic_cache.py
+#
+# Answer cache keyed by what a question means rather than its exact text:
+# "who has most followers" and "profile with highest followers" should share
+# one answer. Questions are embedded (embedder.get_embeddings) into a small
+# in-memory matrix and a lookup returns the answer of the nearest cached
+# question when the cosine similarity is at least SEMANTIC_CACHE_THRESHOLD.
+#
+# Embeddings alone would also pair "posts by Alice Shah" with "posts by Bob
+# Shah", or "most likes" with "most comments", so a hit additionally needs the
+# same literal terms: numbers, URLs, quoted phrases, every word that is not
+# ordinary question phrasing (names, keywords, months) and the concepts that
+# pick the answer (max/min/average, likes/comments/followers, post/profile/
+# author, ...), with their synonyms folded together. Paraphrase is only
+# allowed in the phrasing.
+#
+# Each cache holds at most SEMANTIC_CACHE_SIZE entries (least recently used
+# is evicted) and belongs to one metadata snapshot: asking with a new version
+# clears it. Repeats of the exact same text skip the embedding call.
+#
+# Off unless SEMANTIC_CACHE=1. With the snapshot indexes most questions are
+# answered in well under a millisecond, less than embedding the question
+# costs, so it pays off for unindexed data or heavy fallback questions.
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from unidecode import unidecode
+
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "0") == "1"
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "256"))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+
+URL_RE = re.compile(r'https?://[^\s"\']+')
+QUOTED_RE = re.compile(r'["\']([^"\']+)["\']')
+WORD_RE = re.compile(r'[a-z0-9]+')
+
+# Words that only phrase a question; anything else must match exactly
+QUESTION_WORDS = frozenset("""
+    a an the of in on at to for from by with about and or is are was were be has have had do does did
+    what which when where how many much me my i we you it its this that these those there
+    any anything some something all each every one ones please show give list find get tell display
+    more made written shared published created mention mentions mentioning mentioned contain
+    contains containing related regarding talk talks talking
+    url urls posturl link
+""".split())
+
+# Words that decide what is asked: each must match, up to these synonyms
+CONCEPTS = {}
+for canonical, words in {
+    "max": "most highest maximum max top largest biggest best greatest",
+    "min": "least lowest minimum min fewest",
+    "avg": "average mean avg",
+    "count": "count number total many",
+    "common": "common frequent popular",
+    "type": "type types kind",
+    "followers": "followers follower",
+    "likes": "likes like liked likecount",
+    "comments": "comments comment commented commentcount",
+    "reposts": "reposts repost",
+    # What is asked about: each picks a different engine branch
+    "post": "post posts",
+    "profile": "profile profiles person people user users who whom whose",
+    "author": "author authors",
+    "content": "content postcontent",
+    "details": "details detail info information",
+}.items():
+    CONCEPTS.update(dict.fromkeys(words.split(), canonical))
+
+def normalize_question(question):
+    return " ".join(unidecode(question or "").lower().split())
+
+def literal_terms(question):
+    # Parts of the question a paraphrase has to keep verbatim
+    q = normalize_question(question)
+    terms = set(URL_RE.findall(q)) | {m.strip() for m in QUOTED_RE.findall(q)}
+    for w in WORD_RE.findall(URL_RE.sub(" ", q)):
+        if w in CONCEPTS:
+            terms.add(CONCEPTS[w])
+        elif w not in QUESTION_WORDS:
+            terms.add(w)
+    return frozenset(terms)
+
+class SemanticCache:
+    def __init__(self, embed=None, capacity=SEMANTIC_CACHE_SIZE, threshold=SEMANTIC_CACHE_THRESHOLD):
+        self._embed = embed
+        self.capacity = max(1, capacity)
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self, version=None):
+        self.version = version
+        self._vectors = None                # capacity x dim, unit rows
+        self._valid = np.zeros(self.capacity, dtype=bool)
+        self._slots = OrderedDict()         # slot -> (question, terms, value), LRU first
+        self._exact = {}                    # normalized question -> slot
+
+    def embed(self, question):
+        if self._embed is None:
+            # Loads the embedding model on first use only
+            from embedder import get_embeddings
+            self._embed = get_embeddings
+        vector = np.asarray(self._embed([question]), dtype=np.float32)[0]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _nearest(self, vector, terms):
+        sims = self._vectors @ vector
+        sims[~self._valid] = -np.inf
+        for slot in np.argsort(-sims):
+            if sims[slot] < self.threshold:
+                break
+            if self._slots[int(slot)][1] == terms:
+                return int(slot)
+        return None
+
+    def lookup(self, question, version=None, terms=None):
+        # (value, None) for a cached answer, else (None, vector to store with)
+        q = normalize_question(question)
+        terms = literal_terms(question) if terms is None else terms
+        with self._lock:
+            if version != self.version:
+                self.clear(version)
+            slot = self._exact.get(q)
+            if slot is not None and self._slots[slot][1] == terms:
+                self._slots.move_to_end(slot)
+                self.hits += 1
+                return self._slots[slot][2], None
+        vector = self.embed(q)
+        with self._lock:
+            if version != self.version or self._vectors is None:
+                self.misses += 1
+                return None, vector
+            slot = self._nearest(vector, terms)
+            if slot is None:
+                self.misses += 1
+                return None, vector
+            self._slots.move_to_end(slot)
+            self.hits += 1
+            return self._slots[slot][2], None
+
+    def store(self, question, value, version=None, terms=None, vector=None):
+        q = normalize_question(question)
+        terms = literal_terms(question) if terms is None else terms
+        if vector is None:
+            vector = self.embed(q)
+        with self._lock:
+            if version != self.version:
+                self.clear(version)
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, len(vector)), dtype=np.float32)
+            slot = self._exact.get(q)
+            if slot is None:
+                if len(self._slots) >= self.capacity:
+                    slot, (old, _, _) = self._slots.popitem(last=False)
+                    self._exact.pop(normalize_question(old), None)
+                else:
+                    slot = next(i for i in range(self.capacity) if not self._valid[i])
+            self._vectors[slot] = vector
+            self._valid[slot] = True
+            self._slots[slot] = (question, terms, value)
+            self._slots.move_to_end(slot)
+            self._exact[q] = slot
+
+    def get_or_compute(self, question, compute, version=None, extra_terms=()):
+        # Cached answer for the question (or a paraphrase), else compute() and cache it
+        terms = literal_terms(question) | frozenset(extra_terms)
+        value, vector = self.lookup(question, version, terms)
+        if vector is None:
+            return value
+        value = compute()
+        self.store(question, value, version, terms, vector)
+        return value
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_cache(name="default"):
+    # One cache per tenant; each follows its own snapshot version
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = SemanticCache()
+        return cache
@@ -0,0 +1,235 @@
+# service.py
+#
+# HTTP API over the same engines the Streamlit app uses, for other services.
+#
+#   uvicorn service:app --host 0.0.0.0 --port 8000
+#
+# Endpoints (JSON bodies). The tenant is bound server-side from the X-API-Key
+# header (partitions.bind_tenant); a body "tenant" must name that same tenant:
+#   POST /query     answer_linkedin_query, falling back to a page of filtered posts
+#   POST /filter    one page of linkedin_filter results
+#   POST /search    semantic search over the tenant's FAISS index
+#   POST /generate  LLM post generation via llm_runtime.chat
+#   GET  /health, /metrics
+#
+# Query work is pure-Python CPU work, so it runs in a process pool
+# (SERVICE_WORKERS processes) and the event loop only awaits it. Each worker
+# loads the PRELOAD_TENANTS partitions when it starts and keeps them
+# resident through partitions.PartitionManager. Generation is network-bound
+# and goes through a thread pool instead.
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from columnar import to_dicts
+from semantic_cache import SEMANTIC_CACHE, get_cache
+from tracing import add_spans, mark_intent, registry, set_attr, trace
+
+load_dotenv()
+
+SERVICE_WORKERS = int(os.getenv("SERVICE_WORKERS", str(os.cpu_count() or 2)))
+GENERATE_THREADS = int(os.getenv("GENERATE_THREADS", "8"))
+PRELOAD_TENANTS = [t for t in os.getenv("PRELOAD_TENANTS", "default").split(",") if t]
+MAX_PAGE_SIZE = 100
+
+# ----------------------------
+# Worker-side tasks
+# ----------------------------
+# Run inside the process pool; arguments and results must pickle, so they
+# return plain dicts with at most one page of rows (columnar rows are copied
+# out with to_dicts).
+
+def _init_worker(tenants):
+    from partitions import get_partition
+    for tenant in tenants:
+        try:
+            get_partition(tenant)
+        except FileNotFoundError:
+            # Tenant has no data yet; it loads on first request once it does
+            pass
+
+def _warm():
+    return os.getpid()
+
+def _traced(name, fn, *args):
+    # The worker's registry is never scraped, so its spans (and its own total
+    # as a "<name>" stage) go back with the result for run_cpu to observe
+    with trace(name, export=False) as record:
+        result = fn(*args)
+    result["intent"] = record["intent"]
+    result["spans"] = record["spans"] + [{"stage": name, "offset": 0.0, "duration": record["duration"]}]
+    return result
+
+def _filter_page(tenant, question, page, page_size, count=False):
+    # total is None when the lazy cursor was not run to the end; count=True
+    # pulls every match to report it exactly
+    from linkedin_filter import filter_cursor
+    from partitions import get_partition
+    partition = get_partition(tenant)
+    cursor = filter_cursor(partition.metadata, question, page_size)
+    results = to_dicts(cursor.page(page))
+    has_next = cursor.has_next(page)
+    exact = cursor.count()[1]
+    return {
+        "version": partition.version,
+        "total": cursor.total if count or exact else None,
+        "has_next": has_next,
+        "page": page,
+        "page_size": cursor.page_size,
+        "results": results,
+    }
+
+def filter_task(tenant, question, page, page_size, count=False):
+    return _traced("filter", _filter_page, tenant, question, page, page_size, count)
+
+def _query(tenant, question, page_size):
+    from linkedin_query_answer import answer_linkedin_query
+    from partitions import get_partition
+    answer = answer_linkedin_query(get_partition(tenant).metadata, question)
+    if answer and "could not find" not in answer.lower():
+        return {"answer": answer, "total": 0, "has_next": False, "results": []}
+    result = _filter_page(tenant, question, 0, page_size)
+    result["answer"] = None
+    return result
+
+def _cached_query(tenant, question, page_size):
+    # Per-worker semantic cache over _query; results are copied so the
+    # cached dict never picks up the trace's intent
+    from partitions import get_partition
+    version = get_partition(tenant).key
+    mark_intent("cache.hit")
+    result = get_cache(tenant or "default").get_or_compute(
+        question, lambda: _query(tenant, question, page_size), version, extra_terms=(f"page_size={page_size}",)
+    )
+    return dict(result)
+
+def query_task(tenant, question, page_size):
+    return _traced("query", _cached_query if SEMANTIC_CACHE else _query, tenant, question, page_size)
+
+def search_task(tenant, query, k):
+    from embedder import get_embeddings
+    from partitions import get_partition
+    partition = get_partition(tenant)
+    hits = partition.search(get_embeddings([query]), k)[0]
+    return {
+        "version": partition.version,
+        "results": [{"distance": d, "record": dict(row)} for row, d in hits],
+    }
+
+# ----------------------------
+# App
+# ----------------------------
+
+class QueryRequest(BaseModel):
+    question: str = Field(min_length=1)
+    tenant: Optional[str] = None
+    page_size: int = Field(10, ge=1, le=MAX_PAGE_SIZE)
+
+class FilterRequest(BaseModel):
+    question: str = Field(min_length=1)
+    tenant: Optional[str] = None
+    page: int = Field(0, ge=0)
+    page_size: int = Field(10, ge=1, le=MAX_PAGE_SIZE)
+    count: bool = False  # exact total even when that means pulling every match
+
+class SearchRequest(BaseModel):
+    query: str = Field(min_length=1)
+    tenant: Optional[str] = None
+    k: int = Field(5, ge=1, le=MAX_PAGE_SIZE)
+
+class GenerateRequest(BaseModel):
+    prompt: str = Field(min_length=1)
+    temperature: float = Field(0.7, ge=0.0, le=2.0)
+    max_tokens: int = Field(300, ge=1, le=2048)
+
+pools = {}
+
+@asynccontextmanager
+async def lifespan(app):
+    pools["cpu"] = ProcessPoolExecutor(
+        max_workers=SERVICE_WORKERS, initializer=_init_worker, initargs=(PRELOAD_TENANTS,)
+    )
+    pools["io"] = ThreadPoolExecutor(max_workers=GENERATE_THREADS)
+    # Start every worker now so indexes are loaded before the first request
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*[loop.run_in_executor(pools["cpu"], _warm) for _ in range(SERVICE_WORKERS)])
+    try:
+        yield
+    finally:
+        pools["cpu"].shutdown(cancel_futures=True)
+        pools["io"].shutdown(cancel_futures=True)
+
+app = FastAPI(title="LinkedIn Profile Assistant", lifespan=lifespan)
+
+def bound_tenant(requested, api_key):
+    from partitions import bind_tenant
+    try:
+        return bind_tenant(requested, api_key)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+
+async def run_cpu(name, fn, *args):
+    loop = asyncio.get_running_loop()
+    with trace(name):
+        set_attr("tenant", args[0] or "default")
+        try:
+            result = await loop.run_in_executor(pools["cpu"], fn, *args)
+        except ValueError as e:
+            mark_intent("error.bad_request")
+            raise HTTPException(status_code=400, detail=str(e))
+        except FileNotFoundError:
+            mark_intent("error.not_found")
+            raise HTTPException(status_code=404, detail="No data for this tenant")
+        except Exception as e:
+            # Any other worker failure (a crashed pool included) is a labelled 500
+            mark_intent("error.internal")
+            set_attr("error", repr(e))
+            raise HTTPException(status_code=500, detail="Internal error")
+        mark_intent(result.pop("intent", "") or "")
+        add_spans(result.pop("spans", ()))
+    return result
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "workers": SERVICE_WORKERS, "tenants": PRELOAD_TENANTS}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return registry.render_prometheus()
+
+@app.post("/query")
+async def query(req: QueryRequest, x_api_key: Optional[str] = Header(None)):
+    return await run_cpu("http.query", query_task, bound_tenant(req.tenant, x_api_key), req.question, req.page_size)
+
+@app.post("/filter")
+async def filter_posts(req: FilterRequest, x_api_key: Optional[str] = Header(None)):
+    return await run_cpu("http.filter", filter_task, bound_tenant(req.tenant, x_api_key), req.question, req.page, req.page_size, req.count)
+
+@app.post("/search")
+async def search(req: SearchRequest, x_api_key: Optional[str] = Header(None)):
+    return await run_cpu("http.search", search_task, bound_tenant(req.tenant, x_api_key), req.query, req.k)
+
+@app.post("/generate")
+async def generate(req: GenerateRequest):
+    from llm_runtime import chat
+    messages = [
+        {"role": "system", "content": "You are a professional LinkedIn post writer."},
+        {"role": "user", "content": req.prompt},
+    ]
+    loop = asyncio.get_running_loop()
+    with trace("http.generate"):
+        try:
+            post = await loop.run_in_executor(
+                pools["io"], lambda: chat(messages, temperature=req.temperature, max_tokens=req.max_tokens)
+            )
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Generation failed: {e}")
+    return {"post": post}
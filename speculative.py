@@ -0,0 +1,56 @@
+# speculative.py
+#
+# Draft models for llama-cpp-python speculative decoding. Either prompt-lookup
+# decoding (no extra model) or a small GGUF draft model that shares the target
+# model's vocabulary. Both are wrapped in DraftStats so benchmarks can report
+# how many drafted tokens the target model accepted.
+
+import numpy as np
+from llama_cpp import Llama
+from llama_cpp.llama_speculative import LlamaDraftModel, LlamaPromptLookupDecoding
+
+class GGUFDraftModel(LlamaDraftModel):
+    def __init__(self, model_path, num_pred_tokens=8, n_ctx=2048, n_threads=4):
+        self.num_pred_tokens = num_pred_tokens
+        self.llm = Llama(model_path=model_path, n_ctx=n_ctx, n_threads=n_threads, verbose=False)
+
+    def __call__(self, input_ids, **kwargs):
+        draft = []
+        # Greedy continuation; Llama.generate reuses the KV cache for the
+        # prefix shared with the previous call, so only new tokens are evaluated
+        for token in self.llm.generate(input_ids.tolist(), temp=0.0, top_k=1):
+            if token == self.llm.token_eos():
+                break
+            draft.append(token)
+            if len(draft) >= self.num_pred_tokens:
+                break
+        return np.array(draft, dtype=np.intc)
+
+class DraftStats(LlamaDraftModel):
+    def __init__(self, draft_model):
+        self.draft_model = draft_model
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.proposed = 0
+
+    def __call__(self, input_ids, **kwargs):
+        draft = self.draft_model(input_ids, **kwargs)
+        self.calls += 1
+        self.proposed += len(draft)
+        return draft
+
+    def acceptance_rate(self, n_generated):
+        # Each verification step yields one sampled token plus the accepted
+        # part of the draft, so accepted ~= generated - steps
+        if not self.proposed:
+            return 0.0
+        return max(0, n_generated - self.calls) / self.proposed
+
+def make_draft_model(draft, num_pred_tokens=8, n_ctx=2048, n_threads=4):
+    if not draft:
+        return None
+    if draft == "prompt-lookup":
+        return DraftStats(LlamaPromptLookupDecoding(num_pred_tokens=num_pred_tokens))
+    return DraftStats(GGUFDraftModel(draft, num_pred_tokens=num_pred_tokens, n_ctx=n_ctx, n_threads=n_threads))
@@ -0,0 +1,51 @@
+import json
+import random
+
+from aggregates import Aggregates
+from benchmarks.corpus import generate_corpus
+
+def state(agg):
+    return json.loads(json.dumps(agg.to_dict(), sort_keys=True))
+
+def test_incremental_upserts_match_rebuild():
+    rng = random.Random(7)
+    pool = generate_corpus(600, seed=1)
+    for row in pool[::9]:
+        row["likeCount"], row["postTimestamp"] = None, None
+    current = [dict(r) for r in pool[:300]]
+    agg = Aggregates.from_rows(current)
+    for _ in range(1500):
+        pos = rng.randrange(len(current))
+        new = dict(rng.choice(pool))
+        if rng.random() < 0.3:
+            new["type"] = rng.choice(["Text", "Image", "Video", ""])
+        agg.replace(current[pos], new)
+        current[pos] = new
+    agg.add(pool[-1])
+    agg.replace(None, pool[-2])
+    current += [pool[-1], pool[-2]]
+    rebuilt = Aggregates.from_rows(current)
+    assert state(agg) == state(rebuilt)
+    assert agg.average_likes() == rebuilt.average_likes()
+    assert agg.most_common_type() == rebuilt.most_common_type()
+    assert agg.distinct_text_authors() == rebuilt.distinct_text_authors()
+
+def test_remove_everything_leaves_nothing():
+    rows = generate_corpus(200, seed=2)
+    agg = Aggregates.from_rows(rows)
+    for row in rows:
+        agg.remove(row)
+    assert state(agg) == state(Aggregates())
+    assert agg.average_likes() is None and agg.most_common_type() is None
+
+def test_dict_round_trip():
+    agg = Aggregates.from_rows(generate_corpus(500, seed=3))
+    loaded = Aggregates.from_dict(json.loads(json.dumps(agg.to_dict())))
+    assert state(loaded) == state(agg)
+    assert loaded.average_likes() == agg.average_likes()
+    assert loaded.group("type") == agg.group("type")
+    # A loaded copy keeps updating like the original
+    row = generate_corpus(1, seed=4)[0]
+    agg.add(row)
+    loaded.add(row)
+    assert state(loaded) == state(agg)
@@ -0,0 +1,119 @@
+import random
+
+from author_posts import ORDERS, AuthorPosts
+from benchmarks.corpus import generate_corpus
+
+def corpus(n=2000, seed=3):
+    rows = generate_corpus(n, seed=seed)
+    # Ties and untimed posts exercise the id tie-break and "untimed last"
+    for row in rows[::7]:
+        row["postTimestamp"] = None
+    for row in rows[::5]:
+        row["likeCount"], row["commentCount"] = 10, 2
+    return rows
+
+def assert_same(a, b):
+    assert sorted(a.authors()) == sorted(b.authors())
+    for author in a.authors():
+        assert a.count(author) == b.count(author)
+        for order in ORDERS:
+            assert a.ids(author, order) == b.ids(author, order), (author, order)
+            assert a.page(author, 1, 3, order) == b.page(author, 1, 3, order)
+
+def test_frozen_matches_mutable():
+    index = AuthorPosts.from_rows(corpus())
+    frozen = index.freeze()
+    assert_same(index, frozen)
+    rng = random.Random(0)
+    authors = index.authors()
+    for _ in range(100):
+        some = rng.sample(authors, 3)
+        for order in ORDERS:
+            assert list(index.merged(some, order)) == list(frozen.merged(some, order))
+    assert frozen.count("nobody") == 0 and frozen.ids("nobody") == [] and list(frozen.merged(["nobody"])) == []
+
+def test_incremental_matches_from_rows():
+    rng = random.Random(5)
+    pool = corpus(400, seed=4)
+    current = {i: dict(r) for i, r in enumerate(pool[:200])}
+    index = AuthorPosts.from_records(current.items())
+    next_id = len(current)
+    for _ in range(800):
+        action = rng.random()
+        if action < 0.6 and current:
+            post_id = rng.choice(list(current))
+            new = dict(rng.choice(pool))
+            index.replace(post_id, current[post_id], new)
+            current[post_id] = new
+        elif action < 0.8 and current:
+            post_id = rng.choice(list(current))
+            index.remove(post_id, current.pop(post_id))
+        else:
+            current[next_id] = dict(rng.choice(pool))
+            index.add(next_id, current[next_id])
+            next_id += 1
+    assert_same(index, AuthorPosts.from_records(current.items()))
+
+def test_sort_orders():
+    rows = [
+        {"author": "A", "postTimestamp": 100, "likeCount": 5, "commentCount": 1},
+        {"author": "A", "postTimestamp": None, "likeCount": 9, "commentCount": 0},
+        {"author": "A", "postTimestamp": 300, "likeCount": 5, "commentCount": 3},
+        {"author": "A", "postTimestamp": 200, "likeCount": 5, "commentCount": 1},
+        {"author": "B", "postTimestamp": 50, "likeCount": 7, "commentCount": 0},
+    ]
+    for index in (AuthorPosts.from_rows(rows), AuthorPosts.from_rows(rows).freeze()):
+        assert index.ids("a", "id") == [0, 1, 2, 3]
+        assert index.ids("a", "date") == [2, 3, 0, 1]          # newest first, untimed last
+        assert index.ids("a", "engagement") == [1, 2, 0, 3]    # likes, comments, then id
+        assert index.top("a", 2) == [1, 2] and index.page("a", 1, 3) == [1]
+        assert list(index.merged(["a", "b"], "engagement")) == [1, 4, 2, 0, 3]
+
+def test_remap_through_ids_json(tmp_path):
+    import json
+
+    from partitions import Partition
+
+    rows = corpus(300, seed=6)
+    # Store ids are not positions: the snapshot lists them in ids.json row order
+    store_ids = random.Random(1).sample(range(10_000), len(rows))
+    published = AuthorPosts.from_records(zip(store_ids, rows))
+    directory = tmp_path / "snapshots" / "v1"
+    directory.mkdir(parents=True)
+    (directory / "raw_metadata.json").write_text(json.dumps(rows))
+    (directory / "ids.json").write_text(json.dumps(store_ids))
+    (directory / "author_posts.json").write_text(json.dumps(published.to_dict()))
+    paths = {"snapshots": str(tmp_path / "snapshots"), "fallback": str(tmp_path / "raw.json")}
+    loaded = Partition.load("t", paths, "v1").metadata.author_posts
+    assert_same(loaded, AuthorPosts.from_rows(rows))
+
+def test_author_cursor_matches_ranked_filter():
+    from linkedin_filter import apply_filters, author_cursor, engagement_key
+    from partitions import build_metadata
+
+    rows = corpus(1500, seed=8)
+    names = sorted({r["author"] for r in rows})[:15] + [rows[0]["author"].split()[0]]
+    for columnar in (False, True):
+        metadata = build_metadata([dict(r) for r in rows], columnar=columnar)
+        for name in names:
+            question = f"Give me posts by {name}"
+            cursor = author_cursor(metadata, question, page_size=7)
+            expected = sorted(apply_filters(rows, question), key=engagement_key, reverse=True)
+            got = [post for page in range(cursor.page_count()) for post in cursor.page(page)]
+            assert [p["postUrl"] for p in got] == [p["postUrl"] for p in expected], name
+
+def test_format_page_leaves_lazy_cursor_lazy():
+    from linkedin_filter import format_page
+    from result_cursor import ResultCursor
+
+    pulled = []
+    def source():
+        for i in range(100):
+            pulled.append(i)
+            yield {"name": f"n{i}", "postContent": f"p{i}"}
+
+    cursor = ResultCursor(source(), page_size=10)
+    text = format_page(cursor, 0)
+    assert text.startswith("Showing 1–10 of 11+ results")
+    assert len(pulled) == 11 and cursor.count() == (11, False)
+    assert format_page(cursor, 9).startswith("Showing 91–100 of 100 results")
@@ -0,0 +1,27 @@
+import pytest
+
+from columnar import ArenaColumn, ColumnStore, IntColumn
+
+def test_arena_round_trip():
+    values = [f"https://www.linkedin.com/feed/update/urn:li:activity:{7000000000000000000 + i}" for i in range(50)]
+    values += [None, "", "no separator", "trailing/", "ünïcode: tëxt"]
+    column = ArenaColumn(values)
+    assert [column.get(i) for i in range(len(values))] == values
+    assert column.prefix_codes.typecode == 'H'
+    assert column.offsets.typecode == 'I'
+
+def test_int_column_width():
+    narrow = IntColumn([0, None, 1700000000, -5])
+    assert narrow.data.typecode == 'i'
+    assert [narrow.get(i) for i in range(4)] == [0, None, 1700000000, -5]
+    wide = IntColumn([2 ** 40, None])
+    assert wide.data.typecode == 'q'
+    assert [wide.get(i) for i in range(2)] == [2 ** 40, None]
+
+def test_row_is_unhashable_like_a_dict():
+    records = [{"author": "A", "likeCount": 3}, {"author": "B", "likeCount": None}]
+    rows = ColumnStore(records).rows()
+    assert rows[0] == records[0] and records[0] == rows[0]
+    assert rows[1] != rows[0]
+    with pytest.raises(TypeError):
+        hash(rows[0])
@@ -0,0 +1,13 @@
+from context_packer import TokenCounter, pack_docs
+
+MADHURI = "Author: Madhuri Jain\npostUrl: https://linkedin.com/in/mjmadhu\nlikeCount: 940\npostContent: Looking for a lawyer in Bangalore."
+
+def test_doc_without_intent_fields_is_kept_whole():
+    # accuracy.py's first case: the corpus doc has no followers field
+    text, _ = pack_docs("How many followers does Madhuri Jain have?", [MADHURI], TokenCounter(), 500)
+    assert "likeCount: 940" in text and "postContent: Looking for a lawyer" in text
+
+def test_intent_fields_still_trimmed():
+    doc = "Name: Madhuri Jain\nfollowers: 940+\ndescription: Legal Counsel\npostContent: Looking for a lawyer."
+    text, _ = pack_docs("How many followers does Madhuri Jain have?", [doc], TokenCounter(), 500)
+    assert text == "Post 1:\nName: Madhuri Jain\nfollowers: 940+"
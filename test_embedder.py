@@ -0,0 +1,131 @@
+import os
+
+import numpy as np
+import pytest
+
+import embedder
+from embedder import ONNX_MODEL_DIR, ONNX_MODEL_FILE, OnnxEmbedder, mean_pool
+
+MIN_COSINE = 0.98
+
+# ----------------------------
+# OnnxEmbedder with a stub session
+# ----------------------------
+
+class StubEncoding:
+    def __init__(self, ids, length):
+        self.ids = ids + [0] * (length - len(ids))
+        self.attention_mask = [1] * len(ids) + [0] * (length - len(ids))
+
+class StubTokenizer:
+    # One token per word between [CLS]=101 and [SEP]=102, padded per batch
+    def encode_batch(self, texts):
+        ids = [[101] + [len(w) for w in t.split()] + [102] for t in texts]
+        length = max(len(i) for i in ids)
+        return [StubEncoding(i, length) for i in ids]
+
+class StubSession:
+    # hidden[b, t] = (id, 1): padding rows are (0, 1) and would skew an unmasked mean
+    def __init__(self):
+        self.batch_lengths = []
+
+    def run(self, _, feeds):
+        ids = feeds["input_ids"].astype(np.float32)
+        self.batch_lengths.append(ids.shape[1])
+        return [np.stack([ids, np.ones_like(ids)], axis=-1)]
+
+def stub_embedder(batch_size):
+    e = object.__new__(OnnxEmbedder)
+    e.tokenizer = StubTokenizer()
+    e.session = StubSession()
+    e.input_names = {"input_ids", "attention_mask", "token_type_ids"}
+    e.batch_size = batch_size
+    return e
+
+def test_mean_pool_ignores_padding():
+    hidden = np.array([[[3.0, 4.0], [100.0, 100.0]]], dtype=np.float32)
+    mask = np.array([[1, 0]])
+    np.testing.assert_allclose(mean_pool(hidden, mask), [[0.6, 0.8]], rtol=1e-6)
+
+def test_onnx_encode_keeps_input_order():
+    texts = ["a", "three word text", "", "a much longer text than the others here", "two words"]
+    e = stub_embedder(batch_size=2)
+    batched = e.encode(texts)
+    one_by_one = np.vstack([stub_embedder(batch_size=1).encode([t]) for t in texts])
+    np.testing.assert_allclose(batched, one_by_one, rtol=1e-6)
+    np.testing.assert_allclose(np.linalg.norm(batched, axis=1), 1.0, rtol=1e-6)
+    # Longest texts go first, so later batches pad to shorter lengths
+    assert e.session.batch_lengths == sorted(e.session.batch_lengths, reverse=True)
+
+# ----------------------------
+# Parity with the torch model
+# ----------------------------
+
+def test_onnx_matches_sentence_transformers():
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("tokenizers")
+    pytest.importorskip("sentence_transformers")
+    if not os.path.exists(os.path.join(ONNX_MODEL_DIR, ONNX_MODEL_FILE)):
+        pytest.skip("no exported model; run export_onnx.py")
+    from benchmarks.corpus import generate_corpus
+    from build_index import row_to_text
+
+    texts = [row_to_text(r) for r in generate_corpus(200)] + ["", "hiring", "a" * 5000]
+    ref = embedder.SentenceTransformerEmbedder().encode(texts)
+    out = OnnxEmbedder().encode(texts)
+    cos = np.sum(ref * out, axis=1) / (np.linalg.norm(ref, axis=1) * np.linalg.norm(out, axis=1))
+    assert cos.min() >= MIN_COSINE
+
+# ----------------------------
+# LlamaEmbedder with a stub Llama
+# ----------------------------
+
+class StubLlama:
+    # Pooled: one vector per text (len, 1, 2). pooling "none": one per token.
+    # Items come back out of order, as only their "index" is guaranteed
+    def __init__(self, **params):
+        self.params = params
+        self.calls = []
+
+    def create_embedding(self, input):
+        self.calls.append(list(input))
+        data = []
+        for i, text in enumerate(input):
+            if self.params["pooling_type"] == 0:
+                vector = [[len(text), 1.0, 2.0], [len(text), 3.0, 0.0]]
+            else:
+                vector = [len(text), 1.0, 2.0]
+            data.append({"index": i, "embedding": vector})
+        return {"data": data[::-1]}
+
+@pytest.fixture
+def stub_llama(monkeypatch):
+    import sys
+    import types
+    module = types.ModuleType("llama_cpp")
+    module.Llama = StubLlama
+    monkeypatch.setitem(sys.modules, "llama_cpp", module)
+
+def expected_rows(texts, per_token):
+    rows = []
+    for t in texts:
+        n = len(t or " ")
+        rows.append([n, 2.0, 1.0] if per_token else [n, 1.0, 2.0])
+    rows = np.array(rows, dtype=np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+@pytest.mark.parametrize("pooling", ["mean", "none"])
+def test_llama_encode_batches_in_order(stub_llama, pooling):
+    texts = ["a", "abcd", "", None, "abcdefgh"]
+    e = embedder.LlamaEmbedder(model_path="stub.gguf", pooling=pooling, batch_size=2)
+    out = e.encode(texts)
+    assert [len(c) for c in e.model.calls] == [2, 2, 1]
+    np.testing.assert_allclose(out, expected_rows(texts, pooling == "none"), rtol=1e-6)
+    np.testing.assert_allclose(np.linalg.norm(out, axis=1), 1.0, rtol=1e-6)
+
+def test_llama_pooling_type(stub_llama):
+    e = embedder.LlamaEmbedder(model_path="stub.gguf", pooling="cls")
+    assert e.model.params["embedding"] is True
+    assert e.model.params["pooling_type"] == 2
+    with pytest.raises(ValueError):
+        embedder.LlamaEmbedder(model_path="stub.gguf", pooling="max")
@@ -0,0 +1,117 @@
+import pytest
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.run_engines import BATCH_ENGINES, batch_questions, load_engine
+from linkedin_query_answer import answer_linkedin_query
+from partitions import build_metadata
+
+ROWS = [
+    {"author": "Madhuri Jain", "postUrl": "https://www.linkedin.com/feed/update/urn:li:activity:1000001"},
+    {"author": "Jia Li", "postUrl": "https://www.linkedin.com/feed/update/urn:li:activity:1000002"},
+    {"author": "Jia Li", "postUrl": "https://www.linkedin.com/feed/update/urn:li:activity:1000003"},
+    {"author": "Ashish Shah", "postUrl": "https://www.linkedin.com/feed/update/urn:li:activity:1000004"},
+]
+
+def layouts(rows):
+    # The same rows as a plain list, indexed dicts and indexed columns
+    return {
+        "plain": list(rows),
+        "indexed": build_metadata(rows, columnar=False),
+        "columnar": build_metadata(rows, columnar=True),
+    }
+
+@pytest.mark.parametrize("question, expected", [
+    # "jian" is one edit from both "jain" and "jia": a tie counts nothing
+    ("How many posts were made by jian", "'0' posts were made by  jian as the author."),
+    ("How many posts were made by ashsih shah",
+     "'1' posts were made by Ashish Shah (closest match to 'ashsih shah') as the author."),
+    ("How many posts were made by Jia Li", "'2' posts were made by  jia li as the author."),
+    ("How many posts were made by zzz", "'0' posts were made by  zzz as the author."),
+])
+def test_post_count_by_author_agrees(question, expected):
+    for name, metadata in layouts(ROWS).items():
+        assert answer_linkedin_query(metadata, question) == expected, name
+
+def test_counts_display_as_scraped():
+    from linkedin_filter import format_results
+
+    rows = [{"name": "Madhuri Jain", "author": "Madhuri Jain", "followers": 940, "followersText": "940+",
+             "likeCount": None, "likeCountText": "", "commentCount": 3, "commentCountText": "3"}]
+    for name, metadata in layouts(rows).items():
+        answer = answer_linkedin_query(metadata, "How many followers does Madhuri Jain have?")
+        assert answer == "Madhuri Jain has '940+' followers.", name
+        formatted = format_results([metadata[0]])
+        assert "**Followers**: 940+" in formatted and "None" not in formatted, name
+
+PERSON_ROWS = [
+    {"name": "Madhuri Jain", "author": "Madhuri Jain", "followers": 940, "postDate": "2024-06-03", "postContent": "a"},
+    {"name": "Jane Roe", "author": "Jane Roe", "followers": 120, "postDate": "2024-03-14", "postContent": "b"},
+    {"name": "Jane Roe", "author": "Jane Roe", "followers": 120, "postDate": "2024-05-20", "postContent": "c"},
+    {"name": "Ashish Shah", "author": "Ashish Shah", "followers": 300, "postDate": "2024-06-21", "postContent": "d"},
+]
+
+@pytest.mark.parametrize("question, expected", [
+    # A month after "posts from" is a date, never a misspelt author ("june" -> "jane")
+    ("Show posts from June", ["a", "d"]),
+    ("posts from May", ["c"]),
+    ("posts from march", ["b"]),
+    ("posts by Jane", ["b", "c"]),
+    ("posts by Madhri Jain", ["a"]),
+])
+def test_person_filters_agree(question, expected):
+    from linkedin_filter import apply_filters, filter_cursor
+
+    for name, metadata in layouts(PERSON_ROWS).items():
+        assert [r["postContent"] for r in apply_filters(metadata, question)] == expected, name
+        assert sorted(r["postContent"] for r in filter_cursor(metadata, question).page(0)) == expected, name
+
+def test_typo_lookups_agree_across_layouts():
+    from qa_engine import apply_filters as qa_filters
+    from query_utils import apply_filters as query_utils_filters
+
+    for name, metadata in layouts(PERSON_ROWS).items():
+        assert [r["postContent"] for r in qa_filters(metadata, "posts by Madhri Jain")] == ["a"], name
+        assert [r["postContent"] for r in query_utils_filters(metadata, "details of Ashsih Shah")] == ["d"], name
+        answer = answer_linkedin_query(metadata, "How many followers does Madhri Jain have?")
+        assert answer == "Madhri Jain has '940' followers.", name
+
+URL_QUESTIONS = [
+    # Tracking params, percent-encoded URN, /posts/ slug form and a bare fragment
+    "What is the postContent of the post with postUrl https://www.linkedin.com/feed/update/urn:li:activity:1000002?utm_source=share",
+    "What is the postContent of the post with postUrl https://www.linkedin.com/feed/update/urn%3Ali%3Aactivity%3A1000003/",
+    "What is the type of post for https://www.linkedin.com/posts/jia-li_hiring-activity-1000002-abcd",
+    "What is the postContent of the post with postUrl https://www.linkedin.com/feed/update/urn:li:activity:100000",
+]
+
+def test_post_url_answers_agree():
+    from linkedin_filter import apply_filters
+    from linkedin_query_answer import answer_many
+    from query_utils import apply_filters as query_utils_filters
+
+    rows = [dict(r, postContent=f"post {i}", type="Text") for i, r in enumerate(ROWS)]
+    expected = None
+    for name, metadata in layouts(rows).items():
+        answers = [answer_linkedin_query(metadata, q) for q in URL_QUESTIONS]
+        assert answer_many(metadata, URL_QUESTIONS) == answers, name
+        filtered = [[r["postUrl"] for r in engine(metadata, f"posturl '{q.split()[-1]}'")]
+                    for engine in (apply_filters, query_utils_filters) for q in URL_QUESTIONS]
+        if expected is None:
+            expected = (answers, filtered)
+            assert "post 1" in answers[0] and "post 2" in answers[1]
+        assert (answers, filtered) == expected, name
+
+# ----------------------------
+# Batch answers
+# ----------------------------
+
+@pytest.mark.parametrize("engine", sorted(BATCH_ENGINES))
+def test_batch_matches_loop(engine):
+    corpus = generate_corpus(1500, seed=7)
+    questions = batch_questions(engine, corpus, 300)
+    fn, many = load_engine(engine), load_engine(engine, BATCH_ENGINES)
+    for name, metadata in layouts(corpus).items():
+        expected = [fn(metadata, q) for q in questions]
+        got = many(metadata, questions)
+        for question, a, b in zip(questions, expected, got):
+            assert a == b, (name, question)
+        assert len(got) == len(expected)
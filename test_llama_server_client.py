@@ -0,0 +1,34 @@
+from llama_server_client import LlamaServerClient
+
+class FakeResponse:
+    def __init__(self, status_code=200, data=None):
+        self.status_code = status_code
+        self._data = data or {}
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+class FakeSession:
+    # A llama-server whose loaded model can be swapped, as on a restart
+    def __init__(self, model_path):
+        self.model_path = model_path
+        self.props_calls = 0
+
+    def get(self, url, timeout=None):
+        if url.endswith("/props"):
+            self.props_calls += 1
+            return FakeResponse(data={"model_path": self.model_path})
+        return FakeResponse()
+
+def test_model_id_follows_the_loaded_model():
+    client = LlamaServerClient("http://llama.test")
+    client.session = FakeSession("models/a.gguf")
+    assert client.model_id() == "models/a.gguf"
+    assert client.model_id() == "models/a.gguf" and client.session.props_calls == 1
+    # Restarted on another GGUF: the next fresh health check re-reads it
+    client.session.model_path = "models/b.gguf"
+    client._healthy_until = 0.0
+    assert client.model_id() == "models/b.gguf"
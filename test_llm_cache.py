@@ -0,0 +1,49 @@
+from llm_cache import GenerationCache, make_cache_key
+
+def cache(tmp_path, **kwargs):
+    return GenerationCache(str(tmp_path / "cache.sqlite"), **kwargs)
+
+def test_keys_separate_sampling_params():
+    base = make_cache_key("openai", "gpt", "hi", 0, 100)
+    assert base == make_cache_key("openai", "gpt", [{"role": "user", "content": "hi"}], 0.0, 100)
+    others = [
+        make_cache_key("openai", "gpt-4", "hi", 0, 100),
+        make_cache_key("local", "gpt", "hi", 0, 100),
+        make_cache_key("openai", "gpt", "hi", 0.7, 100),
+        make_cache_key("openai", "gpt", "hi", 0, 200),
+        make_cache_key("openai", "gpt", "hi", 0, 100, seed=1),
+        make_cache_key("openai", "gpt", "bye", 0, 100),
+    ]
+    assert len({base, *others}) == len(others) + 1
+
+def test_get_is_keyed_on_every_param(tmp_path):
+    c = cache(tmp_path)
+    c.put("openai", "gpt", "hi", 0, 100, "A")
+    assert c.get("openai", "gpt", "hi", 0, 100) == "A"
+    assert c.get("openai", "gpt-4", "hi", 0, 100) is None
+    assert c.get("openai", "gpt", "hi", 0, 101) is None
+
+def test_deterministic_only_gate(tmp_path):
+    c = cache(tmp_path)
+    assert c.only_deterministic
+    c.put("openai", "gpt", "hi", 0.7, 100, "sampled")
+    assert c.get("openai", "gpt", "hi", 0.7, 100) is None
+    c.put("openai", "gpt", "hi", 0.7, 100, "seeded", seed=3)
+    assert c.get("openai", "gpt", "hi", 0.7, 100, seed=3) == "seeded"
+    c.put("openai", "gpt", "hi", 0, 100, "greedy")
+    assert c.get("openai", "gpt", "hi", 0, 100) == "greedy"
+    everything = cache(tmp_path, only_deterministic=False)
+    everything.put("openai", "gpt", "hi", 0.7, 100, "sampled")
+    assert everything.get("openai", "gpt", "hi", 0.7, 100) == "sampled"
+
+def test_lru_eviction_by_bytes(tmp_path):
+    c = cache(tmp_path, max_bytes=25)
+    c.put("b", "m", "one", 0, 10, "x" * 10)
+    c.put("b", "m", "two", 0, 10, "y" * 10)
+    assert c.get("b", "m", "one", 0, 10) == "x" * 10     # "two" is now least recently used
+    c.put("b", "m", "three", 0, 10, "z" * 10)
+    assert c.get("b", "m", "two", 0, 10) is None
+    assert c.get("b", "m", "one", 0, 10) and c.get("b", "m", "three", 0, 10)
+    assert c.stats()["bytes"] == 20
+    c.put("b", "m", "huge", 0, 10, "w" * 26)              # bigger than the whole cache: not stored
+    assert c.get("b", "m", "huge", 0, 10) is None and c.stats()["entries"] == 2
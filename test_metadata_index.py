@@ -0,0 +1,52 @@
+import random
+
+from metadata_index import NameIndex, SubstringIndex, normalize_text
+
+ROWS = [{"author": a} for a in ["Madhuri Jain", "Ashish Shah", "Jia Li", "Ashish Shah"]]
+
+def test_containing_and_exact():
+    index = NameIndex(ROWS, "author")
+    assert index.containing("shah") == ["ashish shah"]
+    assert list(index.exact("Ashish  Shah")) == [1, 3]
+
+def test_closest_trigram_typos():
+    index = NameIndex(ROWS, "author")
+    assert index.closest("madhri") == ["madhuri jain"]
+    assert index.closest("ashsih shah") == ["ashish shah"]
+
+def test_closest_short_typo_without_shared_trigram():
+    # "jian" vs "jain" shares no padded trigram
+    index = NameIndex([{"author": "Madhuri Jain"}, {"author": "Ashish Shah"}], "author")
+    assert index.closest("jian") == ["madhuri jain"]
+    assert list(index.lookup("jian")) == [0]
+
+def test_closest_short_typo_ties():
+    index = NameIndex(ROWS, "author")
+    assert sorted(index.closest("jian")) == ["jia li", "madhuri jain"]
+    assert index.closest("xyzq") == []
+
+# ----------------------------
+# SubstringIndex
+# ----------------------------
+
+def substring_rows():
+    rng = random.Random(11)
+    words = ["hiring", "ai", "ml", "café", "Zürich", "naïve", "résumé", "a", "ab", "x", "🚀", "über", "data-science",
+             "don't", "1,204", "北京"]
+    rows = [{"postContent": " ".join(rng.choice(words) for _ in range(rng.randint(0, 8)))} for _ in range(400)]
+    rows += [{"postContent": ""}, {"postContent": None}, {}, {"postContent": 1204}, {"postContent": "  Café  "}]
+    return rows
+
+def test_substring_containing_matches_brute_force(monkeypatch):
+    rows = substring_rows()
+    values = [normalize_text(r.get("postContent") if isinstance(r.get("postContent"), str)
+                             else str(r.get("postContent") or "")) for r in rows]
+    needles = ["a", "i", "x", "e", "ai", "ab", "af", "'", " ", "-", "12", "cafe", "zurich", "naive", "resume",
+               "hiring ai", "data-science", "don't", "1,204", "bei jing", "uber", "zz", "qq", "hiring hiring"]
+    for chunk in (SubstringIndex.BUILD_CHUNK, 64):
+        # A tiny chunk forces the build through many vectorized steps
+        monkeypatch.setattr(SubstringIndex, "BUILD_CHUNK", chunk)
+        index = SubstringIndex(rows, "postContent")
+        for needle in needles:
+            expected = [pos for pos, value in enumerate(values) if needle in value]
+            assert index.containing(needle).tolist() == expected, (chunk, needle)
@@ -0,0 +1,20 @@
+from metadata_store import MetadataStore, record_key
+
+POST = "https://www.linkedin.com/feed/update/urn:li:activity:7101234567890123456"
+
+def test_tracking_params_share_one_record(tmp_path):
+    store = MetadataStore(str(tmp_path / "metadata.sqlite"))
+    first = store.upsert([{"postUrl": POST, "author": "Madhuri Jain", "likeCount": 940}])
+    again = store.upsert([
+        {"postUrl": POST + "?utm_source=share&utm_medium=member_desktop", "author": "Madhuri Jain", "likeCount": 940},
+        {"postUrl": POST.replace(":", "%3A").replace("https%3A", "https:") + "/", "author": "Madhuri Jain",
+         "likeCount": 941},
+    ])
+    assert store.count() == 1
+    assert again == first  # only the changed likeCount, on the same row
+    store.close()
+
+def test_profile_rows_keyed_by_canonical_profile():
+    assert record_key({"profile_url": "https://www.linkedin.com/in/mjmadhu/?trk=x"}) == \
+        record_key({"profile_url": "linkedin.com/in/mjmadhu"})
+    assert record_key({}) is None
@@ -0,0 +1,28 @@
+import pytest
+
+from partitions import bind_tenant, parse_tenant_keys
+
+KEYS = parse_tenant_keys("k-acme:acme, k-globex:globex,malformed")
+
+def test_parse_tenant_keys():
+    assert KEYS == {"k-acme": "acme", "k-globex": "globex"}
+
+def test_key_binds_tenant():
+    assert bind_tenant(None, "k-acme", KEYS) == "acme"
+    assert bind_tenant("globex", "k-globex", KEYS) == "globex"
+
+@pytest.mark.parametrize("requested, api_key", [
+    ("globex", "k-acme"),   # another client's partition
+    (None, None),
+    (None, "k-unknown"),
+    ("acme", ""),
+])
+def test_client_cannot_pick_tenant(requested, api_key):
+    with pytest.raises(PermissionError):
+        bind_tenant(requested, api_key, KEYS)
+
+def test_deployment_tenant_without_keys():
+    assert bind_tenant(None, keys={}, deployed="acme") == "acme"
+    assert bind_tenant("acme", keys={}, deployed="acme") == "acme"
+    with pytest.raises(PermissionError):
+        bind_tenant("globex", keys={}, deployed="acme")
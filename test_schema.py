@@ -0,0 +1,47 @@
+from schema import canonical_post_url, canonical_profile_url
+
+def test_profile_url_variants():
+    expected = "in:mjmadhu"
+    for url in [
+        "https://www.linkedin.com/in/mjmadhu",
+        "https://www.linkedin.com/in/mjmadhu/",
+        "linkedin.com/in/mjmadhu?trk=public_profile",
+        "https://m.linkedin.com/in/MJMadhu/",
+        "<https://www.linkedin.com/in/mjmadhu>",
+        # As cut from "... postUrl 'https://www.linkedin.com/in/mjmadhu'?"
+        "https://www.linkedin.com/in/mjmadhu'?",
+        'https://www.linkedin.com/in/mjmadhu/".',
+    ]:
+        assert canonical_profile_url(url) == expected, url
+
+def test_post_url_variants():
+    expected = "activity:7123456789012345678"
+    for url in [
+        "https://www.linkedin.com/feed/update/urn:li:activity:7123456789012345678/",
+        "https://www.linkedin.com/feed/update/urn%3Ali%3Aactivity%3A7123456789012345678?utm_source=share",
+        "https://www.linkedin.com/posts/jane-doe_hiring-activity-7123456789012345678-abcd'?",
+    ]:
+        assert canonical_post_url(url) == expected, url
+
+def test_empty_url():
+    assert canonical_profile_url(None) == ""
+    assert canonical_post_url("") == ""
+
+def test_display_count_keeps_scraped_text():
+    import pandas as pd
+    from build_index import clean_and_standardize, to_records
+    from schema import display_count
+
+    df = pd.DataFrame([
+        {"name": "Madhuri Jain", "followers": "940+", "likeCount": "1,204", "commentCount": ""},
+        {"name": "Ashish Shah", "followers": "12K", "likeCount": None},
+    ])
+    first, second = to_records(clean_and_standardize(df))
+    assert first["followers"] == 940 and display_count(first, "followers") == "940+"
+    assert display_count(first, "likeCount") == "1,204"
+    assert display_count(first, "commentCount") == "" and display_count(second, "likeCount") == ""
+    assert second["followers"] == 12000 and display_count(second, "followers") == "12K"
+    # Rows without the text columns (older snapshots, raw files)
+    assert display_count({"likeCount": 12.0}, "likeCount") == "12"
+    assert display_count({"likeCount": None}, "likeCount") == ""
+    assert display_count({}, "likeCount") == "N/A"
@@ -0,0 +1,38 @@
+import time
+
+from scrape_queue import FAILED, MAX_BACKOFF_SECONDS, PENDING, JsonlWriter, ScrapeQueue, read_jsonl
+
+def test_failed_url_waits_out_backoff(tmp_path):
+    queue = ScrapeQueue(str(tmp_path / "q.sqlite"), max_attempts=3, backoff=60)
+    queue.enqueue(["a", "b"])
+    assert sorted(queue.claim(10)) == ["a", "b"]
+    assert queue.mark_failed("a", "429") == PENDING
+    queue.mark_done("b")
+    assert queue.claim(10) == []
+    assert queue.next_due() is not None
+
+def test_backoff_grows_and_gives_up(tmp_path):
+    queue = ScrapeQueue(str(tmp_path / "q.sqlite"), max_attempts=5, backoff=1000)
+    queue.enqueue(["a"])
+    delays = []
+    for expected in (PENDING, PENDING, PENDING, PENDING, FAILED):
+        assert queue.claim(1) == ["a"]
+        before = time.time()
+        assert queue.mark_failed("a", "429") == expected
+        delays.append(queue._conn.execute("SELECT not_before FROM jobs").fetchone()[0] - before)
+        # Backing off: not claimable until not_before, so move it to now
+        assert queue.claim(1) == []
+        queue._conn.execute("UPDATE jobs SET not_before = 0")
+    for delay, expected in zip(delays, [1000, 2000, MAX_BACKOFF_SECONDS, MAX_BACKOFF_SECONDS]):
+        assert expected - 1 <= delay <= expected + 1
+    assert queue.claim(1) == [] and queue.next_due() is None
+    assert queue.counts() == {FAILED: 1}
+
+def test_jsonl_torn_line(tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"url": "a", "v": 1}\n{"url": "b", "v"')
+    writer = JsonlWriter(path)
+    writer.write({"url": "a", "v": 2})
+    writer.close()
+    assert read_jsonl(path) == [{"url": "a", "v": 2}]
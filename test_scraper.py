@@ -0,0 +1,184 @@
+import json
+import os
+import shutil
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from extract import extract_page
+from scrape_queue import JsonlWriter, ScrapeQueue
+from scraper import FIXTURES_DIR, LinkedInScraper, RateLimiter, run_queue, save_profiles, serve_fixtures
+
+def fixture_html(name):
+    with open(os.path.join(FIXTURES_DIR, "in", name), encoding="utf-8") as f:
+        return f.read()
+
+def test_extract_profile_with_posts():
+    page = extract_page(fixture_html("example1.html"), "http://127.0.0.1/in/example1.html")
+    assert page["name"] == "Madhuri Jain"
+    assert page["title"] == "Legal Counsel | Corporate & Commercial Law"
+    first, second = page["records"]
+    assert first["profile_url"] == "https://www.linkedin.com/in/mjmadhu"
+    assert first["followers"] == "940+"
+    assert first["postUrl"] == "https://www.linkedin.com/feed/update/urn:li:activity:7101234567890123456"
+    assert first["postDate"] == "2023-09-12"
+    assert (first["likeCount"], first["commentCount"], first["repostCount"]) == ("940", "41", "7")
+    assert first["type"] == "Text"
+    assert second["type"] == "Image" and second["likeCount"] == "1,204"
+
+def test_extract_article_post():
+    (row,) = extract_page(fixture_html("example2.html"))["records"]
+    assert row["author"] == "Ashish Shah"
+    assert row["authorUrl"] == "https://www.linkedin.com/in/ashishshah"
+    assert row["followers"] == "12,530"
+    assert row["type"] == "Article"
+
+def test_extract_abbreviated_counts():
+    from build_index import parse_counts
+    import pandas as pd
+
+    (row,) = extract_page(fixture_html("example3.html"))["records"]
+    assert (row["followers"], row["likeCount"], row["commentCount"]) == ("1.2K", "12K", "1.5M")
+    counts = parse_counts(pd.Series([row["followers"], row["likeCount"], row["commentCount"], row["repostCount"]]))
+    assert counts.tolist() == [1200, 12000, 1500000, 9]
+
+def test_serve_fixtures():
+    server, base = serve_fixtures()
+    try:
+        with urllib.request.urlopen(f"{base}/in/example2.html", timeout=5) as response:
+            page = extract_page(response.read().decode("utf-8"), f"{base}/in/example2.html")
+    finally:
+        server.shutdown()
+    assert page["name"] == "Ashish Shah"
+
+def test_save_profiles_against_fixtures(tmp_path):
+    if not (shutil.which("chromedriver") and (shutil.which("google-chrome") or shutil.which("chromium"))):
+        pytest.skip("no Chrome/chromedriver")
+    server, base = serve_fixtures()
+    out_path = tmp_path / "profiles.jsonl"
+    try:
+        scraped = save_profiles(
+            [f"{base}/in/example1.html", f"{base}/in/example2.html"], "fixture@example.com", "fixture",
+            workers=2, rate=0, login_url=f"{base}/login.html",
+            out_path=str(out_path), queue_path=str(tmp_path / "queue.sqlite"),
+        )
+    finally:
+        server.shutdown()
+    assert scraped == 2
+    with open(out_path, encoding="utf-8") as f:
+        names = sorted(json.loads(line)["name"] for line in f)
+    assert names == ["Ashish Shah", "Madhuri Jain"]
+
+# ----------------------------
+# LinkedInScraper with fake browser sessions
+# ----------------------------
+
+class FakeSession:
+    # Stands in for ScraperSession: "bad" URLs fail to load, fail_login fails login
+    created = []
+
+    def __init__(self, email, password, login_url, headless, timeout, fail_login=False):
+        self.fail_login = fail_login
+        self.logins = 0
+        self.fetched = []
+        self.closed = False
+        FakeSession.created.append(self)
+
+    def login(self):
+        self.logins += 1
+        if self.fail_login:
+            raise RuntimeError("login failed")
+
+    def fetch(self, url):
+        if "bad" in url:
+            raise RuntimeError("page did not load")
+        self.fetched.append(url)
+        return fixture_html("example2.html")
+
+    def close(self):
+        self.closed = True
+
+def fake_scraper(workers=1, fail_login=False):
+    FakeSession.created = []
+    def factory(*args):
+        return FakeSession(*args, fail_login=fail_login)
+    return LinkedInScraper("e", "p", workers=workers, rate=0, session_factory=factory)
+
+def test_session_reused_per_worker():
+    scraper = fake_scraper()
+    for i in range(3):
+        scraper.fetch(f"http://fixture/{i}")
+    other = threading.Thread(target=scraper.fetch, args=("http://fixture/other",))
+    other.start()
+    other.join()
+    first, second = FakeSession.created
+    assert first.fetched == [f"http://fixture/{i}" for i in range(3)] and first.logins == 1
+    assert second.fetched == ["http://fixture/other"]
+    scraper.close()
+    assert first.closed and second.closed
+
+def test_session_dropped_after_fetch_error():
+    scraper = fake_scraper()
+    scraper.fetch("http://fixture/1")
+    try:
+        scraper.fetch("http://fixture/bad")
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("fetch error was swallowed")
+    broken = FakeSession.created[0]
+    assert broken.closed and broken not in scraper._sessions
+    scraper.fetch("http://fixture/2")
+    assert len(FakeSession.created) == 2 and FakeSession.created[1].fetched == ["http://fixture/2"]
+
+def test_failed_login_closes_browser():
+    scraper = fake_scraper(fail_login=True)
+    for i in range(4):
+        try:
+            scraper.fetch(f"http://fixture/{i}")
+        except RuntimeError as e:
+            assert str(e) == "login failed"
+    assert len(FakeSession.created) == 4
+    assert all(s.closed for s in FakeSession.created) and scraper._sessions == []
+
+def test_scrape_iter_reports_errors():
+    with fake_scraper(workers=2) as scraper:
+        results = list(scraper.scrape_iter(["http://fixture/1", "http://fixture/bad", "http://fixture/2"]))
+    errors = [r for r in results if "error" in r]
+    pages = sorted(r["url"] for r in results if "records" in r)
+    assert [e["url"] for e in errors] == ["http://fixture/bad"]
+    assert pages == ["http://fixture/1", "http://fixture/2"]
+
+def test_run_queue_reuses_sessions_across_batches(tmp_path):
+    queue = ScrapeQueue(str(tmp_path / "queue.sqlite"))
+    queue.enqueue([f"http://fixture/{i}" for i in range(20)])
+    writer = JsonlWriter(str(tmp_path / "out.jsonl"))
+    scraper = fake_scraper(workers=2)
+    try:
+        assert run_queue(queue, scraper, writer, batch_size=3) == 20
+    finally:
+        writer.close()
+        queue.close()
+    assert 1 <= len(FakeSession.created) <= 2
+    assert sum(len(s.fetched) for s in FakeSession.created) == 20
+    scraper.close()
+    assert all(s.closed for s in FakeSession.created)
+
+def test_rate_limiter_spacing():
+    limiter = RateLimiter(20)  # one slot every 50 ms
+    times = []
+    def worker():
+        for _ in range(3):
+            limiter.wait()
+            times.append(time.monotonic())
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    times.sort()
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert min(gaps) >= 0.04
+    assert RateLimiter(0).interval == 0.0
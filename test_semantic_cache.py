@@ -0,0 +1,46 @@
+import numpy as np
+
+from semantic_cache import SemanticCache, literal_terms
+
+def same_vector(texts):
+    # Worst case embedding: every question looks identical, so only the
+    # literal-terms guard can tell questions apart
+    return np.ones((len(texts), 4), dtype=np.float32)
+
+def cache():
+    return SemanticCache(embed=same_vector, capacity=8, threshold=0.9)
+
+def test_paraphrase_hits():
+    c = cache()
+    c.store("who has most followers", "A")
+    value, vector = c.lookup("profile with highest followers")
+    assert vector is None and value == "A"
+
+def test_near_misses_miss():
+    pairs = [
+        ("which post has the most likes", "which post has the most comments"),
+        ("who has the most followers", "who has the least followers"),
+        ("what is the average likecount", "what is the highest likecount"),
+        ("what is the most common type of post", "which post has the most likes"),
+        ("posts by Alice Shah", "posts by Bob Shah"),
+        # Same names and keywords, but the subject picks another branch
+        ("give me profile details of Madhuri Jain", "give me post details of Madhuri Jain"),
+        ("Who is the author of the post mentioning hiring", "details of the post that mentions hiring"),
+        ("what is the content of the post by Madhuri Jain", "who is the author of the post by Madhuri Jain"),
+    ]
+    for cached, asked in pairs:
+        c = cache()
+        c.store(cached, "cached")
+        value, vector = c.lookup(asked)
+        assert vector is not None and value is None, (cached, asked)
+
+def test_literal_terms_keep_deciding_words():
+    assert literal_terms("which post has the most likes")
+    assert literal_terms("who has the least followers") != literal_terms("who has the most followers")
+    assert literal_terms("who has most followers") == literal_terms("profile with highest followers")
+
+def test_version_change_clears():
+    c = cache()
+    c.store("who has most followers", "A", version=1)
+    value, vector = c.lookup("who has most followers", version=2)
+    assert value is None and vector is not None
@@ -0,0 +1,17 @@
+from tracing import Registry, add_spans, mark_intent, span, trace
+import tracing
+
+def test_worker_spans_observed_in_parent(monkeypatch):
+    monkeypatch.setattr(tracing, "registry", Registry())
+    # Worker side: collected, not observed
+    with trace("filter", export=False) as worker:
+        mark_intent("filter.author_posts")
+        with span("apply_filters"):
+            pass
+    assert tracing.registry.snapshot() == {}
+    # Parent side: the worker's spans join the HTTP trace under its intent
+    with trace("http.filter"):
+        mark_intent(worker["intent"])
+        add_spans(worker["spans"] + [{"stage": "filter", "offset": 0.0, "duration": worker["duration"]}])
+    stages = {stage for stage, intent in tracing.registry.snapshot() if intent == "filter.author_posts"}
+    assert stages == {"apply_filters", "filter", "http.filter"}
@@ -0,0 +1,199 @@
+# tracing.py
+#
+# Lightweight request tracing for the query path. A trace() wraps one user
+# request, span() times a stage inside it, and mark_intent() records which
+# engine branch produced the answer. When the trace ends every span is
+# observed into a per-(stage, intent) latency histogram and, if TRACE_FILE is
+# set, the whole trace is appended to that file as one JSON line.
+# Histograms are exported in Prometheus text format, over HTTP when
+# METRICS_PORT is set.
+
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TRACE_FILE = os.getenv("TRACE_FILE")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRIC_NAME = "linkedin_stage_seconds"
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_current = contextvars.ContextVar("linkedin_trace", default=None)
+
+# ----------------------------
+# Histograms
+# ----------------------------
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+                break
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, stage, seconds, intent=""):
+        key = (stage, intent or "")
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram()
+            hist.observe(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {k: (list(h.counts), h.sum, h.count) for k, h in self._histograms.items()}
+
+    def render_prometheus(self):
+        lines = [
+            f"# HELP {METRIC_NAME} Time spent in each query-path stage, by intent branch",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        for (stage, intent), (counts, total, count) in sorted(self.snapshot().items()):
+            labels = f'stage="{_escape(stage)}",intent="{_escape(intent)}"'
+            cumulative = 0
+            for upper, n in zip(BUCKETS, counts):
+                cumulative += n
+                lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{upper}"}} {cumulative}')
+            lines.append(f'{METRIC_NAME}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{METRIC_NAME}_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{METRIC_NAME}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+registry = Registry()
+
+# ----------------------------
+# Traces and spans
+# ----------------------------
+
+_trace_lock = threading.Lock()
+
+@contextmanager
+def trace(name, export=True, **attrs):
+    # export=False only collects the record (a worker process hands its spans
+    # back to the parent with add_spans instead of observing them itself)
+    record = {
+        "trace_id": uuid.uuid4().hex,
+        "name": name,
+        "start": time.time(),
+        "attrs": dict(attrs),
+        "intent": "",
+        "spans": [],
+    }
+    start = record["_t0"] = time.perf_counter()
+    token = _current.set(record)
+    try:
+        yield record
+    except Exception as e:
+        record["error"] = repr(e)
+        raise
+    finally:
+        record["duration"] = time.perf_counter() - start
+        _current.reset(token)
+        if export:
+            _finish(record)
+        else:
+            record.pop("_t0", None)
+
+@contextmanager
+def span(stage, **attrs):
+    record = _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        if record is None:
+            registry.observe(stage, duration)
+        else:
+            record["spans"].append({
+                "stage": stage,
+                "offset": start - record["_t0"],
+                "duration": duration,
+                **attrs,
+            })
+
+def mark_intent(intent):
+    # Last branch to mark wins, i.e. the one whose output the user saw
+    record = _current.get()
+    if record is not None:
+        record["intent"] = intent
+
+def add_spans(spans):
+    # Spans timed elsewhere (another process) join the current trace, and are
+    # observed under its intent when it ends
+    record = _current.get()
+    for s in spans:
+        if record is None:
+            registry.observe(s["stage"], s["duration"])
+        else:
+            record["spans"].append(dict(s))
+
+def set_attr(key, value):
+    record = _current.get()
+    if record is not None:
+        record["attrs"][key] = value
+
+def _finish(record):
+    record.pop("_t0", None)
+    intent = record["intent"]
+    for s in record["spans"]:
+        registry.observe(s["stage"], s["duration"], intent)
+    registry.observe(record["name"], record["duration"], intent)
+    if TRACE_FILE:
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with _trace_lock:
+            with open(TRACE_FILE, "a", encoding="utf-8") as f:
+                f.write(line)
+
+# ----------------------------
+# Metrics endpoint
+# ----------------------------
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+_metrics_server = None
+
+def start_metrics_server(port=METRICS_PORT, host="127.0.0.1"):
+    global _metrics_server
+    if not port or _metrics_server is not None:
+        return _metrics_server
+    try:
+        _metrics_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError:
+        # Another app worker already serves this port
+        return None
+    threading.Thread(target=_metrics_server.serve_forever, daemon=True).start()
+    return _metrics_server
@@ -3,10 +3,10 @@ from sentence_transformers import SentenceTransformer
 import faiss
 import numpy as np
 import json
+from scrape_queue import read_jsonl
 
 def build_vector_store():
-    with open("linkedin_profiles.json", "r") as f:
-        data = json.load(f)
+    data = read_jsonl("linkedin_profiles.jsonl")
 
     # Prepare documents as text for embeddings
     documents = [f"{p['name']} - {p['title']}" for p in data]